@@ -0,0 +1,142 @@
+"""First- vs repeat-visit time-to-interactive of the browser pages, in headless Chromium.
+
+Starts the app with uvicorn on a local port, then for each page opens a fresh
+browser profile and loads the page ``--visits`` times in it. A visit ends when
+the page is interactive (Pyodide printed "Ready!", or stlite rendered the app),
+and reports the elapsed time and how many requests still reached the network
+rather than the service worker. ``--block-service-workers`` gives the
+HTTP-cache-only baseline to compare against::
+
+    python -m benchmarks.browser_tti --pages /pyodide,/pyodide2
+    python -m benchmarks.browser_tti --pages /pyodide,/pyodide2 --block-service-workers
+
+Needs Playwright and its Chromium (``pip install playwright && playwright
+install chromium``), and the vendored runtime (``invoke vendor-runtime``) unless
+the CDN fallback should be measured.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.harness import LAMBDA_DIR
+
+# JS predicates for "interactive" per page (prefix match)
+READY_CHECKS = {
+    "/pyodide": "document.getElementById('output').value.includes('Ready!')",
+    "/streamlit": "!!document.querySelector('[data-testid=\"stMarkdownContainer\"]')",
+}
+
+
+def ready_check(page_path: str) -> str:
+    for prefix in sorted(READY_CHECKS, key=len, reverse=True):
+        if page_path.startswith(prefix):
+            return READY_CHECKS[prefix]
+    raise ValueError(f"no ready check for {page_path}")
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port)],
+        cwd=LAMBDA_DIR,
+        env={**os.environ, "DYNAMODB_TABLE": "benchmark-table"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ping", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"app did not start on port {port}")
+
+
+def measure_page(
+    playwright,
+    base_url: str,
+    page_path: str,
+    visits: int,
+    block_service_workers: bool,
+    timeout_s: float,
+) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as profile:
+        context = playwright.chromium.launch_persistent_context(
+            profile,
+            headless=True,
+            service_workers="block" if block_service_workers else "allow",
+        )
+        try:
+            for visit in range(1, visits + 1):
+                page = context.new_page()
+                network = []
+
+                def on_response(response):
+                    if not response.from_service_worker:
+                        network.append(response.url)
+
+                page.on("response", on_response)
+                start = time.perf_counter()
+                page.goto(base_url + page_path)
+                page.wait_for_function(ready_check(page_path), timeout=timeout_s * 1000)
+                results.append(
+                    {
+                        "visit": visit,
+                        "tti_ms": (time.perf_counter() - start) * 1000,
+                        "network_requests": len(network),
+                    }
+                )
+                page.close()
+        finally:
+            context.close()
+    return results
+
+
+def main(pages: list[str], visits: int, port: int, block: bool, timeout_s: float):
+    from playwright.sync_api import sync_playwright
+
+    server = start_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with sync_playwright() as playwright:
+            mode = "HTTP cache only" if block else "service worker"
+            print(
+                f"{'page':28} {'visit':>5} {'TTI ms':>9} {'network reqs':>13}  ({mode})"
+            )
+            for page_path in pages:
+                for result in measure_page(
+                    playwright, base_url, page_path, visits, block, timeout_s
+                ):
+                    print(
+                        f"{page_path:28} {result['visit']:>5} "
+                        f"{result['tti_ms']:9.0f} {result['network_requests']:>13}"
+                    )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--pages", default="/pyodide,/pyodide2,/streamlitdemos/helloWorld"
+    )
+    parser.add_argument("--visits", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--block-service-workers", action="store_true")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+    main(
+        args.pages.split(","),
+        args.visits,
+        args.port,
+        args.block_service_workers,
+        args.timeout,
+    )
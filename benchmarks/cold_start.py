@@ -0,0 +1,65 @@
+"""Distribution of ``import app`` time across fresh interpreters.
+
+Each run is a new ``python`` process with the lambda directory as cwd, so module
+caches are cold the way they are in a new Lambda container (bytecode caches on
+disk are still warm; delete ``__pycache__`` first to include compilation).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.harness import LAMBDA_DIR, percentile
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import app
+print(time.perf_counter() - start)
+"""
+
+
+def measure(runs: int, profile: bool = False) -> dict:
+    env = {
+        **os.environ,
+        "DYNAMODB_TABLE": "benchmark-table",
+        "APP_PROFILE_STARTUP": "1" if profile else "0",
+    }
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SNIPPET],
+            cwd=LAMBDA_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(output.stdout.strip().splitlines()[-1]) * 1000)
+        if profile:
+            # the last run's per-package breakdown is representative enough
+            profile_line = output.stderr.strip().splitlines()[-1]
+    result = {
+        "runs": runs,
+        "min_ms": min(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "max_ms": max(samples),
+        "stdev_ms": statistics.stdev(samples) if runs > 1 else 0.0,
+    }
+    if profile:
+        result["profile"] = json.loads(profile_line.partition("profile: ")[2])
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument(
+        "--profile", action="store_true", help="include per-package import times"
+    )
+    args = parser.parse_args()
+    print(json.dumps(measure(args.runs, args.profile), indent=2))
@@ -0,0 +1,174 @@
+"""Throughput/latency/allocation benchmark of the Mangum ``handler``, per route.
+
+Results are written as JSON (default ``benchmarks/results/<git sha>.json``) so
+runs from two commits can be diffed with ``--compare``.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.harness import (
+    FakeContext,
+    function_url_event,
+    load_app_module,
+    percentile,
+    response_body,
+)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# name -> event kwargs; names are stable so results line up across commits
+SCENARIOS = {
+    "api_ping": {"path": "/api/ping"},
+    "flet_index": {"path": "/flet"},
+    "flet_main_js": {"path": "/flet/main.dart.js"},
+    "flet_main_js_304": {"path": "/flet/main.dart.js", "revalidate": True},
+    "pyodide": {"path": "/pyodide"},
+    "pyodide2": {"path": "/pyodide2"},
+    "streamlit": {"path": "/streamlit"},
+    "streamlit_app_py": {"path": "/streamlit_app.py"},
+    "streamlitdemo_page": {"path": "/streamlitdemos/placeholderDemo"},
+    "streamlitdemo_file": {"path": "/streamlitdemos/files/api_demo_lib.py"},
+    "favicon": {"path": "/favicon.ico"},
+}
+
+
+def _invoke(handler, event) -> Optional[dict]:
+    try:
+        return handler(event, FakeContext())
+    except Exception:  # an unhandled route error surfaces as an exception in Mangum
+        return None
+
+
+def _build_event(handler, scenario: dict) -> dict:
+    event = function_url_event(scenario["path"])
+    if scenario.get("revalidate"):
+        first = _invoke(handler, event) or {}
+        if etag := first.get("headers", {}).get("etag"):
+            event = function_url_event(
+                scenario["path"], headers={"if-none-match": etag}
+            )
+    return event
+
+
+def run_scenario(handler, scenario: dict, iterations: int, warmup: int) -> dict:
+    event = _build_event(handler, scenario)
+    for _ in range(warmup):
+        _invoke(handler, event)
+
+    samples = []
+    statuses = {}
+    bytes_out = 0
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = _invoke(handler, event)
+        samples.append((time.perf_counter() - start) * 1000)
+        status = str(response["statusCode"]) if response else "exception"
+        statuses[status] = statuses.get(status, 0) + 1
+        if response:
+            bytes_out = len(response_body(response))
+    wall = time.perf_counter() - wall_start
+
+    # Allocations are sampled separately; tracing would distort the timings
+    alloc_runs = max(1, iterations // 20)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(alloc_runs):
+        _invoke(handler, event)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(
+        stat.size_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.size_diff > 0
+    )
+
+    return {
+        "path": scenario["path"],
+        "iterations": iterations,
+        "statuses": statuses,
+        "requests_per_sec": iterations / wall,
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "bytes_out": bytes_out,
+        "peak_traced_kb": peak / 1024,
+        "retained_kb_per_request": allocated / alloc_runs / 1024,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(iterations: int, warmup: int, only: Optional[list[str]] = None) -> dict:
+    commit = _git_commit()
+    app = load_app_module()
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        if only and name not in only:
+            continue
+        results[name] = run_scenario(app.handler, scenario, iterations, warmup)
+    return {
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scenarios": results,
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict] = None):
+    print(f"commit {report['commit']} (python {report['python']})")
+    header = f"{'scenario':20} {'status':>10} {'req/s':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'bytes':>10} {'KB/req':>7}"
+    if baseline:
+        header += f" {'p50 vs ' + baseline['commit']:>16}"
+    print(header)
+    for name, result in report["scenarios"].items():
+        status = ",".join(result["statuses"])
+        line = (
+            f"{name:20} {status:>10} {result['requests_per_sec']:9.0f} "
+            f"{result['p50_ms']:7.3f} {result['p95_ms']:7.3f} {result['p99_ms']:7.3f} "
+            f"{result['bytes_out']:10,} {result['retained_kb_per_request']:7.1f}"
+        )
+        if baseline and (old := baseline["scenarios"].get(name)):
+            change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            line += f" {change:+15.1f}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", nargs="*", choices=SCENARIOS)
+    parser.add_argument("--output", type=Path, help="where to write the JSON results")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare against")
+    args = parser.parse_args()
+    # resolve paths before load_app_module() changes the working directory
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    output = args.output.resolve() if args.output else None
+
+    report = run(args.iterations, args.warmup, args.only)
+    output = output or RESULTS_DIR / f"{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print_report(report, baseline)
+    print(f"results written to {output}")
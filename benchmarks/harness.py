@@ -0,0 +1,111 @@
+"""Helpers for driving the lambda ``handler`` in-process with Function URL events."""
+
+import base64
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+LAMBDA_DIR = Path(__file__).parent.parent / "lambda"
+
+
+def load_app_module():
+    """Import ``lambda/app.py`` the way the Lambda runtime does (cwd = asset root)."""
+    os.chdir(LAMBDA_DIR)
+    if str(LAMBDA_DIR) not in sys.path:
+        sys.path.insert(0, str(LAMBDA_DIR))
+    os.environ.setdefault("DYNAMODB_TABLE", "benchmark-table")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    # one EMF line per request would swamp the benchmark output
+    os.environ.setdefault("METRICS_EMF", "0")
+    import app
+
+    # Per-request logging (app and mangum) would dominate the timings; failing
+    # routes show up as 500s in the results rather than as tracebacks
+    logging.disable(logging.ERROR)
+    return app
+
+
+class FakeContext:
+    function_name = "benchmark"
+    function_version = "$LATEST"
+    memory_limit_in_mb = 1024
+    aws_request_id = "00000000-0000-0000-0000-000000000000"
+
+    def get_remaining_time_in_millis(self):
+        return 45_000
+
+
+def function_url_event(
+    path: str,
+    method: str = "GET",
+    query: str = "",
+    headers: Optional[dict] = None,
+    body: Optional[bytes] = None,
+) -> dict:
+    """Build a Lambda Function URL (payload format 2.0) event."""
+    headers = {
+        "host": "abcdefg.lambda-url.us-east-1.on.aws",
+        "user-agent": "benchmark",
+        "accept-encoding": "gzip, deflate, br",
+        **(headers or {}),
+    }
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": query,
+        "headers": headers,
+        "requestContext": {
+            "accountId": "anonymous",
+            "apiId": "abcdefg",
+            "domainName": headers["host"],
+            "domainPrefix": "abcdefg",
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": headers["user-agent"],
+            },
+            "requestId": "benchmark",
+            "routeKey": "$default",
+            "stage": "$default",
+            "time": "01/Jan/2024:00:00:00 +0000",
+            "timeEpoch": 1704067200000,
+        },
+        "body": base64.b64encode(body).decode() if body else None,
+        "isBase64Encoded": bool(body),
+    }
+
+
+def response_body(response: dict) -> bytes:
+    body = response.get("body") or ""
+    if response.get("isBase64Encoded"):
+        return base64.b64decode(body)
+    return body.encode()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def time_invocations(handler, event: dict, iterations: int) -> dict:
+    """Invoke ``handler`` repeatedly and summarise latencies in milliseconds."""
+    context = FakeContext()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        handler(event, context)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+    }
@@ -0,0 +1,76 @@
+"""First-request latency per route in a fresh container, with and without a warm-up.
+
+Each run is a new interpreter (as in ``cold_start``) that imports the app and
+then invokes the handler once per route, in order. With ``warm`` it first
+invokes ``/api/_warm`` the way the keep-warm schedule does, and that time is
+reported separately: it is paid before any user request arrives.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import LAMBDA_DIR, percentile
+
+ROUTES = [
+    "/pyodide",
+    "/streamlitdemos/placeholderDemo",
+    "/streamlitdemos/files/api_demo_lib.py",
+    "/api/tables/sample",
+]
+
+_RUN_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {repo_root!r})
+from benchmarks.harness import FakeContext, function_url_event, load_app_module
+
+app = load_app_module()
+timings = {{}}
+for path, method in {requests!r}:
+    start = time.perf_counter()
+    response = app.handler(function_url_event(path, method=method), FakeContext())
+    assert response["statusCode"] == 200, (path, response["statusCode"])
+    timings[path] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def run_once(warm: bool) -> dict[str, float]:
+    requests = [(path, "GET") for path in ROUTES]
+    if warm:
+        requests.insert(0, ("/api/_warm", "POST"))
+    snippet = _RUN_SNIPPET.format(repo_root=str(LAMBDA_DIR.parent), requests=requests)
+    output = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=LAMBDA_DIR,
+        env={**os.environ, "METRICS_EMF": "0"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int):
+    samples = {
+        mode: [run_once(mode == "warm") for _ in range(runs)]
+        for mode in ("cold", "warm")
+    }
+    print(f"{'route':40} {'cold p50 ms':>12} {'warmed p50 ms':>14}")
+    for path in ["/api/_warm", *ROUTES]:
+        cold = [run[path] for run in samples["cold"] if path in run]
+        warm = [run[path] for run in samples["warm"]]
+        print(
+            f"{path:40} "
+            f"{percentile(cold, 50) if cold else float('nan'):12.2f} "
+            f"{percentile(warm, 50):14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.runs)
@@ -0,0 +1,102 @@
+"""Peak RSS of serving a large static file through the Mangum handler.
+
+Each scenario runs in a fresh interpreter so ``ru_maxrss`` reflects only that
+request pattern. By default the file is a random ``--size-mb`` fixture written
+to a temporary directory and registered under FIXTURE_ROUTE for the run; pass
+a route (e.g. ``/flet/canvaskit/canvaskit.wasm`` after ``invoke
+build-flet-web-app``) to measure a real asset instead.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.harness import (
+    FakeContext,
+    function_url_event,
+    load_app_module,
+    response_body,
+)
+
+SCENARIOS = {
+    "full": {"accept-encoding": "identity"},
+    "first-1mb": {"accept-encoding": "identity", "range": "bytes=0-1048575"},
+    "last-64kb": {"accept-encoding": "identity", "range": "bytes=-65536"},
+}
+
+FIXTURE_ROUTE = "/flet/benchmark-fixture.wasm"
+
+
+def write_fixture(directory: Path, size_mb: int) -> Path:
+    # Random bytes, so no compression along the way can shrink the response
+    path = directory / "benchmark-fixture.wasm"
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+    return path
+
+
+def run_scenario(route: str, scenario: str, fixture: Optional[str] = None):
+    app = load_app_module()
+    if fixture:
+        app._get_assets().add_file(route, fixture)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    response = app.handler(
+        function_url_event(route, headers=SCENARIOS[scenario]), FakeContext()
+    )
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        json.dumps(
+            {
+                "scenario": scenario,
+                "status": response["statusCode"],
+                "bytes": len(response_body(response)),
+                "peak_rss_mb": peak_kb / 1024,
+                "request_rss_mb": (peak_kb - baseline_kb) / 1024,
+            }
+        )
+    )
+
+
+def run_all(route: str, fixture: Optional[Path] = None):
+    print(f"{'scenario':12} {'status':>6} {'bytes':>12} {'peak MB':>9} {'delta MB':>9}")
+    for scenario in SCENARIOS:
+        command = [sys.executable, "-m", "benchmarks.large_file", route]
+        command += ["--scenario", scenario]
+        if fixture is not None:
+            command += ["--fixture", str(fixture)]
+        output = subprocess.run(
+            command, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{scenario:12} {result['status']:>6} {result['bytes']:>12,} "
+            f"{result['peak_rss_mb']:9.1f} {result['request_rss_mb']:9.1f}"
+        )
+
+
+def main(route: Optional[str], size_mb: int):
+    if route:
+        run_all(route)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        run_all(FIXTURE_ROUTE, write_fixture(Path(directory), size_mb))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("route", nargs="?")
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--scenario", choices=SCENARIOS)
+    parser.add_argument("--fixture", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.scenario:
+        run_scenario(args.route or FIXTURE_ROUTE, args.scenario, args.fixture)
+    else:
+        main(args.route, args.size_mb)
@@ -0,0 +1,67 @@
+"""Per-request overhead of the old BaseHTTPMiddleware logger vs MetricsMiddleware.
+
+Both are measured on an otherwise empty FastAPI app behind Mangum, so the
+difference between each row and "none" is the middleware's own cost.
+"""
+
+import argparse
+import logging
+
+from fastapi import FastAPI
+from mangum import Mangum
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from benchmarks.harness import function_url_event, load_app_module, time_invocations
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The middleware lambda/app.py used before request_metrics replaced it."""
+
+    async def dispatch(self, request: Request, call_next):
+        logger.info(f"Incoming request: {request.method} {request.url}")
+        response = await call_next(request)
+        logger.info(f"Response status: {response.status_code}")
+        return response
+
+
+logger = logging.getLogger("benchmarks.middleware")
+
+
+def _build_handler(middleware: str) -> Mangum:
+    from request_metrics import MetricsMiddleware, MetricsRecorder
+
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def api_ping():
+        return "pong"
+
+    if middleware == "legacy":
+        app.add_middleware(LegacyLoggingMiddleware)
+    elif middleware == "metrics":
+        app.add_middleware(
+            MetricsMiddleware, recorder=MetricsRecorder(), emit_emf=False
+        )
+    return Mangum(app, lifespan="off")
+
+
+def main(iterations: int):
+    # puts lambda/ on sys.path for request_metrics
+    load_app_module()
+    event = function_url_event("/api/ping")
+    print(f"{'middleware':12} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for middleware in ("none", "legacy", "metrics"):
+        handler = _build_handler(middleware)
+        time_invocations(handler, event, 50)
+        result = time_invocations(handler, event, iterations)
+        print(
+            f"{middleware:12} {result['mean_ms']:8.3f} {result['p50_ms']:8.3f} "
+            f"{result['p99_ms']:8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    main(parser.parse_args().iterations)
@@ -0,0 +1,40 @@
+"""Warm-request latency for the static file routes.
+
+Run with ``invoke bench-static`` (or ``python -m benchmarks.static_assets``).
+"""
+
+import argparse
+
+from benchmarks.harness import (
+    FakeContext,
+    function_url_event,
+    load_app_module,
+    time_invocations,
+)
+
+ROUTES = [
+    "/pyodide",
+    "/pyodide2",
+    "/streamlit",
+    "/streamlit_app.py",
+    "/streamlitdemos/files/api_demo_lib.py",
+    "/flet",
+    "/flet/main.dart.js",
+]
+
+
+def main(iterations: int = 500):
+    app = load_app_module()
+    print(f"{'route':45} {'p50 ms':>8} {'p99 ms':>8}")
+    for route in ROUTES:
+        event = function_url_event(route)
+        # Prime the container the way the first real request would
+        app.handler(event, FakeContext())
+        result = time_invocations(app.handler, event, iterations)
+        print(f"{route:45} {result['p50_ms']:8.3f} {result['p99_ms']:8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--iterations", type=int, default=500)
+    main(parser.parse_args().iterations)
@@ -0,0 +1,61 @@
+"""A local stand-in for cdn.jsdelivr.net with configurable latency.
+
+Serves a vendored runtime directory (``invoke vendor-runtime`` output) under the
+jsDelivr URL layout, so page startup can be compared locally between
+same-origin ``/vendor`` assets and CDN fetches::
+
+    python -m benchmarks.stub_cdn --latency-ms 80 &
+    invoke serve-local --cdn-base http://localhost:8081
+"""
+
+import argparse
+import mimetypes
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmarks.harness import LAMBDA_DIR
+
+_ROUTES = [
+    (re.compile(r"^/pyodide/(v[^/]+)/full/(.+)$"), "pyodide/{0}/{1}"),
+    (re.compile(r"^/npm/@stlite/mountable@([^/]+)/build/(.+)$"), "stlite/{0}/{1}"),
+]
+
+
+def make_handler(root: Path, latency_s: float):
+    class StubCdnHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_s)
+            path = self.path.split("?")[0]
+            for pattern, template in _ROUTES:
+                if match := pattern.match(path):
+                    target = root / template.format(*match.groups())
+                    if target.is_file():
+                        body = target.read_bytes()
+                        self.send_response(200)
+                        content_type, _ = mimetypes.guess_type(target.name)
+                        self.send_header(
+                            "Content-Type", content_type or "application/octet-stream"
+                        )
+                        self.send_header("Content-Length", str(len(body)))
+                        self.send_header("Access-Control-Allow-Origin", "*")
+                        self.end_headers()
+                        self.wfile.write(body)
+                        return
+            self.send_error(404)
+
+    return StubCdnHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--root", type=Path, default=LAMBDA_DIR / "vendor")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port), make_handler(args.root, args.latency_ms / 1000)
+    )
+    print(f"stub CDN on http://127.0.0.1:{args.port} serving {args.root}")
+    server.serve_forever()
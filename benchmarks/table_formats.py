@@ -0,0 +1,95 @@
+"""JSON vs Arrow IPC vs Parquet for ``/api/tables/sample`` through the Mangum handler.
+
+For each row count and format this reports the payload size before and after
+GZipMiddleware, the handler time (serialisation, compression, base64) and the
+client-side decode time into a pandas DataFrame, which is what a Pyodide page
+pays for on every response. Function URLs cap responses at 6 MB, so the larger
+JSON payloads here show why they do not scale rather than what a deployed
+function could return.
+"""
+
+import argparse
+import gzip
+import statistics
+import time
+
+from benchmarks.harness import (
+    FakeContext,
+    function_url_event,
+    load_app_module,
+    response_body,
+)
+
+ACCEPT = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def decode(fmt: str, body: bytes):
+    import json
+
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == "arrow":
+        with pa.ipc.open_stream(pa.py_buffer(body)) as reader:
+            return reader.read_pandas()
+    if fmt == "parquet":
+        return pq.read_table(pa.BufferReader(body)).to_pandas()
+    return pd.DataFrame.from_records(json.loads(body))
+
+
+def measure(app, rows: int, fmt: str, repeats: int) -> dict:
+    event = function_url_event(
+        "/api/tables/sample",
+        query=f"rows={rows}",
+        headers={"accept": ACCEPT[fmt], "accept-encoding": "gzip"},
+    )
+    handler_ms, decode_ms = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = app.handler(event, FakeContext())
+        handler_ms.append((time.perf_counter() - start) * 1000)
+        assert response["statusCode"] == 200, response["body"][:200]
+
+        wire = response_body(response)
+        start = time.perf_counter()
+        raw = wire
+        if response["headers"].get("content-encoding") == "gzip":
+            raw = gzip.decompress(wire)
+        df = decode(fmt, raw)
+        decode_ms.append((time.perf_counter() - start) * 1000)
+        assert len(df) == rows
+    return {
+        "raw_bytes": len(raw),
+        "wire_bytes": len(wire),
+        "handler_ms": statistics.median(handler_ms),
+        "decode_ms": statistics.median(decode_ms),
+    }
+
+
+def main(row_counts: list[int], repeats: int):
+    app = load_app_module()
+    print(
+        f"{'rows':>9} {'format':8} {'raw bytes':>13} {'wire bytes':>12} "
+        f"{'handler ms':>11} {'decode ms':>10}"
+    )
+    for rows in row_counts:
+        for fmt in ACCEPT:
+            result = measure(app, rows, fmt, repeats)
+            print(
+                f"{rows:>9,} {fmt:8} {result['raw_bytes']:>13,} "
+                f"{result['wire_bytes']:>12,} {result['handler_ms']:11.1f} "
+                f"{result['decode_ms']:10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="10000,100000,1000000")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    main([int(rows) for rows in args.rows.split(",")], args.repeats)
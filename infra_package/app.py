@@ -1,16 +1,52 @@
 #!/usr/bin/env python3
+from pathlib import Path
 
 import aws_cdk as cdk
 from aws_cdk import (
     Stack,
+    aws_cloudfront,
+    aws_cloudfront_origins,
+    aws_events,
+    aws_events_targets,
     aws_lambda,
     aws_dynamodb,
 )
 from constructs import Construct
 
+LAMBDA_DIR = Path(__file__).parent.parent.absolute() / "lambda"
+
+# Routes that only ever serve files shipped with the function; cached at the edge
+STATIC_PATH_PATTERNS = [
+    "/flet/*",
+    "/pyodide*",
+    "/streamlitdemos/files/*",
+    "/vendor/*",
+    "/favicon.ico",
+]
+
+# With CloudFront in front, let the edge keep unversioned pages and assets for a
+# minute while browsers still revalidate every time (see STATIC_CACHE_CONTROL in
+# lambda/app.py). These names do not change between deploys, so a longer edge
+# TTL would keep serving the old HTML; only ?v= URLs are cached long-term.
+EDGE_STATIC_CACHE_CONTROL = "public, max-age=0, s-maxage=60"
+
+# Route the keep-warm schedule runs: the function maps EventBridge's scheduled
+# events onto it (see ScheduledWarmEvent in lambda/app.py)
+KEEP_WARM_PATH = "/api/_warm"
+
 
 class BasicAppStack(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        enable_cloudfront: bool = False,
+        slim_package: bool = False,
+        zip_site_packages: bool = False,
+        keep_warm_minutes: int = 0,
+        provisioned_concurrency: int = 0,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
         # Define multiple API keys
@@ -25,37 +61,72 @@ class BasicAppStack(Stack):
                 name="sk", type=aws_dynamodb.AttributeType.STRING
             ),
             billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            # Expiry for kv_cache entries; items without it never expire
+            time_to_live_attribute="expires_at",
             removal_policy=cdk.RemovalPolicy.DESTROY,
             # Optional: allows the table to be deleted when the stack is destroyed
         )
 
         # Define the Lambda function
+        if slim_package:
+            # Pruned, precompiled build (see package_lambda.py); this directory
+            # is mounted so the script runs with the image's Python
+            bundling_command = (
+                "python /infra/package_lambda.py --source /asset-input"
+                " --output /asset-output --report /infra/lambda-package-report.json"
+                + (" --zip-site-packages" if zip_site_packages else "")
+            )
+            bundling_volumes = [
+                cdk.DockerVolume(
+                    host_path=str(Path(__file__).parent.absolute()),
+                    container_path="/infra",
+                )
+            ]
+        else:
+            bundling_command = """
+                        pip install -r requirements.txt -t /asset-output &&
+                        cp -au . /asset-output
+                        """
+            bundling_volumes = []
         lambda_function = aws_lambda.Function(
             self,
             "ApiHandlerFunction",
             runtime=aws_lambda.Runtime.PYTHON_3_10,
             handler="app.handler",
             code=aws_lambda.Code.from_asset(
-                "../lambda",
+                str(LAMBDA_DIR),
                 bundling={
                     "image": aws_lambda.Runtime.PYTHON_3_10.bundling_image,
                     "platform": "linux/arm64",
-                    "command": [
-                        "bash",
-                        "-c",
-                        """
-                        pip install -r requirements.txt -t /asset-output &&
-                        cp -au . /asset-output
-                        """,
-                    ],
+                    "command": ["bash", "-c", bundling_command],
+                    "volumes": bundling_volumes,
                 },
             ),
             timeout=cdk.Duration.seconds(45),
             environment={"DYNAMODB_TABLE": table.table_name},
         )
+        if enable_cloudfront:
+            lambda_function.add_environment(
+                "STATIC_CACHE_CONTROL", EDGE_STATIC_CACHE_CONTROL
+            )
+
+        # Provisioned concurrency needs a published version; the alias then
+        # takes the Function URL so requests actually reach the warm
+        # environments (switching this on changes the URL)
+        url_target: aws_lambda.IFunction = lambda_function
+        if provisioned_concurrency:
+            url_target = aws_lambda.Alias(
+                self,
+                "LiveAlias",
+                alias_name="live",
+                version=lambda_function.current_version,
+                provisioned_concurrent_executions=provisioned_concurrency,
+            )
+        if keep_warm_minutes:
+            self.add_keep_warm_schedule(url_target, keep_warm_minutes)
 
         # Add the Function URL
-        function_url = lambda_function.add_function_url(
+        function_url = url_target.add_function_url(
             auth_type=aws_lambda.FunctionUrlAuthType.NONE,  # We're handling auth in code
             cors=aws_lambda.FunctionUrlCorsOptions(
                 allowed_origins=["*"],
@@ -67,7 +138,117 @@ class BasicAppStack(Stack):
         # Output the Function URL
         cdk.CfnOutput(self, "FunctionUrl", value=function_url.url)
 
+        if enable_cloudfront:
+            self.add_distribution(function_url)
+
+    def add_keep_warm_schedule(self, target: aws_lambda.IFunction, minutes: int):
+        """Ping /api/_warm every ``minutes``, keeping one environment initialized."""
+        aws_events.Rule(
+            self,
+            "KeepWarmSchedule",
+            description=f"Keep-warm ping to {KEEP_WARM_PATH}",
+            schedule=aws_events.Schedule.rate(cdk.Duration.minutes(minutes)),
+            targets=[aws_events_targets.LambdaFunction(target, retry_attempts=0)],
+        )
+
+    def add_distribution(self, function_url: aws_lambda.FunctionUrl):
+        """CloudFront in front of the Function URL: static routes cached, /api/* not."""
+        origin = aws_cloudfront_origins.FunctionUrlOrigin(function_url)
+
+        # Only ?v= (the content-hash version) distinguishes static objects; the
+        # encoding is part of the key so each compressed variant is cached apart.
+        # TTLs follow the function's Cache-Control: a year for ?v= URLs, a
+        # minute for the rest, nothing for a response that does not say.
+        static_cache_policy = aws_cloudfront.CachePolicy(
+            self,
+            "StaticAssetsCachePolicy",
+            comment="Static assets served by the function, cached per Cache-Control",
+            min_ttl=cdk.Duration.seconds(0),
+            default_ttl=cdk.Duration.seconds(0),
+            max_ttl=cdk.Duration.days(365),
+            query_string_behavior=aws_cloudfront.CacheQueryStringBehavior.allow_list(
+                "v"
+            ),
+            header_behavior=aws_cloudfront.CacheHeaderBehavior.none(),
+            cookie_behavior=aws_cloudfront.CacheCookieBehavior.none(),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True,
+        )
+        static_behavior = aws_cloudfront.BehaviorOptions(
+            origin=origin,
+            cache_policy=static_cache_policy,
+            compress=True,
+            viewer_protocol_policy=aws_cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+            allowed_methods=aws_cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+        )
+        # Pages and demos: cached only as long as the function's own
+        # Cache-Control allows, and revalidated by ETag otherwise. Like the
+        # managed UseOriginCacheControlHeaders-QueryStrings policy, but without
+        # Host in the key: CloudFront forwards every cache-key header, and the
+        # Function URL rejects a forwarded viewer Host header.
+        page_cache_policy = aws_cloudfront.CachePolicy(
+            self,
+            "PagesCachePolicy",
+            comment="Pages served by the function, cached per Cache-Control",
+            min_ttl=cdk.Duration.seconds(0),
+            default_ttl=cdk.Duration.seconds(0),
+            max_ttl=cdk.Duration.days(365),
+            query_string_behavior=aws_cloudfront.CacheQueryStringBehavior.all(),
+            header_behavior=aws_cloudfront.CacheHeaderBehavior.none(),
+            cookie_behavior=aws_cloudfront.CacheCookieBehavior.none(),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True,
+        )
+        page_behavior = aws_cloudfront.BehaviorOptions(
+            origin=origin,
+            cache_policy=page_cache_policy,
+            origin_request_policy=aws_cloudfront.OriginRequestPolicy.ALL_VIEWER_EXCEPT_HOST_HEADER,
+            compress=True,
+            viewer_protocol_policy=aws_cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+        )
+        # The Function URL rejects a forwarded viewer Host header
+        api_behavior = aws_cloudfront.BehaviorOptions(
+            origin=origin,
+            cache_policy=aws_cloudfront.CachePolicy.CACHING_DISABLED,
+            origin_request_policy=aws_cloudfront.OriginRequestPolicy.ALL_VIEWER_EXCEPT_HOST_HEADER,
+            viewer_protocol_policy=aws_cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+            allowed_methods=aws_cloudfront.AllowedMethods.ALLOW_ALL,
+        )
+
+        distribution = aws_cloudfront.Distribution(
+            self,
+            "Distribution",
+            comment="Pyodide Lambda app",
+            default_behavior=page_behavior,
+            additional_behaviors={
+                "/api/*": api_behavior,
+                **{pattern: static_behavior for pattern in STATIC_PATH_PATTERNS},
+            },
+            http_version=aws_cloudfront.HttpVersion.HTTP2_AND_3,
+            price_class=aws_cloudfront.PriceClass.PRICE_CLASS_100,
+        )
+        cdk.CfnOutput(
+            self,
+            "DistributionUrl",
+            value=f"https://{distribution.distribution_domain_name}",
+        )
+
 
-app = cdk.App()
-BasicAppStack(app, "PyodideLambdaDeploy")
-app.synth()
+if __name__ == "__main__":
+    app = cdk.App()
+    BasicAppStack(
+        app,
+        "PyodideLambdaDeploy",
+        # cdk deploy -c cloudfront=true (or `invoke deploy-infra --cloudfront`)
+        enable_cloudfront=str(app.node.try_get_context("cloudfront")).lower() == "true",
+        # cdk deploy -c slim_package=true [-c zip_site_packages=true]
+        slim_package=str(app.node.try_get_context("slim_package")).lower() == "true",
+        zip_site_packages=str(app.node.try_get_context("zip_site_packages")).lower()
+        == "true",
+        # cdk deploy -c keep_warm_minutes=5 -c provisioned_concurrency=1
+        keep_warm_minutes=int(app.node.try_get_context("keep_warm_minutes") or 0),
+        provisioned_concurrency=int(
+            app.node.try_get_context("provisioned_concurrency") or 0
+        ),
+    )
+    app.synth()
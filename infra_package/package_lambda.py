@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Build a slim, precompiled deployment package for the Lambda function.
+
+Runs inside the CDK bundling image (so the ``.pyc`` files match the function's
+Python) or locally through ``invoke package-lambda``. Compared to a plain
+``pip install -t`` plus a copy of ``lambda/`` it:
+
+- drops distributions the Lambda Python runtime already provides (boto3 & co),
+- strips tests, headers, stubs, caches and most of ``*.dist-info``,
+- precompiles every module to unchecked-hash ``.pyc`` files, since
+  ``/var/task`` is read-only and nothing compiled at runtime is ever kept,
+- optionally moves pure-Python packages into ``site-packages.zip`` for zipimport,
+
+and writes a report of package size and import time per top-level dependency.
+Standard library only.
+"""
+
+import argparse
+import compileall
+import importlib.util
+import json
+import os
+import py_compile
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+# Already on the Lambda Python runtime's path; shipping them only adds size
+RUNTIME_PROVIDED = {"boto3", "botocore", "s3transfer", "jmespath"}
+
+SITE_PACKAGES_ZIP = "site-packages.zip"
+
+# Files from lambda/ that are only used at build time or locally
+APP_EXCLUDE = {
+    "requirements.txt",
+    "__pycache__",
+    "streamlit_demoapps/api_demo_local.html",
+}
+
+STRIP_DIRS = {"tests", "test", "__pycache__", "include", "benchmarks"}
+# Console scripts pip writes next to the packages; nothing in Lambda runs them
+STRIP_TOP_LEVEL = {"bin"}
+STRIP_SUFFIXES = {".pyi", ".pyx", ".pxd", ".pxi", ".c", ".cc", ".cpp", ".h", ".hpp"}
+# The only parts of *.dist-info anything reads at runtime (importlib.metadata)
+KEEP_DIST_INFO = {"METADATA", "entry_points.txt", "top_level.txt"}
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _dist_name(dist_info: Path) -> str:
+    for line in (dist_info / "METADATA").read_text(errors="replace").splitlines():
+        if line.startswith("Name:"):
+            return _normalize(line.split(":", 1)[1].strip())
+    return _normalize(dist_info.name.split("-")[0])
+
+
+def _size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def pip_install(requirements: Path, target: Path):
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--quiet",
+            "--no-compile",
+            "--disable-pip-version-check",
+            "-r",
+            str(requirements),
+            "-t",
+            str(target),
+        ],
+        check=True,
+    )
+
+
+def prune_runtime_provided(site_packages: Path) -> list[str]:
+    """Remove every file of the RUNTIME_PROVIDED distributions (by their RECORD)."""
+    removed = []
+    for dist_info in sorted(site_packages.glob("*.dist-info")):
+        if (name := _dist_name(dist_info)) not in RUNTIME_PROVIDED:
+            continue
+        for line in (dist_info / "RECORD").read_text().splitlines():
+            relative = line.split(",")[0]
+            (site_packages / relative).unlink(missing_ok=True)
+        shutil.rmtree(dist_info, ignore_errors=True)
+        removed.append(name)
+    # Package directories left holding nothing but empty subdirectories
+    for directory in sorted(site_packages.rglob("*"), reverse=True):
+        if directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
+
+
+def strip(site_packages: Path) -> int:
+    """Delete files no import needs; returns the bytes saved."""
+    saved = 0
+    for name in STRIP_TOP_LEVEL:
+        if (site_packages / name).is_dir():
+            saved += _size(site_packages / name)
+            shutil.rmtree(site_packages / name)
+    for root, dir_names, file_names in os.walk(site_packages, topdown=True):
+        root = Path(root)
+        if root.name.endswith(".dist-info"):
+            for name in file_names:
+                if name not in KEEP_DIST_INFO:
+                    saved += (root / name).stat().st_size
+                    (root / name).unlink()
+            for name in dir_names:
+                saved += _size(root / name)
+                shutil.rmtree(root / name)
+            dir_names.clear()
+            continue
+        for name in [d for d in dir_names if d in STRIP_DIRS]:
+            saved += _size(root / name)
+            shutil.rmtree(root / name)
+            dir_names.remove(name)
+        for name in file_names:
+            if Path(name).suffix in STRIP_SUFFIXES:
+                saved += (root / name).stat().st_size
+                (root / name).unlink()
+    return saved
+
+
+def copy_app(source: Path, output: Path):
+    def ignore(directory, names):
+        relative = Path(directory).relative_to(source)
+        return {
+            name
+            for name in names
+            if name in APP_EXCLUDE or (relative / name).as_posix() in APP_EXCLUDE
+        }
+
+    shutil.copytree(source, output, ignore=ignore, dirs_exist_ok=True)
+
+
+def _has_extension_modules(path: Path) -> bool:
+    if path.is_file():
+        return path.suffix in (".so", ".pyd")
+    return any(p.suffix in (".so", ".pyd") for p in path.rglob("*"))
+
+
+def zip_pure_python(site_packages: Path, output: Path) -> list[str]:
+    """Move top-level packages without extension modules into site-packages.zip.
+
+    zipimport cannot load ``.so`` files, so those packages (and their
+    dist-info) stay on disk. Modules are stored uncompressed next to legacy
+    ``.pyc`` files, which is the layout zipimport looks for.
+    """
+    zipped = []
+    with zipfile.ZipFile(output / SITE_PACKAGES_ZIP, "w", zipfile.ZIP_STORED) as zf:
+        for top_level in sorted(site_packages.iterdir()):
+            if top_level.name.endswith(".dist-info") or _has_extension_modules(
+                top_level
+            ):
+                continue
+            if top_level.suffix not in ("", ".py"):
+                continue
+            # zipimport has no support for namespace packages (no __init__.py)
+            if top_level.is_dir() and not (top_level / "__init__.py").exists():
+                continue
+            files = [top_level] if top_level.is_file() else sorted(top_level.rglob("*"))
+            for path in files:
+                if path.is_dir() or "__pycache__" in path.parts:
+                    continue
+                arcname = path.relative_to(site_packages).as_posix()
+                zf.write(path, arcname)
+                if path.suffix == ".py":
+                    compiled = py_compile.compile(
+                        str(path),
+                        cfile=str(path) + "c",
+                        dfile=arcname,
+                        doraise=True,
+                        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                    )
+                    zf.write(compiled, arcname + "c")
+                    os.unlink(compiled)
+            if top_level.is_dir():
+                shutil.rmtree(top_level)
+            else:
+                top_level.unlink()
+            zipped.append(top_level.name)
+    return zipped
+
+
+def precompile(output: Path):
+    compileall.compile_dir(
+        str(output),
+        quiet=1,
+        workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+
+def _import_name(top_level: Path) -> str:
+    return top_level.name.removesuffix(".py").split(".")[0]
+
+
+def _runtime_provided_dir() -> Path:
+    """Directory linking only the RUNTIME_PROVIDED packages from this environment.
+
+    Imports are measured with ``-S`` so nothing missing from the package is
+    silently found in the local site-packages; these few stand in for the
+    copies the Lambda runtime has.
+    """
+    directory = Path(tempfile.mkdtemp(prefix="runtime-provided-"))
+    for name in sorted(RUNTIME_PROVIDED):
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.submodule_search_locations:
+            (directory / name).symlink_to(spec.submodule_search_locations[0])
+    return directory
+
+
+def measure_import(
+    output: Path, module: str, runtime_dir: Path, runs: int = 3
+) -> Optional[float]:
+    """Best-of-``runs`` cold import time in ms, each in a fresh interpreter."""
+    search_path = [str(output), str(output / SITE_PACKAGES_ZIP), str(runtime_dir)]
+    code = (
+        "import sys, time\n"
+        f"sys.path[:0] = {search_path!r}\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-S", "-c", code], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"import {module} failed:\n{result.stderr.strip()}", file=sys.stderr)
+            return None
+        elapsed = float(result.stdout.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(output: Path, top_levels: list[Path], zipped: list[str], pruned: list[str]):
+    dependencies = {}
+    for top_level in top_levels:
+        if top_level.name.endswith(".dist-info") or top_level.name.startswith("_"):
+            continue
+        if top_level.suffix not in ("", ".py"):
+            continue
+        dependencies[_import_name(top_level)] = {"bytes": _size(top_level)}
+    if zipped:
+        with zipfile.ZipFile(output / SITE_PACKAGES_ZIP) as zf:
+            for info in zf.infolist():
+                name = _import_name(Path(info.filename.split("/")[0]))
+                entry = dependencies.setdefault(name, {"bytes": 0})
+                entry["bytes"] += info.file_size
+                entry["zipped"] = True
+    runtime_dir = _runtime_provided_dir()
+    for name, entry in dependencies.items():
+        entry["import_ms"] = measure_import(output, name, runtime_dir)
+    shutil.rmtree(runtime_dir)
+    return {
+        "python": sys.version.split()[0],
+        "package_bytes": _size(output),
+        "pruned": pruned,
+        "zipped": zipped,
+        "dependencies": dependencies,
+    }
+
+
+def print_report(result: dict):
+    print(f"Package: {result['package_bytes']:,} bytes (Python {result['python']})")
+    if result["pruned"]:
+        print(f"Pruned (provided by the runtime): {', '.join(result['pruned'])}")
+    print(f"{'dependency':28} {'bytes':>14} {'import ms':>10}")
+    for name, entry in sorted(
+        result["dependencies"].items(), key=lambda item: -item[1]["bytes"]
+    ):
+        zipped = " (zip)" if entry.get("zipped") else ""
+        import_ms = entry["import_ms"]
+        import_ms = "failed" if import_ms is None else f"{import_ms:.1f}"
+        print(f"{name + zipped:28} {entry['bytes']:>14,} {import_ms:>10}")
+
+
+def build(
+    source: Path,
+    output: Path,
+    zip_site_packages: bool = False,
+    report_path: Path = None,
+) -> dict:
+    output.mkdir(parents=True, exist_ok=True)
+    # Dependencies go straight into the package root (on sys.path in Lambda);
+    # a scratch directory keeps them apart from the app until they are sorted.
+    # It is a fresh temp dir: next to the output it would land in / when
+    # bundling into /asset-output, and two builds would share it.
+    site_packages = Path(tempfile.mkdtemp(prefix="site-packages-"))
+
+    start = time.perf_counter()
+    try:
+        pip_install(source / "requirements.txt", site_packages)
+        pruned = prune_runtime_provided(site_packages)
+        saved = strip(site_packages)
+        zipped = zip_pure_python(site_packages, output) if zip_site_packages else []
+
+        top_levels = []
+        for path in sorted(site_packages.iterdir()):
+            top_levels.append(output / path.name)
+            shutil.move(str(path), output / path.name)
+    finally:
+        shutil.rmtree(site_packages, ignore_errors=True)
+    copy_app(source, output)
+    precompile(output)
+
+    result = report(output, top_levels, zipped, pruned)
+    result["stripped_bytes"] = saved
+    result["build_seconds"] = round(time.perf_counter() - start, 1)
+
+    if report_path is not None:
+        report_path.write_text(json.dumps(result, indent=2))
+    print_report(result)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", type=Path, required=True)
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--zip-site-packages", action="store_true")
+    parser.add_argument("--report", type=Path)
+    args = parser.parse_args()
+    build(args.source, args.output, args.zip_site_packages, args.report)
@@ -0,0 +1,218 @@
+"""Synthesized-template checks for BasicAppStack; bundling is skipped, so no Docker."""
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Match, Template
+
+from infra_package.app import (
+    EDGE_STATIC_CACHE_CONTROL,
+    STATIC_PATH_PATTERNS,
+    BasicAppStack,
+)
+
+# Managed CloudFront policies the behaviours are expected to use
+CACHING_DISABLED = "4135ea2d-6df8-44a3-9df3-4b5a84be39ad"
+ALL_VIEWER_EXCEPT_HOST_HEADER = "b689b0a8-53d0-40ab-baf2-68738e2966ac"
+
+OPTION_SETS = {
+    "plain": {},
+    "cloudfront": {"enable_cloudfront": True},
+    "slim": {"slim_package": True, "zip_site_packages": True},
+    "keep-warm": {"keep_warm_minutes": 5},
+    "provisioned": {"provisioned_concurrency": 2, "enable_cloudfront": True},
+    "all": {
+        "enable_cloudfront": True,
+        "slim_package": True,
+        "keep_warm_minutes": 5,
+        "provisioned_concurrency": 1,
+    },
+}
+
+
+def synth(**options) -> Template:
+    app = cdk.App(context={"aws:cdk:bundling-stacks": []})
+    return Template.from_stack(BasicAppStack(app, "TestStack", **options))
+
+
+@pytest.fixture(params=OPTION_SETS.values(), ids=OPTION_SETS.keys())
+def stack(request):
+    return request.param, synth(**request.param)
+
+
+def only(template: Template, resource_type: str) -> tuple[str, dict]:
+    resources = template.find_resources(resource_type)
+    assert len(resources) == 1, resources
+    return next(iter(resources.items()))
+
+
+def test_function_url(stack):
+    options, template = stack
+    function_id, _ = only(template, "AWS::Lambda::Function")
+    url_properties = {
+        "AuthType": "NONE",
+        "TargetFunctionArn": {"Fn::GetAtt": [function_id, "Arn"]},
+    }
+    if options.get("provisioned_concurrency"):
+        url_properties["Qualifier"] = "live"
+    else:
+        url_properties["Qualifier"] = Match.absent()
+    template.has_resource_properties("AWS::Lambda::Url", url_properties)
+
+
+def test_distribution_only_when_enabled(stack):
+    options, template = stack
+    expected = 1 if options.get("enable_cloudfront") else 0
+    template.resource_count_is("AWS::CloudFront::Distribution", expected)
+    template.resource_count_is("AWS::CloudFront::CachePolicy", 2 * expected)
+    _, function = only(template, "AWS::Lambda::Function")
+    variables = function["Properties"]["Environment"]["Variables"]
+    if options.get("enable_cloudfront"):
+        assert variables["STATIC_CACHE_CONTROL"] == EDGE_STATIC_CACHE_CONTROL
+    else:
+        assert "STATIC_CACHE_CONTROL" not in variables
+
+
+def test_distribution_origin_is_the_function_url():
+    template = synth(enable_cloudfront=True)
+    url_id, _ = only(template, "AWS::Lambda::Url")
+    _, distribution = only(template, "AWS::CloudFront::Distribution")
+    (origin,) = distribution["Properties"]["DistributionConfig"]["Origins"]
+    # https://<id>.lambda-url.<region>.on.aws/ -> <id>.lambda-url.<region>.on.aws
+    assert origin["DomainName"] == {
+        "Fn::Select": [
+            2,
+            {"Fn::Split": ["/", {"Fn::GetAtt": [url_id, "FunctionUrl"]}]},
+        ]
+    }
+    assert origin["CustomOriginConfig"]["OriginProtocolPolicy"] == "https-only"
+
+
+def cache_policies(template: Template) -> tuple[dict, dict]:
+    """The (static, pages) cache policies as Ref -> resource, by their comments."""
+    policies = template.find_resources("AWS::CloudFront::CachePolicy")
+    by_comment = {
+        policy["Properties"]["CachePolicyConfig"]["Comment"].split()[0]: (
+            {"Ref": logical_id},
+            policy,
+        )
+        for logical_id, policy in policies.items()
+    }
+    return by_comment["Static"], by_comment["Pages"]
+
+
+def test_cache_behaviours():
+    template = synth(enable_cloudfront=True)
+    (static_ref, policy), (pages_ref, _) = cache_policies(template)
+    _, distribution = only(template, "AWS::CloudFront::Distribution")
+    config = distribution["Properties"]["DistributionConfig"]
+
+    behaviours = {b["PathPattern"]: b for b in config["CacheBehaviors"]}
+    assert set(behaviours) == {"/api/*", *STATIC_PATH_PATTERNS}
+    assert behaviours["/api/*"]["CachePolicyId"] == CACHING_DISABLED
+    assert behaviours["/api/*"]["OriginRequestPolicyId"] == (
+        ALL_VIEWER_EXCEPT_HOST_HEADER
+    )
+    assert "POST" in behaviours["/api/*"]["AllowedMethods"]
+    for pattern in STATIC_PATH_PATTERNS:
+        assert behaviours[pattern]["CachePolicyId"] == static_ref
+        assert behaviours[pattern]["AllowedMethods"] == ["GET", "HEAD"]
+    # pages and demos follow the function's own Cache-Control, and never send
+    # the viewer's Host on to the Function URL
+    default = config["DefaultCacheBehavior"]
+    assert default["CachePolicyId"] == pages_ref
+    assert default["OriginRequestPolicyId"] == ALL_VIEWER_EXCEPT_HOST_HEADER
+
+    policy_config = policy["Properties"]["CachePolicyConfig"]
+    key = policy_config["ParametersInCacheKeyAndForwardedToOrigin"]
+    assert key["QueryStringsConfig"] == {
+        "QueryStringBehavior": "whitelist",
+        "QueryStrings": ["v"],
+    }
+    assert key["EnableAcceptEncodingBrotli"] and key["EnableAcceptEncodingGzip"]
+
+
+def test_no_cache_key_forwards_the_viewer_host():
+    # cache-key headers always reach the origin, which rejects a viewer Host
+    template = synth(enable_cloudfront=True)
+    for _, policy in cache_policies(template):
+        policy_config = policy["Properties"]["CachePolicyConfig"]
+        key = policy_config["ParametersInCacheKeyAndForwardedToOrigin"]
+        assert key["HeadersConfig"] == {"HeaderBehavior": "none"}
+        assert key["CookiesConfig"] == {"CookieBehavior": "none"}
+    _, pages_policy = cache_policies(template)[1]
+    pages_key = pages_policy["Properties"]["CachePolicyConfig"][
+        "ParametersInCacheKeyAndForwardedToOrigin"
+    ]
+    assert pages_key["QueryStringsConfig"] == {"QueryStringBehavior": "all"}
+
+
+def test_edge_ttls_are_short_unless_versioned():
+    template = synth(enable_cloudfront=True)
+    for _, policy in cache_policies(template):
+        policy_config = policy["Properties"]["CachePolicyConfig"]
+        # nothing is cached without the function saying so; ?v= responses
+        # carry max-age=31536000, immutable and may stay that long
+        assert policy_config["DefaultTTL"] == 0
+        assert policy_config["MaxTTL"] == 365 * 24 * 3600
+
+    # unversioned pages and assets keep their names across deploys
+    directives = dict(
+        part.strip().partition("=")[::2]
+        for part in EDGE_STATIC_CACHE_CONTROL.split(",")
+    )
+    assert directives["max-age"] == "0"
+    assert int(directives["s-maxage"]) <= 300
+
+
+def test_no_schedule_or_alias_by_default():
+    template = synth()
+    template.resource_count_is("AWS::Events::Rule", 0)
+    template.resource_count_is("AWS::Lambda::Alias", 0)
+
+
+def test_keep_warm_schedule_targets_the_function():
+    template = synth(keep_warm_minutes=5)
+    function_id, _ = only(template, "AWS::Lambda::Function")
+    _, rule = only(template, "AWS::Events::Rule")
+    assert rule["Properties"]["ScheduleExpression"] == "rate(5 minutes)"
+    (target,) = rule["Properties"]["Targets"]
+    assert target["Arn"] == {"Fn::GetAtt": [function_id, "Arn"]}
+    assert target["RetryPolicy"] == {"MaximumRetryAttempts": 0}
+    # the function maps the plain scheduled event onto /api/_warm itself
+    assert "Input" not in target
+    template.has_resource_properties(
+        "AWS::Lambda::Permission",
+        {
+            "Action": "lambda:InvokeFunction",
+            "Principal": "events.amazonaws.com",
+            "FunctionName": {"Fn::GetAtt": [function_id, "Arn"]},
+        },
+    )
+
+
+def test_provisioned_concurrency_alias_takes_url_and_schedule():
+    template = synth(keep_warm_minutes=5, provisioned_concurrency=2)
+    function_id, _ = only(template, "AWS::Lambda::Function")
+    alias_id, alias = only(template, "AWS::Lambda::Alias")
+    assert alias["Properties"]["Name"] == "live"
+    assert alias["Properties"]["FunctionName"] == {"Ref": function_id}
+    assert alias["Properties"]["ProvisionedConcurrencyConfig"] == {
+        "ProvisionedConcurrentExecutions": 2
+    }
+    # a published version, not $LATEST
+    version_id, _ = only(template, "AWS::Lambda::Version")
+    assert alias["Properties"]["FunctionVersion"] == {
+        "Fn::GetAtt": [version_id, "Version"]
+    }
+
+    _, rule = only(template, "AWS::Events::Rule")
+    (target,) = rule["Properties"]["Targets"]
+    assert target["Arn"] == {"Ref": alias_id}
+    template.has_resource_properties(
+        "AWS::Lambda::Permission",
+        {"Principal": "events.amazonaws.com", "FunctionName": {"Ref": alias_id}},
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Permission",
+        {"Action": "lambda:InvokeFunctionUrl", "FunctionName": {"Ref": alias_id}},
+    )
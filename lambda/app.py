@@ -1,15 +1,68 @@
 import logging
-import mimetypes
 import os
-from pathlib import Path
+import sys
 
-from fastapi import FastAPI, HTTPException
+# Pure-Python dependencies zipped by `package_lambda.py --zip-site-packages`
+_SITE_PACKAGES_ZIP = os.path.join(os.path.dirname(__file__), "site-packages.zip")
+if os.path.exists(_SITE_PACKAGES_ZIP):
+    sys.path.append(_SITE_PACKAGES_ZIP)
+
+_PROFILE_STARTUP = os.environ.get("APP_PROFILE_STARTUP", "") not in ("", "0")
+if _PROFILE_STARTUP:
+    import startup_profile
+
+    startup_profile.enable()
+
+import hashlib
+import hmac
+import importlib
+import time
+from email.utils import formatdate
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi import Response
+from fastapi.responses import RedirectResponse, StreamingResponse
 from mangum import Mangum
-from simplesingletable import DynamoDbMemory
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
-from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware
+
+import arrow_exchange
+import batch_dispatch
+import dynamo_batch
+import kv_cache
+from demo_bundles import (
+    DEMO_NAME_PATTERN,
+    DemoBundle,
+    build_demo_bundles,
+    build_registered_bundle,
+)
+from request_metrics import (
+    MetricsMiddleware,
+    MetricsRecorder,
+    UncompressedSizeMiddleware,
+    record_timing,
+    request_metrics_state,
+)
+
+from runtime_assets import (
+    SERVICE_WORKER_TEMPLATE,
+    cdn_fallback_url,
+    load_pins,
+    preload_links,
+    render_service_worker,
+    vendor_prefixes,
+)
+from static_assets import (
+    RangeNotSatisfiable,
+    StaticAssetCache,
+    build_asset_cache,
+    etag_matches,
+    etag_matches_strong,
+    negotiate_encoding,
+    parse_range,
+)
 
 logging.basicConfig(
     level=logging.INFO,  # Set the logging level to INFO
@@ -17,135 +70,629 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
-
+if TYPE_CHECKING:
+    from simplesingletable import DynamoDbMemory
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"Incoming request: {request.method} {request.url}")
-        response = await call_next(request)
-        logger.info(f"Response status: {response.status_code}")
-        return response
+app = FastAPI()
 
 
-app.add_middleware(LoggingMiddleware)
-app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+_METRICS = MetricsRecorder()
+
+# Added innermost first: sizes are counted before and after compression.
+# Static files get their compressed variants at build time (see
+# static_assets); binary formats are never worth compressing per request.
+app.add_middleware(UncompressedSizeMiddleware)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1000,
+    compresslevel=5,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES
+    + (
+        "application/wasm",
+        "application/octet-stream",
+        "application/vnd.apache.parquet",
+    ),
+)
+app.add_middleware(MetricsMiddleware, recorder=_METRICS)
 
 
 _MEMORY = None
 
 
-def _get_memory() -> DynamoDbMemory:
+def _get_memory() -> "DynamoDbMemory":
     global _MEMORY
     if _MEMORY is None:
+        # simplesingletable pulls in boto3, which is most of our import time;
+        # only pay for it once a route actually needs DynamoDB
+        from simplesingletable import DynamoDbMemory
+
         _MEMORY = DynamoDbMemory(
-            logger=logger, table_name=os.environ["DYNAMODB_TABLE"], track_stats=True
+            logger=logger,
+            table_name=os.environ["DYNAMODB_TABLE"],
+            track_stats=True,
+            connection_params={"config": dynamo_batch.client_config()},
         )
     return _MEMORY
 
 
 @app.get("/api/ping")
-def api_ping():
+async def api_ping():
     return "pong"
 
 
+# The Function URL is public, so routes that read or write arbitrary items in
+# the table, and writes to the shared cache, need this bearer token; without
+# one configured they are disabled
+_DATA_API_TOKEN = os.environ.get("DATA_API_TOKEN", "")
+
+
+def _bearer_matches(request: Request, expected: str) -> bool:
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    return bool(expected) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def _check_data_access(request: Request):
+    if not _bearer_matches(request, _DATA_API_TOKEN):
+        raise HTTPException(status_code=403, detail="requires the data API token")
+
+
+@app.post("/api/items/batch-get")
+def api_items_batch_get(request: Request, batch: dynamo_batch.BatchGetRequest):
+    _check_data_access(request)
+    memory = _get_memory()
+    try:
+        items = dynamo_batch.batch_get(
+            memory.dynamodb_client,
+            memory.table_name,
+            batch.dataset,
+            batch.ids,
+            consistent_read=batch.consistent_read,
+        )
+    except dynamo_batch.UnprocessedItemsError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "items": items,
+        "missing": [item_id for item_id in batch.ids if item_id not in items],
+    }
+
+
+@app.post("/api/items/batch-write")
+def api_items_batch_write(request: Request, batch: dynamo_batch.BatchWriteRequest):
+    _check_data_access(request)
+    if duplicates := dynamo_batch.duplicate_ids(batch):
+        raise HTTPException(
+            status_code=400, detail=f"ids appear more than once: {sorted(duplicates)}"
+        )
+    memory = _get_memory()
+    try:
+        return dynamo_batch.batch_write(
+            memory.dynamodb_client,
+            memory.table_name,
+            batch.dataset,
+            batch.put,
+            batch.delete,
+        )
+    except dynamo_batch.UnprocessedItemsError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+_KV_CACHE: Optional[kv_cache.KeyValueCache] = None
+
+
+def _get_kv_cache() -> kv_cache.KeyValueCache:
+    global _KV_CACHE
+    if _KV_CACHE is None:
+        memory = _get_memory()
+        _KV_CACHE = kv_cache.KeyValueCache(memory.dynamodb_client, memory.table_name)
+    return _KV_CACHE
+
+
+# Registered demo sources live in this namespace; only the /api/demos routes
+# write to it
+DEMO_REGISTRY_NAMESPACE = "demos"
+
+
+@app.get("/api/cache/{namespace}")
+def api_cache_keys(namespace: str, limit: int = Query(100, ge=1, le=1000)):
+    try:
+        return {"keys": _get_kv_cache().keys(namespace, limit)}
+    except kv_cache.InvalidKey as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/cache/{namespace}/{key:path}", response_class=Response)
+def api_cache_get(request: Request, namespace: str, key: str):
+    try:
+        entry = _get_kv_cache().get(namespace, key)
+    except kv_cache.InvalidKey as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"{namespace}/{key} not found")
+    headers = {"ETag": f'"{entry.etag}"', "Cache-Control": "no-cache"}
+    if entry.expires_at is not None:
+        headers["Expires"] = formatdate(entry.expires_at, usegmt=True)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.value, media_type=entry.content_type, headers=headers)
+
+
+async def _cache_put(request: Request, namespace: str, key: str, ttl: Optional[int]):
+    body = await request.body()
+    content_type = request.headers.get("content-type", "application/octet-stream")
+    try:
+        entry = await run_in_threadpool(
+            _get_kv_cache().put, namespace, key, body, content_type, ttl
+        )
+    except kv_cache.InvalidKey as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except kv_cache.ValueTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except dynamo_batch.UnprocessedItemsError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "namespace": namespace,
+        "key": key,
+        "size": len(entry.value),
+        "chunks": entry.chunks,
+        "etag": entry.etag,
+        "expires_at": entry.expires_at,
+    }
+
+
+@app.put("/api/cache/{namespace}/{key:path}")
+async def api_cache_put(
+    request: Request, namespace: str, key: str, ttl: Optional[int] = Query(None, ge=0)
+):
+    _check_data_access(request)
+    if namespace == DEMO_REGISTRY_NAMESPACE:
+        raise HTTPException(status_code=403, detail="use /api/demos to register demos")
+    return await _cache_put(request, namespace, key, ttl)
+
+
+@app.delete("/api/cache/{namespace}/{key:path}", status_code=204)
+def api_cache_delete(request: Request, namespace: str, key: str):
+    _check_data_access(request)
+    if namespace == DEMO_REGISTRY_NAMESPACE:
+        raise HTTPException(status_code=403, detail="use /api/demos to remove demos")
+    try:
+        deleted = _get_kv_cache().delete(namespace, key)
+    except kv_cache.InvalidKey as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"{namespace}/{key} not found")
+    return Response(status_code=204)
+
+
+# Registering a demo publishes code that runs on this origin, so it needs the
+# bearer token; without one configured the registry is read-only
+_DEMO_REGISTRY_TOKEN = os.environ.get("DEMO_REGISTRY_TOKEN", "")
+
+
+def _check_registry_write(request: Request, name: str):
+    if not _bearer_matches(request, _DEMO_REGISTRY_TOKEN):
+        raise HTTPException(status_code=403, detail="demo registry is read-only")
+    if not DEMO_NAME_PATTERN.match(name):
+        raise HTTPException(
+            status_code=400, detail=f"name must match {DEMO_NAME_PATTERN.pattern}"
+        )
+    if name in _get_demo_bundles():
+        raise HTTPException(status_code=409, detail=f"{name} is a built-in demo")
+
+
+@app.get("/api/demos")
+def api_demos():
+    return {
+        "builtin": sorted(_get_demo_bundles()),
+        "registered": [
+            entry["key"]
+            for entry in _get_kv_cache().keys(DEMO_REGISTRY_NAMESPACE, limit=1000)
+        ],
+    }
+
+
+@app.put("/api/demos/{name}")
+async def api_demos_register(
+    request: Request, name: str, ttl: Optional[int] = Query(None, ge=0)
+):
+    _check_registry_write(request, name)
+    source = await request.body()
+    try:
+        compile(source, f"{name}.py", "exec")
+    except (SyntaxError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"invalid Python source: {e}")
+    return await _cache_put(request, DEMO_REGISTRY_NAMESPACE, name, ttl)
+
+
+@app.delete("/api/demos/{name}", status_code=204)
+def api_demos_remove(request: Request, name: str):
+    _check_registry_write(request, name)
+    if not _get_kv_cache().delete(DEMO_REGISTRY_NAMESPACE, name):
+        raise HTTPException(status_code=404, detail=f"{name} is not registered")
+    return Response(status_code=204)
+
+
+def _table_response(table, request: Request, requested_format: Optional[str]):
+    try:
+        media_type = arrow_exchange.negotiate_format(
+            request.headers.get("accept", ""), requested_format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(
+        content=arrow_exchange.write_table(table, media_type),
+        media_type=media_type,
+        headers={"Vary": "Accept"},
+    )
+
+
+@app.get("/api/tables/sample", response_class=Response)
+def api_tables_sample(
+    request: Request,
+    rows: int = Query(1000, ge=0, le=arrow_exchange.MAX_SAMPLE_ROWS),
+    format: Optional[str] = None,
+):
+    """Synthetic table in the format picked by ``?format=`` or the Accept header."""
+    try:
+        table = arrow_exchange.sample_table(rows)
+    except arrow_exchange.ArrowUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return _table_response(table, request, format)
+
+
+@app.post("/api/tables/describe", response_class=Response)
+async def api_tables_describe(request: Request, format: Optional[str] = None):
+    """Per-column summary of an uploaded Arrow IPC stream, Parquet file or JSON records."""
+    body = await request.body()
+    # Parsing, summarising and re-encoding are all CPU-bound pyarrow calls
+    return await run_in_threadpool(_describe_table, body, request, format)
+
+
+def _describe_table(body: bytes, request: Request, requested_format: Optional[str]):
+    try:
+        table = arrow_exchange.read_table(body, request.headers.get("content-type", ""))
+        summary = arrow_exchange.describe_table(table)
+    except arrow_exchange.ArrowUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except arrow_exchange.InvalidTable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _table_response(summary, request, requested_format)
+
+
+@app.post("/api/batch")
+async def api_batch(request: Request, batch: batch_dispatch.BatchRequest):
+    """Run several API calls in this one invocation; see ``batch_dispatch``."""
+    return {"responses": await batch_dispatch.run_batch(app, request.scope, batch)}
+
+
+@app.get("/api/_metrics")
+async def api_metrics():
+    metrics = _METRICS.snapshot()
+    if _ASSETS is not None:
+        metrics["static_assets"] = _ASSETS.stats()
+    if _KV_CACHE is not None:
+        metrics["kv_cache"] = _KV_CACHE.stats()
+    return metrics
+
+
+_ASSETS: Optional[StaticAssetCache] = None
+
+
+def _get_assets() -> StaticAssetCache:
+    global _ASSETS
+    if _ASSETS is None:
+        _ASSETS = build_asset_cache()
+    return _ASSETS
+
+
+# Unversioned asset URLs must be revalidated (cheap 304s via ETag); URLs carrying
+# the content hash in ?v= never change, so browsers may keep them forever
+_REVALIDATE_CACHE_CONTROL = os.environ.get("STATIC_CACHE_CONTROL", "no-cache")
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Function URL responses are capped at 6 MB, and Mangum hands binary bodies
+# back base64-encoded (4/3 larger); anything bigger has to be fetched in ranges
+MAX_RESPONSE_BODY_BYTES = int(
+    os.environ.get("MAX_RESPONSE_BODY_BYTES", str(6 * 1024 * 1024 * 3 // 4 - 65536))
+)
+
+
+def _check_body_size(route: str, size: int):
+    if size > MAX_RESPONSE_BODY_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{route} is {size:,} bytes, more than one response can carry "
+            f"({MAX_RESPONSE_BODY_BYTES:,}); request it with Range",
+        )
+
+
+async def _read_asset(
+    assets: StaticAssetCache, route: str, encoding: Optional[str] = None
+) -> bytes:
+    """Content from memory, or read in a worker thread on a miss."""
+    if (content := assets.cached(route, encoding)) is None:
+        content = await run_in_threadpool(assets.read_file, route, encoding)
+        assets.store(route, encoding, content)
+    return content
+
+
+def _streams_responses(request: Request) -> bool:
+    """False under Mangum, which collects the whole body before returning it."""
+    return "aws.event" not in request.scope
+
+
+async def _serve_asset(route: str, not_found_detail: str, request: Request) -> Response:
+    assets = _get_assets()
+    if (asset := assets.get(route)) is None:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+    if not assets.has_content_hash(route):
+        # not in the asset manifest: hashing means reading the whole file
+        await run_in_threadpool(assets.content_hash, route)
+
+    # Precompressed variants bypass GZipMiddleware, which skips any response
+    # that already carries a Content-Encoding. Range requests always address
+    # the identity representation.
+    range_header = request.headers.get("range")
+    encoding = None
+    if not range_header:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), asset)
+    etag = assets.etag(route, encoding)
+    versioned = request.query_params.get("v") == assets.content_hash(route)[:16]
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(asset.mtime, usegmt=True),
+        "Cache-Control": (
+            _IMMUTABLE_CACHE_CONTROL if versioned else _REVALIDATE_CACHE_CONTROL
+        ),
+        "Accept-Ranges": "bytes",
+    }
+    if links := _page_links(route):
+        headers["Link"] = links
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+        request_metrics_state(request.scope)["uncompressed_bytes"] = asset.size
+
+    if (if_none_match := request.headers.get("if-none-match")) is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif (if_modified_since := request.headers.get("if-modified-since")) is not None:
+        if if_modified_since == headers["Last-Modified"]:
+            return Response(status_code=304, headers=headers)
+
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.headers.get("if-range")
+    if range_header and (
+        if_range is None
+        or if_range == headers["Last-Modified"]
+        or etag_matches_strong(if_range, etag)
+    ):
+        try:
+            byte_range = parse_range(range_header, asset.size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{asset.size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            _check_body_size(route, end - start + 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{asset.size}"
+            # a file that can never be cached is read only as far as the range
+            if not assets.fits_in_cache(route) or (
+                _streams_responses(request) and assets.should_stream(route)
+            ):
+                headers["Content-Length"] = str(end - start + 1)
+                return StreamingResponse(
+                    assets.iter_file(route, start=start, end=end),
+                    status_code=206,
+                    media_type=asset.media_type,
+                    headers=headers,
+                )
+            with record_timing(request.scope, "read"):
+                content = (await _read_asset(assets, route))[start : end + 1]
+            return Response(
+                content=content,
+                status_code=206,
+                media_type=asset.media_type,
+                headers=headers,
+            )
+
+    _check_body_size(route, asset.size_for(encoding))
+    if _streams_responses(request) and assets.should_stream(route, encoding):
+        headers["Content-Length"] = str(asset.size_for(encoding))
+        return StreamingResponse(
+            assets.iter_file(route, encoding),
+            media_type=asset.media_type,
+            headers=headers,
+        )
+    with record_timing(request.scope, "read"):
+        content = await _read_asset(assets, route, encoding)
+    return Response(
+        content=content,
+        media_type=asset.media_type,
+        headers=headers,
+    )
+
+
 @app.get("/flet/{name:path}", response_class=Response)
 @app.get("/flet", response_class=Response)
-def read_flet_file(name: str = "index.html"):
-    try:
-        # Define the base directory
-        base_dir = Path("flet_app").resolve()
-        # Resolve the target file path within the base directory
-        file_path = (base_dir / name).resolve()
+async def read_flet_file(request: Request, name: str = "index.html"):
+    return await _serve_asset(f"/flet/{name}", f"{name} not found in flet_app", request)
+
+
+_RUNTIME_PINS: Optional[dict] = None
+_VENDOR_PREFIXES: Optional[dict[str, str]] = None
+_PAGE_LINKS: dict[str, Optional[str]] = {}
+
+
+def _get_runtime_pins() -> dict:
+    global _RUNTIME_PINS
+    if _RUNTIME_PINS is None:
+        _RUNTIME_PINS = load_pins()
+    return _RUNTIME_PINS
 
-        # Ensure the file path is within the base directory
-        if not file_path.is_file() or base_dir not in file_path.parents:
-            raise FileNotFoundError
 
-        # Detect MIME type based on file extension
-        media_type, _ = mimetypes.guess_type(str(file_path))
-        media_type = media_type or "application/octet-stream"
+def _get_vendor_prefixes() -> dict[str, str]:
+    global _VENDOR_PREFIXES
+    if _VENDOR_PREFIXES is None:
+        _VENDOR_PREFIXES = vendor_prefixes(_get_runtime_pins())
+    return _VENDOR_PREFIXES
 
-        # Read and serve the file contents in binary mode
-        with open(file_path, "rb") as f:
-            content = f.read()
 
-        return Response(content=content, media_type=media_type)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"{name} not found in flet_app")
+def _page_links(page: str) -> Optional[str]:
+    """Preload ``Link`` header for HTML pages listed in the runtime pins."""
+    if page not in _PAGE_LINKS:
+        _PAGE_LINKS[page] = preload_links(_get_runtime_pins(), page)
+    return _PAGE_LINKS[page]
 
 
-@app.get("/streamlitdemos/{load_demo:path}")
-# @app.get("/streamlitdemos")
-def load_demo_app(load_demo: str = None):
+@app.get("/vendor/{path:path}", response_class=Response)
+async def read_vendor_file(request: Request, path: str):
+    route = f"/vendor/{path}"
+    fallback_url = cdn_fallback_url(route, _get_vendor_prefixes())
+    if _get_assets().get(route) is None and fallback_url:
+        # Not vendored into this deployment: send the browser to the same pinned
+        # version on the CDN
+        return RedirectResponse(fallback_url, status_code=307)
     try:
-        with open("streamlit_demoapps/files/" + load_demo + ".py", "r"):
-            pass
-    except FileNotFoundError:
+        return await _serve_asset(route, f"{path} not vendored", request)
+    except HTTPException as e:
+        # Too large for one response. Pyodide's loaders never ask for ranges,
+        # so the CDN serves the whole file instead.
+        if e.status_code != 413 or not fallback_url:
+            raise
+        return RedirectResponse(fallback_url, status_code=307)
+
+
+_SERVICE_WORKER: Optional[tuple[bytes, str]] = None
+
+
+def _get_service_worker() -> tuple[bytes, str]:
+    global _SERVICE_WORKER
+    if _SERVICE_WORKER is None:
+        with open(SERVICE_WORKER_TEMPLATE) as f:
+            content = render_service_worker(f.read(), _get_runtime_pins())
+        _SERVICE_WORKER = content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+    return _SERVICE_WORKER
+
+
+@app.get("/sw.js", response_class=Response)
+async def read_service_worker(request: Request):
+    if _SERVICE_WORKER is None:
+        await run_in_threadpool(_get_service_worker)
+    content, etag = _get_service_worker()
+    # Browsers check for an updated worker on every navigation; keep that a 304
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="text/javascript", headers=headers)
+
+
+@app.get("/streamlitdemos/files/{demo_app_file:path}")
+async def load_demo_app_files(request: Request, demo_app_file: str = None):
+    route = f"/streamlitdemos/files/{demo_app_file}"
+    if _get_assets().get(route) is None:
         return Response(status_code=404)
+    return await _serve_asset(route, f"{demo_app_file} not found", request)
+
+
+_DEMO_BUNDLES: Optional[dict[str, DemoBundle]] = None
+
+
+def _get_demo_bundles() -> dict[str, DemoBundle]:
+    global _DEMO_BUNDLES
+    if _DEMO_BUNDLES is None:
+        _DEMO_BUNDLES = build_demo_bundles()
+    return _DEMO_BUNDLES
+
+
+# name -> (etag of the registered source, its bundle)
+_REGISTERED_BUNDLES: dict[str, tuple[str, DemoBundle]] = {}
 
-    with open("streamlit_demoapps/api_demo.html") as f:
-        content = f.read()
-        content = content.replace("STREAMLIT_DEMO_FILE.py", load_demo + ".py")
-        return Response(status_code=200, media_type="text/html", content=content)
 
+def _registered_demo_bundle(name: str) -> Optional[DemoBundle]:
+    """Bundle for a demo from the registry, rebuilt only when its source changes."""
+    if not DEMO_NAME_PATTERN.match(name) or not os.environ.get("DYNAMODB_TABLE"):
+        return None
+    from botocore.exceptions import BotoCoreError, ClientError
 
-@app.get("/streamlitdemos/files/<demo_app_file>")
-def load_demo_app_files(demo_app_file: str = None):
     try:
-        # Define the base directory and secure the file path
-        base_directory = "streamlit_demoapps/files/"
-        safe_path = os.path.abspath(os.path.join(base_directory, demo_app_file))
-
-        # Ensure the safe path is within the base directory
-        if not safe_path.startswith(os.path.abspath(base_directory)):
-            return Response(status_code=403)
-
-        # Open and read the file if it exists within the safe path
-        with open(safe_path, "r") as f:
-            return Response(status_code=200, media_type="text/plain", content=f.read())
-    except FileNotFoundError:
+        entry = _get_kv_cache().get(DEMO_REGISTRY_NAMESPACE, name)
+    except (BotoCoreError, ClientError) as e:
+        # e.g. a local run without DynamoDB: only the file demos exist
+        logger.warning(f"Demo registry unavailable: {e}")
+        return None
+    if entry is None:
+        _REGISTERED_BUNDLES.pop(name, None)
+        return None
+    etag, bundle = _REGISTERED_BUNDLES.get(name, (None, None))
+    if etag != entry.etag:
+        bundle = build_registered_bundle(name, entry.value.decode(), entry.updated_at)
+        _REGISTERED_BUNDLES[name] = (entry.etag, bundle)
+    return bundle
+
+
+@app.get("/streamlitdemos/{load_demo:path}", response_class=Response)
+async def load_demo_app(request: Request, load_demo: str = None):
+    name = load_demo.removesuffix("/")
+    if _DEMO_BUNDLES is None:
+        # first request in this container: reads and compresses every demo
+        await run_in_threadpool(_get_demo_bundles)
+    bundle = _get_demo_bundles().get(name)
+    if bundle is None:
+        # a DynamoDB read unless the registry entry is in the local cache tier
+        bundle = await run_in_threadpool(_registered_demo_bundle, name)
+    if bundle is None:
         return Response(status_code=404)
 
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), bundle)
+    etag = bundle.etag_for(encoding)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(bundle.mtime, usegmt=True),
+        "Cache-Control": _REVALIDATE_CACHE_CONTROL,
+    }
+    if links := _page_links("/streamlitdemos"):
+        headers["Link"] = links
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+        request_metrics_state(request.scope)["uncompressed_bytes"] = len(bundle.content)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=bundle.body(encoding), media_type="text/html", headers=headers
+    )
+
 
 @app.get("/pyodide", response_class=Response)
-def read_index():
-    try:
-        with open("pyodide_example.html", "r", encoding="utf-8") as f:
-            content = f.read()
-        return Response(content=content, media_type="text/html")
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="pyodide_example.html not found")
+async def read_index(request: Request):
+    return await _serve_asset("/pyodide", "pyodide_example.html not found", request)
 
 
 @app.get("/pyodide2", response_class=Response)
-def read_index():
-    try:
-        with open("pyodide_example2.html", "r", encoding="utf-8") as f:
-            content = f.read()
-        return Response(content=content, media_type="text/html")
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="pyodide_example2.html not found")
+async def read_index(request: Request):
+    return await _serve_asset("/pyodide2", "pyodide_example2.html not found", request)
+
+
+@app.get("/pyodide2_worker.js", response_class=Response)
+async def read_pyodide2_worker(request: Request):
+    return await _serve_asset(
+        "/pyodide2_worker.js", "pyodide_example2_worker.js not found", request
+    )
 
 
 @app.get("/streamlit", response_class=Response)
-def read_index():
-    try:
-        with open("streamlit_index.html", "r", encoding="utf-8") as f:
-            content = f.read()
-        return Response(content=content, media_type="text/html")
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="streamlit_index.html not found")
+async def read_index(request: Request):
+    return await _serve_asset("/streamlit", "streamlit_index.html not found", request)
 
 
 @app.get("/streamlit_app.py", response_class=Response)
-def read_streamlit_app():
-    try:
-        with open("streamlit_app.py", "r", encoding="utf-8") as f:
-            content = f.read()
-        return Response(content=content, media_type="text/plain")
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="streamlit_app.py not found")
+async def read_streamlit_app(request: Request):
+    return await _serve_asset(
+        "/streamlit_app.py", "streamlit_app.py not found", request
+    )
 
 
 _SVG_FAVICON = """
@@ -171,9 +718,142 @@ _SVG_FAVICON = """
 
 
 @app.get("/favicon.ico")
-def get_favicon():
+async def get_favicon():
     return Response(content=_SVG_FAVICON, media_type="image/svg+xml")
 
 
+# What a first visit asks for; /api/_warm reads them (and their precompressed
+# variants) into memory ahead of it
+WARM_ASSET_ROUTES = (
+    "/pyodide",
+    "/pyodide2",
+    "/pyodide2_worker.js",
+    "/streamlit",
+    "/streamlit_app.py",
+    "/flet/index.html",
+    "/streamlitdemos/files/api_demo_lib.py",
+)
+# Imported lazily by the routes that need them (see arrow_exchange); pyarrow
+# itself imports pandas, when installed, the first time it builds a table
+WARM_IMPORTS = ("pyarrow", "pyarrow.compute", "pyarrow.parquet", "pandas")
+
+_WARMED_AT: Optional[float] = None
+
+
+def _warm_assets():
+    assets = _get_assets()
+    for route in WARM_ASSET_ROUTES:
+        if (asset := assets.get(route)) is None:
+            continue
+        assets.content_hash(route)
+        _page_links(route)
+        for encoding in (None, *asset.encodings):
+            assets.read(route, encoding)
+
+
+def _warm_imports():
+    for module in WARM_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def _warm_dynamodb():
+    if os.environ.get("DYNAMODB_TABLE"):
+        _get_kv_cache()
+
+
+def _warm() -> dict:
+    """Do the per-container setup a first request would otherwise pay for.
+
+    Every step is idempotent; a step that fails is logged and skipped, so a
+    ping never fails because of, e.g., a missing optional dependency.
+    """
+    global _WARMED_AT
+    steps = {}
+    for name, step in (
+        ("imports", _warm_imports),
+        ("dynamodb", _warm_dynamodb),
+        ("assets", _warm_assets),
+        ("service_worker", _get_service_worker),
+        ("demo_bundles", _get_demo_bundles),
+    ):
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            steps[name] = None
+            continue
+        steps[name] = round((time.perf_counter() - start) * 1000, 3)
+    first = _WARMED_AT is None
+    if first:
+        _WARMED_AT = time.time()
+    return {"first": first, "warmed_at": _WARMED_AT, "steps_ms": steps}
+
+
+@app.post("/api/_warm")
+@app.get("/api/_warm")
+async def api_warm(request: Request):
+    """Target of the keep-warm schedule; counted apart from user traffic."""
+    request_metrics_state(request.scope)["warm"] = True
+    return await run_in_threadpool(_warm)
+
+
+class ScheduledWarmEvent:
+    """Mangum handler running an EventBridge schedule event as POST /api/_warm.
+
+    The keep-warm rule invokes the function directly, with its own event rather
+    than an HTTP one; this maps it onto the route so it goes through the usual
+    middleware (and is counted as warm traffic).
+    """
+
+    def __init__(self, event: dict, context, config):
+        self.event = event
+        self.context = context
+        self.config = config
+
+    @classmethod
+    def infer(cls, event: dict, context, config) -> bool:
+        return event.get("source") == "aws.events"
+
+    @property
+    def body(self) -> bytes:
+        return b""
+
+    @property
+    def scope(self) -> dict:
+        return {
+            "type": "http",
+            "method": "POST",
+            "http_version": "1.1",
+            "headers": [[b"user-agent", b"keep-warm-schedule"]],
+            "path": "/api/_warm",
+            "raw_path": None,
+            "root_path": "",
+            "scheme": "https",
+            "query_string": b"",
+            "server": ("keep-warm.invalid", 443),
+            "client": ("127.0.0.1", 0),
+            "asgi": {"version": "3.0", "spec_version": "2.0"},
+            "aws.event": self.event,
+            "aws.context": self.context,
+        }
+
+    def __call__(self, response: dict) -> dict:
+        return {"statusCode": response["status"], "body": response["body"].decode()}
+
+
 # AWS Lambda handler
-handler = Mangum(app)
+# No startup/shutdown handlers: skip running the lifespan protocol on every
+# invocation
+handler = Mangum(app, lifespan="off", custom_handlers=[ScheduledWarmEvent])
+
+# Provisioned-concurrency environments initialize ahead of any traffic, so the
+# warm-up is free there; on-demand ones get it from the /api/_warm pings
+if os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency":
+    _warm()
+
+if _PROFILE_STARTUP:
+    startup_profile.log_report(logger)
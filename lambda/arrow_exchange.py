@@ -0,0 +1,155 @@
+"""Tabular payloads as Apache Arrow IPC streams or Parquet instead of JSON.
+
+Arrow's IPC stream format is the same columnar layout pandas/pyarrow use in
+memory, so a browser running Pyodide can hand the response bytes straight to
+``pyarrow.ipc.open_stream`` without parsing anything. Parquet is offered for
+payloads that are stored or downloaded rather than decoded right away. JSON
+(a list of records) is still available for clients without pyarrow.
+
+pyarrow is imported lazily, and only by the routes that exchange tables. If it
+is not installed, those routes answer 501 and everything else is unaffected.
+"""
+
+import json
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pyarrow
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+JSON_MEDIA_TYPE = "application/json"
+
+# ?format= values, in order of preference when Accept allows several
+TABLE_FORMATS = {
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+    "parquet": PARQUET_MEDIA_TYPE,
+    "json": JSON_MEDIA_TYPE,
+}
+
+MAX_SAMPLE_ROWS = 1_000_000
+SAMPLE_CATEGORIES = ["alpha", "beta", "gamma", "delta"]
+
+
+class ArrowUnavailable(RuntimeError):
+    """pyarrow is not installed in this deployment."""
+
+
+class InvalidTable(ValueError):
+    """A request body could not be read as a table."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ArrowUnavailable("pyarrow is not installed") from e
+    return pyarrow
+
+
+def negotiate_format(accept: str, requested: Optional[str] = None) -> str:
+    """Media type to answer with: explicit ``?format=`` first, then Accept, then JSON."""
+    if requested:
+        if requested not in TABLE_FORMATS:
+            raise ValueError(f"format must be one of {sorted(TABLE_FORMATS)}")
+        return TABLE_FORMATS[requested]
+    accepted = {item.split(";")[0].strip().lower() for item in accept.split(",")}
+    for media_type in TABLE_FORMATS.values():
+        if media_type in accepted:
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def sample_table(rows: int) -> "pyarrow.Table":
+    """Deterministic table of ``rows`` rows mixing int, float, string and timestamp columns."""
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+
+    ids = pa.array(range(rows), type=pa.int64())
+    return pa.table(
+        {
+            "id": ids,
+            "value": pc.divide(pc.cast(pc.multiply(ids, 37), pa.float64()), 7.0),
+            "category": pa.DictionaryArray.from_arrays(
+                pc.cast(pc.bit_wise_and(ids, 3), pa.int8()),
+                pa.array(SAMPLE_CATEGORIES),
+            ),
+            "created_at": pc.cast(
+                pc.add(pc.multiply(ids, 60_000), 1_704_067_200_000),
+                pa.timestamp("ms"),
+            ),
+        }
+    )
+
+
+def read_table(body: bytes, content_type: str) -> "pyarrow.Table":
+    """Decode a request body in any of ``TABLE_FORMATS``, chosen by Content-Type."""
+    pa = _pyarrow()
+    media_type = content_type.split(";")[0].strip().lower()
+    try:
+        if media_type == ARROW_STREAM_MEDIA_TYPE:
+            with pa.ipc.open_stream(pa.py_buffer(body)) as reader:
+                return reader.read_all()
+        if media_type == PARQUET_MEDIA_TYPE:
+            import pyarrow.parquet as pq
+
+            return pq.read_table(pa.BufferReader(body))
+        if media_type == JSON_MEDIA_TYPE:
+            records = json.loads(body)
+            if not isinstance(records, list):
+                raise InvalidTable("JSON tables must be a list of records")
+            return pa.Table.from_pylist(records)
+    except (pa.ArrowException, ValueError) as e:
+        raise InvalidTable(str(e)) from e
+    raise InvalidTable(f"unsupported content type {content_type!r}")
+
+
+def write_table(table: "pyarrow.Table", media_type: str) -> bytes:
+    pa = _pyarrow()
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if media_type == PARQUET_MEDIA_TYPE:
+        import pyarrow.parquet as pq
+
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink)
+        return sink.getvalue().to_pybytes()
+    return json.dumps(table.to_pylist(), default=str, separators=(",", ":")).encode()
+
+
+def describe_table(table: "pyarrow.Table") -> "pyarrow.Table":
+    """One row per column: type, nulls and, for numeric columns, min/max/mean."""
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+
+    summary = {
+        name: []
+        for name in ("column", "type", "count", "null_count", "min", "max", "mean")
+    }
+    for name, column in zip(table.column_names, table.columns):
+        numeric = pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+        min_max = pc.min_max(column) if numeric else None
+        summary["column"].append(name)
+        summary["type"].append(str(column.type))
+        summary["count"].append(len(column) - column.null_count)
+        summary["null_count"].append(column.null_count)
+        summary["min"].append(min_max["min"].as_py() if numeric else None)
+        summary["max"].append(min_max["max"].as_py() if numeric else None)
+        summary["mean"].append(pc.mean(column).as_py() if numeric else None)
+    return pa.table(
+        summary,
+        schema=pa.schema(
+            [
+                ("column", pa.string()),
+                ("type", pa.string()),
+                ("count", pa.int64()),
+                ("null_count", pa.int64()),
+                ("min", pa.float64()),
+                ("max", pa.float64()),
+                ("mean", pa.float64()),
+            ]
+        ),
+    )
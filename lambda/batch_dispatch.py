@@ -0,0 +1,178 @@
+"""Several API calls in one request: ``POST /api/batch``.
+
+Each sub-request is run in-process through the app's own ASGI stack (routing,
+validation, middleware), so it behaves exactly like the same call made on its
+own, minus the Function URL round trip and the separate invocation.
+
+Reads (GET/HEAD/OPTIONS) run concurrently. Anything else runs alone and in
+order, so a read listed after a write sees its effect. Sub-requests carry the
+batch's ``Authorization`` header unless they set their own. Response bodies
+come back as text, or base64 for binary content types.
+"""
+
+import asyncio
+import base64
+import json
+import os
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_REQUESTS = 50
+MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "10"))
+# Function URL responses are capped at 6 MB; leave room for the JSON/base64
+MAX_BATCH_RESPONSE_BYTES = int(
+    os.environ.get("BATCH_MAX_RESPONSE_BYTES", str(4 * 1024 * 1024))
+)
+BATCH_PATH = "/api/batch"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+INHERITED_HEADERS = {"authorization"}
+TEXT_MEDIA_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+
+class SubRequest(BaseModel):
+    method: str = "GET"
+    # path plus optional query string, e.g. "/api/cache/ns/key?ttl=60"
+    path: str = Field(pattern=r"^/")
+    headers: dict[str, str] = Field(default_factory=dict)
+    json_body: Optional[Any] = Field(default=None, alias="json")
+    body: Optional[str] = None
+    body_encoding: Literal["text", "base64"] = "text"
+
+
+class BatchRequest(BaseModel):
+    requests: list[SubRequest] = Field(min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+
+class InvalidSubRequest(ValueError):
+    pass
+
+
+def _request_body(sub: SubRequest) -> tuple[bytes, dict[str, str]]:
+    headers = {name.lower(): value for name, value in sub.headers.items()}
+    if sub.json_body is not None:
+        headers.setdefault("content-type", "application/json")
+        return json.dumps(sub.json_body).encode(), headers
+    if sub.body is None:
+        return b"", headers
+    if sub.body_encoding == "base64":
+        return base64.b64decode(sub.body), headers
+    return sub.body.encode(), headers
+
+
+def _scope(parent: dict, sub: SubRequest, headers: dict[str, str], body: bytes):
+    path, _, query = sub.path.partition("?")
+    if path.rstrip("/") == BATCH_PATH:
+        raise InvalidSubRequest(f"{BATCH_PATH} cannot be nested")
+    inherited = {
+        name.decode(): value.decode()
+        for name, value in parent["headers"]
+        if name.decode() in INHERITED_HEADERS
+    }
+    merged = {**inherited, **headers, "content-length": str(len(body))}
+    return {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": sub.method.upper(),
+        "scheme": parent.get("scheme", "https"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        # no accept-encoding: the batch response as a whole is compressed once
+        "headers": [(name.encode(), value.encode()) for name, value in merged.items()],
+        "state": {},
+    }
+
+
+async def _dispatch(app, parent_scope: dict, sub: SubRequest) -> dict:
+    try:
+        body, headers = _request_body(sub)
+        scope = _scope(parent_scope, sub, headers, body)
+    except (InvalidSubRequest, ValueError) as e:
+        return {"status": 400, "headers": {}, "body": json.dumps({"detail": str(e)})}
+
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a client that stays connected until the response is complete
+        await asyncio.Event().wait()
+
+    status, response_headers, chunks = 500, {}, []
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {
+                name.decode(): value.decode() for name, value in message["headers"]
+            }
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware has already sent the 500 and logged the error
+        pass
+    return {"status": status, "headers": response_headers, "content": b"".join(chunks)}
+
+
+def _encode(result: dict, remaining: int) -> dict:
+    if "content" not in result:
+        return result
+    content = result.pop("content")
+    if len(content) > remaining:
+        return {
+            "status": 413,
+            "headers": {},
+            "body": json.dumps({"detail": "batch response size limit reached"}),
+        }
+    content_type = result["headers"].get("content-type", "")
+    if content_type.startswith(TEXT_MEDIA_TYPES):
+        return {**result, "body": content.decode("utf-8", errors="replace")}
+    return {
+        **result,
+        "body": base64.b64encode(content).decode(),
+        "body_encoding": "base64",
+    }
+
+
+async def run_batch(app, parent_scope: dict, batch: BatchRequest) -> list[dict]:
+    """Responses in request order; reads run together, writes one at a time."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def limited(sub: SubRequest) -> dict:
+        async with semaphore:
+            return await _dispatch(app, parent_scope, sub)
+
+    results: list[dict] = []
+    reads: list[SubRequest] = []
+    for sub in batch.requests:
+        if sub.method.upper() in SAFE_METHODS:
+            reads.append(sub)
+            continue
+        # A write waits for the reads before it, and the reads after wait for it
+        results.extend(await asyncio.gather(*map(limited, reads)))
+        reads = []
+        results.append(await _dispatch(app, parent_scope, sub))
+    results.extend(await asyncio.gather(*map(limited, reads)))
+
+    encoded, remaining = [], MAX_BATCH_RESPONSE_BYTES
+    for result in results:
+        encoded.append(_encode(result, remaining))
+        remaining -= len(encoded[-1]["body"])
+    return encoded
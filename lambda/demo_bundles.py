@@ -0,0 +1,132 @@
+"""One self-contained HTML page per Streamlit demo.
+
+Each demo in ``streamlit_demoapps/files`` is rendered into ``demo_index.html``
+with its source and the shared ``api_demo_lib.py`` inlined in stlite's
+``files`` map, so opening a demo is a single request instead of the page plus
+one fetch per Python file. Pages are built once per container, compressed
+once, and served with a content-hash ETag.
+
+Demos registered at runtime arrive as a source string instead of a file and
+are rendered the same way by ``build_registered_bundle``.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # not in the Lambda requirements; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEMO_TEMPLATE = "streamlit_demoapps/demo_index.html"
+DEMO_FILES_DIR = "streamlit_demoapps/files"
+# Sources every demo needs next to its entrypoint, under the same names
+SHARED_FILES = ["api_demo_lib.py"]
+ENTRYPOINT = "streamlit_app.py"
+FILES_PLACEHOLDER = "STLITE_FILES"
+# Names of demos added at runtime through the registry (see kv_cache)
+DEMO_NAME_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]{0,63}$")
+
+
+@dataclass(frozen=True)
+class DemoBundle:
+    name: str
+    content: bytes
+    etag: str
+    # newest mtime of the template and inlined sources
+    mtime: float
+    # content-encoding -> compressed page, only where it came out smaller
+    encodings: dict[str, bytes] = field(default_factory=dict)
+
+    def body(self, encoding: Optional[str] = None) -> bytes:
+        return self.encodings[encoding] if encoding else self.content
+
+    def etag_for(self, encoding: Optional[str] = None) -> str:
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+
+def _script_json(value) -> str:
+    # "</script>" inside an inlined source must not end the <script> block
+    return json.dumps(value, indent=2).replace("</", "<\\/")
+
+
+def _compress(content: bytes) -> dict[str, bytes]:
+    candidates = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(content, quality=11)
+    encodings = {}
+    for encoding in ("br", "gzip"):
+        if encoding in candidates and len(candidates[encoding]) < len(content):
+            encodings[encoding] = candidates[encoding]
+    return encodings
+
+
+def render_bundle(name: str, template: str, files: dict[str, str], mtime: float):
+    """Inline ``files`` (file name -> source) into the template as one page."""
+    content = template.replace(FILES_PLACEHOLDER, _script_json(files)).encode()
+    return DemoBundle(
+        name=name,
+        content=content,
+        etag=hashlib.sha256(content).hexdigest()[:32],
+        mtime=mtime,
+        encodings=_compress(content),
+    )
+
+
+def build_bundle(
+    name: str, template: str, files_dir: Path, template_mtime: float = 0.0
+) -> DemoBundle:
+    sources = [files_dir / file_name for file_name in SHARED_FILES]
+    sources.append(files_dir / f"{name}.py")
+    files = {path.name: path.read_text() for path in sources[:-1]}
+    files[ENTRYPOINT] = sources[-1].read_text()
+    mtime = max([template_mtime] + [path.stat().st_mtime for path in sources])
+    return render_bundle(name, template, files, mtime)
+
+
+def build_registered_bundle(
+    name: str,
+    source: str,
+    updated_at: float,
+    template_path=DEMO_TEMPLATE,
+    files_dir=DEMO_FILES_DIR,
+) -> DemoBundle:
+    """Bundle a demo whose source came from the registry rather than ``files_dir``."""
+    template_path, files_dir = Path(template_path), Path(files_dir)
+    files = {
+        file_name: (files_dir / file_name).read_text() for file_name in SHARED_FILES
+    }
+    files[ENTRYPOINT] = source
+    return render_bundle(
+        name,
+        template_path.read_text(),
+        files,
+        max(updated_at, template_path.stat().st_mtime),
+    )
+
+
+def build_demo_bundles(
+    template_path=DEMO_TEMPLATE, files_dir=DEMO_FILES_DIR
+) -> dict[str, DemoBundle]:
+    """Bundle every demo script; paths are relative to the lambda root."""
+    template_path, files_dir = Path(template_path), Path(files_dir)
+    if not template_path.is_file() or not files_dir.is_dir():
+        logger.warning(f"{template_path} or {files_dir} not found; no demos to serve")
+        return {}
+    template = template_path.read_text()
+    bundles = {}
+    for path in sorted(files_dir.glob("*.py")):
+        if path.name in SHARED_FILES:
+            continue
+        bundles[path.stem] = build_bundle(
+            path.stem, template, files_dir, template_path.stat().st_mtime
+        )
+    return bundles
@@ -0,0 +1,200 @@
+"""Bulk reads and writes of dataset items against the app's DynamoDB table.
+
+Items live in the same single table as the ``DynamoDbMemory`` resources, under
+their own key prefix: ``pk = "dataset#<name>"``, ``sk = "item#<id>"`` with the
+JSON payload in ``data``. Requests are chunked to the BatchGetItem (100 keys)
+and BatchWriteItem (25 requests) limits, and anything DynamoDB hands back as
+unprocessed is retried with exponential backoff.
+
+boto3 is imported lazily here as everywhere else, to keep it off the cold-start
+path of routes that never touch DynamoDB.
+"""
+
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+MAX_UNPROCESSED_RETRIES = int(os.environ.get("DYNAMODB_BATCH_RETRIES", "8"))
+# Chunks are sent concurrently, one pooled connection each
+MAX_POOL_CONNECTIONS = int(os.environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", "25"))
+MAX_BATCH_ITEMS = 1000
+
+
+class UnprocessedItemsError(RuntimeError):
+    """DynamoDB still reported unprocessed keys/items after all retries."""
+
+
+class DatasetItem(BaseModel):
+    id: str = Field(min_length=1)
+    data: dict[str, Any]
+
+
+class BatchGetRequest(BaseModel):
+    dataset: str = Field(min_length=1)
+    ids: list[str] = Field(max_length=MAX_BATCH_ITEMS)
+    consistent_read: bool = False
+
+
+class BatchWriteRequest(BaseModel):
+    dataset: str = Field(min_length=1)
+    put: list[DatasetItem] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    delete: list[str] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+
+def client_config():
+    """botocore config for the Lambda's DynamoDB client: pooled, keep-alive, adaptive retries."""
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=2,
+        read_timeout=5,
+        retries={"mode": "adaptive", "max_attempts": 5},
+    )
+
+
+def _key(dataset: str, item_id: str) -> dict:
+    return {"pk": {"S": f"dataset#{dataset}"}, "sk": {"S": f"item#{item_id}"}}
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _backoff(attempt: int):
+    time.sleep(min(1.0, 0.025 * 2**attempt) * random.uniform(0.5, 1.0))
+
+
+def _to_dynamodb(data: dict) -> dict:
+    from boto3.dynamodb.types import TypeSerializer
+
+    # DynamoDB numbers must be Decimals, not floats
+    data = json.loads(json.dumps(data), parse_float=Decimal)
+    serializer = TypeSerializer()
+    return {"M": {k: serializer.serialize(v) for k, v in data.items()}}
+
+
+def _from_dynamodb(attribute: dict) -> dict:
+    from boto3.dynamodb.types import TypeDeserializer
+
+    return TypeDeserializer().deserialize(attribute)
+
+
+def _run_chunks(fn, chunks: list) -> list:
+    if len(chunks) <= 1:
+        return [fn(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_POOL_CONNECTIONS)) as ex:
+        return list(ex.map(fn, chunks))
+
+
+def duplicate_ids(request: BatchWriteRequest) -> set[str]:
+    """Ids that appear twice in one write; DynamoDB rejects such batches outright."""
+    seen, duplicates = set(), set()
+    for item_id in [item.id for item in request.put] + request.delete:
+        (duplicates if item_id in seen else seen).add(item_id)
+    return duplicates
+
+
+def get_items(
+    client,
+    table_name: str,
+    keys: list[dict],
+    consistent_read=False,
+    projection: Optional[str] = None,
+    attribute_names: Optional[dict] = None,
+) -> list[dict]:
+    """Raw BatchGetItem over any number of keys, chunked and retried; order is not kept."""
+
+    def get_chunk(chunk: list[dict]) -> list[dict]:
+        found = []
+        request: dict = {"Keys": chunk, "ConsistentRead": consistent_read}
+        if projection:
+            request["ProjectionExpression"] = projection
+        if attribute_names:
+            request["ExpressionAttributeNames"] = attribute_names
+        request_items: Optional[dict] = {table_name: request}
+        for attempt in range(MAX_UNPROCESSED_RETRIES + 1):
+            response = client.batch_get_item(RequestItems=request_items)
+            found.extend(response.get("Responses", {}).get(table_name, []))
+            request_items = response.get("UnprocessedKeys") or None
+            if not request_items:
+                return found
+            _backoff(attempt)
+        raise UnprocessedItemsError(
+            f"{len(request_items[table_name]['Keys'])} keys unprocessed"
+        )
+
+    items = []
+    for found in _run_chunks(get_chunk, list(_chunks(keys, BATCH_GET_LIMIT))):
+        items.extend(found)
+    return items
+
+
+def write_requests(client, table_name: str, requests: list[dict]):
+    """Raw BatchWriteItem over any number of Put/DeleteRequests, chunked and retried."""
+
+    def write_chunk(chunk: list[dict]):
+        request_items: Optional[dict] = {table_name: chunk}
+        for attempt in range(MAX_UNPROCESSED_RETRIES + 1):
+            response = client.batch_write_item(RequestItems=request_items)
+            request_items = response.get("UnprocessedItems") or None
+            if not request_items:
+                return
+            _backoff(attempt)
+        raise UnprocessedItemsError(
+            f"{len(request_items[table_name])} write requests unprocessed"
+        )
+
+    _run_chunks(write_chunk, list(_chunks(requests, BATCH_WRITE_LIMIT)))
+
+
+def batch_get(
+    client, table_name: str, dataset: str, ids: list[str], consistent_read=False
+) -> dict[str, dict]:
+    """Fetch many items by id; ids that do not exist are simply absent from the result."""
+    items = get_items(
+        client,
+        table_name,
+        [_key(dataset, item_id) for item_id in dict.fromkeys(ids)],
+        consistent_read=consistent_read,
+        projection="sk, #data",
+        attribute_names={"#data": "data"},
+    )
+    return {
+        item["sk"]["S"].removeprefix("item#"): _from_dynamodb(item["data"])
+        for item in items
+    }
+
+
+def batch_write(
+    client,
+    table_name: str,
+    dataset: str,
+    put: list[DatasetItem],
+    delete: list[str],
+) -> dict:
+    requests = [
+        {
+            "PutRequest": {
+                "Item": {
+                    **_key(dataset, item.id),
+                    "data": _to_dynamodb(item.data),
+                    "updated_at": {"N": str(int(time.time()))},
+                }
+            }
+        }
+        for item in put
+    ]
+    requests.extend({"DeleteRequest": {"Key": _key(dataset, i)}} for i in delete)
+    write_requests(client, table_name, requests)
+    return {"written": len(put), "deleted": len(delete)}
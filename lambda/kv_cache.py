@@ -0,0 +1,340 @@
+"""Two-tier key-value cache: an in-container LRU in front of the DynamoDB table.
+
+Values are opaque bytes with a content type, stored in the app's single table
+next to the ``DynamoDbMemory`` resources under their own key prefix::
+
+    pk = "cache#<namespace>", sk = "key#<key>"            head item
+    pk = "cache#<namespace>", sk = "chunk#<key>#<n>"      only for large values
+
+Values up to ``INLINE_BYTES`` live in the head item. Anything larger is split
+into ``CHUNK_BYTES`` chunk items (DynamoDB caps an item at 400 KB), written
+before the head and tagged with the value's content hash, so a reader never
+assembles chunks from two different writes.
+
+Expiry uses the table's TTL attribute (``expires_at``, epoch seconds). DynamoDB
+deletes expired items lazily, up to a couple of days later, so reads check the
+timestamp themselves as well.
+
+The front tier keeps recently used entries in memory, bounded by
+``max_local_bytes``. Because other containers may overwrite a key, a local
+entry is only trusted for ``local_ttl`` seconds; after that the head item is
+read again and the local value reused if its hash still matches.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import dynamo_batch
+
+TTL_ATTRIBUTE = "expires_at"
+INLINE_BYTES = 256 * 1024
+CHUNK_BYTES = 350 * 1024
+# Function URL payloads are capped at 6 MB, base64 included
+MAX_VALUE_BYTES = 4 * 1024 * 1024
+
+DEFAULT_MAX_LOCAL_BYTES = int(
+    os.environ.get("KV_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+DEFAULT_LOCAL_TTL = float(os.environ.get("KV_CACHE_LOCAL_TTL_SECONDS", "5"))
+
+NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+# "#" separates the parts of a sort key, so it may not appear in a key
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9._:/-]{1,512}$")
+
+
+class InvalidKey(ValueError):
+    """A namespace or key outside NAMESPACE_PATTERN / KEY_PATTERN."""
+
+
+class ValueTooLarge(ValueError):
+    """A value over MAX_VALUE_BYTES."""
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: bytes
+    content_type: str
+    # sha256 of the value, also the version chunks are tagged with
+    etag: str
+    updated_at: float
+    expires_at: Optional[int] = None
+    chunks: int = 0
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        if self.expires_at is None:
+            return False
+        return self.expires_at <= (time.time() if now is None else now)
+
+
+def _validate(namespace: str, key: str):
+    if not NAMESPACE_PATTERN.match(namespace):
+        raise InvalidKey(f"namespace must match {NAMESPACE_PATTERN.pattern}")
+    if not KEY_PATTERN.match(key):
+        raise InvalidKey(f"key must match {KEY_PATTERN.pattern}")
+
+
+def _head_key(namespace: str, key: str) -> dict:
+    return {"pk": {"S": f"cache#{namespace}"}, "sk": {"S": f"key#{key}"}}
+
+
+def _chunk_key(namespace: str, key: str, index: int) -> dict:
+    return {"pk": {"S": f"cache#{namespace}"}, "sk": {"S": f"chunk#{key}#{index:04d}"}}
+
+
+def _expiry(expires_at: Optional[int]) -> dict:
+    return {} if expires_at is None else {TTL_ATTRIBUTE: {"N": str(expires_at)}}
+
+
+class KeyValueCache:
+    def __init__(
+        self,
+        client,
+        table_name: str,
+        max_local_bytes: int = DEFAULT_MAX_LOCAL_BYTES,
+        local_ttl: float = DEFAULT_LOCAL_TTL,
+    ):
+        self.client = client
+        self.table_name = table_name
+        self.max_local_bytes = max_local_bytes
+        self.local_ttl = local_ttl
+        # (namespace, key) -> (when it was last read from DynamoDB, entry)
+        self._local: OrderedDict[tuple[str, str], tuple[float, CacheEntry]] = (
+            OrderedDict()
+        )
+        self._local_bytes = 0
+        # sync routes run in a thread pool
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "remote_hits": 0, "misses": 0}
+
+    def _remember(self, namespace: str, key: str, entry: CacheEntry):
+        with self._lock:
+            self._forget_locked(namespace, key)
+            if len(entry.value) > self.max_local_bytes:
+                return
+            self._local[(namespace, key)] = (time.monotonic(), entry)
+            self._local_bytes += len(entry.value)
+            while self._local_bytes > self.max_local_bytes:
+                _, (_, evicted) = self._local.popitem(last=False)
+                self._local_bytes -= len(evicted.value)
+
+    def _forget_locked(self, namespace: str, key: str):
+        if (cached := self._local.pop((namespace, key), None)) is not None:
+            self._local_bytes -= len(cached[1].value)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _get_head(self, namespace: str, key: str, consistent_read=False) -> dict:
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key=_head_key(namespace, key),
+            ConsistentRead=consistent_read,
+        )
+        return response.get("Item")
+
+    def _read_chunks(self, namespace: str, key: str, head: dict) -> Optional[bytes]:
+        count, etag = int(head["chunks"]["N"]), head["etag"]["S"]
+        items = dynamo_batch.get_items(
+            self.client,
+            self.table_name,
+            [_chunk_key(namespace, key, index) for index in range(count)],
+            # chunks are written just before their head item
+            consistent_read=True,
+        )
+        chunks = {item["sk"]["S"]: item for item in items}
+        parts = []
+        for index in range(count):
+            chunk = chunks.get(_chunk_key(namespace, key, index)["sk"]["S"])
+            if chunk is None or chunk["etag"]["S"] != etag:
+                # overwritten while we were reading; treat as a miss
+                return None
+            parts.append(chunk["value"]["B"])
+        return b"".join(parts)
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        _validate(namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            fetched_at, cached = self._local.get((namespace, key), (0.0, None))
+            if cached is not None:
+                self._local.move_to_end((namespace, key))
+        if cached is not None and not cached.expired():
+            if now - fetched_at < self.local_ttl:
+                self._count("local_hits")
+                return cached
+
+        head = self._get_head(namespace, key)
+        expires_at = (
+            int(head[TTL_ATTRIBUTE]["N"]) if head and TTL_ATTRIBUTE in head else None
+        )
+        if head is None or (expires_at is not None and expires_at <= time.time()):
+            with self._lock:
+                self._forget_locked(namespace, key)
+            self._count("misses")
+            return None
+
+        if cached is not None and cached.etag == head["etag"]["S"]:
+            # unchanged since we last read it: keep the local value
+            value = cached.value
+        elif "chunks" in head:
+            if (value := self._read_chunks(namespace, key, head)) is None:
+                self._count("misses")
+                return None
+        else:
+            value = head["value"]["B"]
+        entry = CacheEntry(
+            value=value,
+            content_type=head["content_type"]["S"],
+            etag=head["etag"]["S"],
+            updated_at=float(head["updated_at"]["N"]),
+            expires_at=expires_at,
+            chunks=int(head["chunks"]["N"]) if "chunks" in head else 0,
+        )
+        self._remember(namespace, key, entry)
+        self._count("remote_hits")
+        return entry
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        content_type: str = "application/octet-stream",
+        ttl: Optional[int] = None,
+    ) -> CacheEntry:
+        """Store ``value``; ``ttl`` in seconds, None or 0 to keep it until deleted."""
+        _validate(namespace, key)
+        if len(value) > MAX_VALUE_BYTES:
+            raise ValueTooLarge(f"values are limited to {MAX_VALUE_BYTES} bytes")
+        now = time.time()
+        entry = CacheEntry(
+            value=value,
+            content_type=content_type,
+            etag=hashlib.sha256(value).hexdigest()[:32],
+            updated_at=now,
+            expires_at=int(now + ttl) if ttl else None,
+        )
+        previous = self._get_head(namespace, key, consistent_read=True)
+        previous_chunks = (
+            int(previous["chunks"]["N"]) if previous and "chunks" in previous else 0
+        )
+
+        head = {
+            **_head_key(namespace, key),
+            "content_type": {"S": entry.content_type},
+            "etag": {"S": entry.etag},
+            "size": {"N": str(len(value))},
+            "updated_at": {"N": str(int(now))},
+            **_expiry(entry.expires_at),
+        }
+        if len(value) <= INLINE_BYTES:
+            head["value"] = {"B": value}
+        else:
+            entry = replace(entry, chunks=-(-len(value) // CHUNK_BYTES))
+            head["chunks"] = {"N": str(entry.chunks)}
+            dynamo_batch.write_requests(
+                self.client,
+                self.table_name,
+                [
+                    {
+                        "PutRequest": {
+                            "Item": {
+                                **_chunk_key(namespace, key, index),
+                                "etag": {"S": entry.etag},
+                                "value": {
+                                    "B": value[
+                                        index * CHUNK_BYTES : (index + 1) * CHUNK_BYTES
+                                    ]
+                                },
+                                **_expiry(entry.expires_at),
+                            }
+                        }
+                    }
+                    for index in range(entry.chunks)
+                ],
+            )
+        self.client.put_item(TableName=self.table_name, Item=head)
+        self._delete_chunks(namespace, key, entry.chunks, previous_chunks)
+        self._remember(namespace, key, entry)
+        return entry
+
+    def _delete_chunks(self, namespace: str, key: str, start: int, stop: int):
+        dynamo_batch.write_requests(
+            self.client,
+            self.table_name,
+            [
+                {"DeleteRequest": {"Key": _chunk_key(namespace, key, index)}}
+                for index in range(start, stop)
+            ],
+        )
+
+    def delete(self, namespace: str, key: str) -> bool:
+        """Remove a key from both tiers; False if it did not exist."""
+        _validate(namespace, key)
+        with self._lock:
+            self._forget_locked(namespace, key)
+        response = self.client.delete_item(
+            TableName=self.table_name,
+            Key=_head_key(namespace, key),
+            ReturnValues="ALL_OLD",
+        )
+        if (previous := response.get("Attributes")) is None:
+            return False
+        if "chunks" in previous:
+            self._delete_chunks(namespace, key, 0, int(previous["chunks"]["N"]))
+        return True
+
+    def keys(self, namespace: str, limit: int = 100) -> list[dict]:
+        """Unexpired keys of a namespace with their size and content type, no values."""
+        if not NAMESPACE_PATTERN.match(namespace):
+            raise InvalidKey(f"namespace must match {NAMESPACE_PATTERN.pattern}")
+        now = time.time()
+        found = []
+        request = {
+            "TableName": self.table_name,
+            "KeyConditionExpression": "pk = :pk AND begins_with(sk, :prefix)",
+            "ExpressionAttributeValues": {
+                ":pk": {"S": f"cache#{namespace}"},
+                ":prefix": {"S": "key#"},
+            },
+            "ProjectionExpression": "sk, #size, content_type, etag, updated_at, #ttl",
+            "ExpressionAttributeNames": {"#size": "size", "#ttl": TTL_ATTRIBUTE},
+        }
+        while len(found) < limit:
+            response = self.client.query(**request)
+            for item in response.get("Items", []):
+                expires_at = (
+                    int(item[TTL_ATTRIBUTE]["N"]) if TTL_ATTRIBUTE in item else None
+                )
+                if expires_at is not None and expires_at <= now:
+                    continue
+                found.append(
+                    {
+                        "key": item["sk"]["S"].removeprefix("key#"),
+                        "size": int(item["size"]["N"]),
+                        "content_type": item["content_type"]["S"],
+                        "etag": item["etag"]["S"],
+                        "updated_at": int(item["updated_at"]["N"]),
+                        "expires_at": expires_at,
+                    }
+                )
+            if "LastEvaluatedKey" not in response:
+                break
+            request["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return found[:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "local_entries": len(self._local),
+                "local_bytes": self._local_bytes,
+                "max_local_bytes": self.max_local_bytes,
+            }
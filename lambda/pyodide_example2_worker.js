@@ -0,0 +1,169 @@
+// Runs Pyodide for pyodide_example2.html off the main thread.
+//
+// Messages in:  {id, type: "load", name, buffer}  -- buffer is a transferred ArrayBuffer
+//               {id, type: "run", code}
+//               {id, type: "clear"}
+// Messages out: {type: "ready", restored}, {id, type: "progress" | "result" | "error", ...}
+//
+// DATA_DIR is backed by IndexedDB: the uploaded CSV (and anything user code
+// writes there) is kept across visits, so a reload re-parses the saved file
+// instead of asking for it again. The raw bytes are stored once per load --
+// they are what the user picked, and reading them back runs no pickled code.
+// IndexedDB is only written when something under DATA_DIR changed.
+importScripts("/vendor/pyodide/v0.26.3/pyodide.js");
+
+const ROWS_PER_CHUNK = 100000;
+const DATA_DIR = "/data";
+const SAVED_CSV_PATH = `${DATA_DIR}/upload.csv`;
+
+function syncfs(pyodide, populate) {
+  // populate=true loads IndexedDB into the mount, false writes changes back
+  return new Promise((resolve, reject) =>
+    pyodide.FS.syncfs(populate, (err) => (err ? reject(err) : resolve()))
+  );
+}
+
+function dataStamp(pyodide, dir = DATA_DIR) {
+  // Path, size and mtime of everything under dir; cheap next to a syncfs,
+  // which walks the mount and opens an IndexedDB transaction
+  const entries = [];
+  for (const name of pyodide.FS.readdir(dir)) {
+    if (name === "." || name === "..") {
+      continue;
+    }
+    const path = `${dir}/${name}`;
+    const stat = pyodide.FS.stat(path);
+    entries.push(`${path}:${stat.size}:${Number(stat.mtime)}`);
+    if (pyodide.FS.isDir(stat.mode)) {
+      entries.push(dataStamp(pyodide, path));
+    }
+  }
+  return entries.join("|");
+}
+
+async function mountData(pyodide) {
+  pyodide.FS.mkdirTree(DATA_DIR);
+  pyodide.FS.mount(pyodide.FS.filesystems.IDBFS, {}, DATA_DIR);
+  await syncfs(pyodide, true);
+}
+
+async function init() {
+  const pyodide = await loadPyodide();
+  await Promise.all([pyodide.loadPackage("pandas"), mountData(pyodide)]);
+  pyodide.runPython(`
+import os
+
+import pandas as pd
+
+df = None
+
+def load_csv(path, rows_per_chunk, report):
+    """Parse the upload once, in chunks, straight from the in-memory file.
+
+    Each chunk is split into per-column copies as it arrives and the frame is
+    assembled one column at a time, dropping that column's pieces as soon as
+    it is joined. pd.concat over whole chunks would hold every chunk and the
+    complete result at once, about twice the data, in a heap that cannot grow
+    past the wasm limit.
+    """
+    global df
+    df = None
+    columns = {}
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=rows_per_chunk):
+        for name in chunk.columns:
+            # A copy owns its data; a view would keep the whole chunk alive
+            columns.setdefault(name, []).append(chunk[name].copy())
+        rows += len(chunk)
+        report(rows)
+        del chunk
+    data = {}
+    for name in list(columns):
+        # Series concat keeps pandas' dtype rules when chunks disagree
+        data[name] = pd.concat(columns.pop(name), ignore_index=True)
+    df = pd.DataFrame(data, copy=False)
+    return df.shape
+
+def clear_data(directory):
+    global df
+    df = None
+    for name in os.listdir(directory):
+        os.unlink(os.path.join(directory, name))
+  `);
+  return pyodide;
+}
+
+const pyodideReadyPromise = init();
+pyodideReadyPromise.then(
+  (pyodide) => {
+    let restored = null;
+    if (pyodide.FS.analyzePath(SAVED_CSV_PATH).exists) {
+      const report = (rows) => self.postMessage({ type: "progress", rows });
+      try {
+        const shape = pyodide.globals
+          .get("load_csv")(SAVED_CSV_PATH, ROWS_PER_CHUNK, report)
+          .toJs();
+        restored = `df restored: ${shape[0]} rows x ${shape[1]} columns`;
+      } catch (err) {
+        restored = `Could not restore the saved df: ${err}`;
+      }
+    }
+    self.postMessage({ type: "ready", restored });
+  },
+  (err) => self.postMessage({ type: "error", error: String(err) })
+);
+
+async function loadFile(pyodide, id, buffer) {
+  // canOwn hands the transferred buffer to the mount without copying it, and
+  // pandas reads it back in chunks, so the CSV text is never duplicated; the
+  // same file is what the next syncfs saves
+  pyodide.FS.writeFile(SAVED_CSV_PATH, new Uint8Array(buffer), { canOwn: true });
+  const report = (rows) => self.postMessage({ id, type: "progress", rows });
+  try {
+    const shape = pyodide.globals
+      .get("load_csv")(SAVED_CSV_PATH, ROWS_PER_CHUNK, report)
+      .toJs();
+    return `df loaded: ${shape[0]} rows x ${shape[1]} columns`;
+  } catch (err) {
+    // Not worth keeping a file that does not parse
+    pyodide.FS.unlink(SAVED_CSV_PATH);
+    throw err;
+  }
+}
+
+self.onmessage = async (event) => {
+  const { id, type } = event.data;
+  const pyodide = await pyodideReadyPromise;
+  const before = dataStamp(pyodide);
+  let reply;
+  try {
+    let result;
+    if (type === "load") {
+      result = await loadFile(pyodide, id, event.data.buffer);
+    } else if (type === "run") {
+      const value = await pyodide.runPythonAsync(event.data.code);
+      result = String(value);
+      if (value && value.destroy) {
+        value.destroy();
+      }
+    } else if (type === "clear") {
+      pyodide.globals.get("clear_data")(DATA_DIR);
+      result = "Saved data cleared";
+    } else {
+      throw new Error(`unknown message type ${type}`);
+    }
+    reply = { id, type: "result", result };
+  } catch (err) {
+    reply = { id, type: "error", error: String(err) };
+  }
+  try {
+    // Persist whatever changed under DATA_DIR -- a new upload, a clear, or
+    // files user code wrote (even if it then failed); most runs change nothing
+    if (dataStamp(pyodide) !== before) {
+      await syncfs(pyodide, false);
+    }
+  } catch (err) {
+    reply = { id, type: "error", error: `Could not save ${DATA_DIR}: ${err}` };
+  }
+  self.postMessage(reply);
+};
@@ -0,0 +1,280 @@
+"""Per-route request metrics as pure ASGI middleware.
+
+``MetricsMiddleware`` sits outermost and sees the bytes that actually leave the
+function; ``UncompressedSizeMiddleware`` sits inside GZipMiddleware and notes
+the size before compression, so the two together give a compression ratio.
+Each request is emitted as a CloudWatch Embedded Metric Format line and folded
+into an in-process histogram that ``/api/_metrics`` reports.
+
+Requests a handler marks as ``warm`` in the request state (the keep-warm
+pings to ``/api/_warm``) are kept apart: their own section of the snapshot, and
+``Traffic=warm`` rather than ``user`` in the EMF line.
+
+Every response also carries a ``Server-Timing`` header: ``handler`` is the time
+until the first body bytes reach GZipMiddleware, ``compress`` the time
+GZipMiddleware spent before the response left, and handlers add their own
+phases (e.g. ``read`` for file reads) through ``record_timing``.
+"""
+
+import bisect
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "PyodideLambdaDeploy")
+EMIT_EMF = os.environ.get("METRICS_EMF", "1") not in ("", "0")
+EMIT_SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") not in ("", "0")
+
+# Histogram bucket upper bounds in ms: 0.1ms growing by 1.5x up to ~2 minutes
+LATENCY_BUCKETS_MS = [0.1 * 1.5**i for i in range(36)]
+
+# Key under scope["state"] where handlers/middleware leave per-request details
+SCOPE_STATE_KEY = "request_metrics"
+
+
+def request_metrics_state(scope: Scope) -> dict:
+    return scope.setdefault("state", {}).setdefault(SCOPE_STATE_KEY, {})
+
+
+@contextmanager
+def record_timing(scope: Scope, name: str):
+    """Add the time spent in the block to this request's ``Server-Timing`` entry ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = request_metrics_state(scope).setdefault("timings", {})
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def server_timing(state: dict, start: float, now: float) -> str:
+    body_started_at = state.get("body_started_at", now)
+    timings = {
+        "handler": (body_started_at - start) * 1000,
+        **state.get("timings", {}),
+        "compress": (now - body_started_at) * 1000,
+        "total": (now - start) * 1000,
+    }
+    return ", ".join(f"{name};dur={ms:.3f}" for name, ms in timings.items())
+
+
+class RouteStats:
+    __slots__ = ("count", "errors", "bytes_out", "uncompressed_bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes_out = 0
+        self.uncompressed_bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, status: int, latency_ms: float, bytes_out: int, raw_bytes: int):
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        self.bytes_out += bytes_out
+        self.uncompressed_bytes += raw_bytes
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return None
+        threshold = pct / 100 * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= threshold:
+                if idx < len(LATENCY_BUCKETS_MS):
+                    return round(LATENCY_BUCKETS_MS[idx], 3)
+                return float("inf")
+        return None
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "bytes_out": self.bytes_out,
+            "compression_ratio": (
+                round(self.uncompressed_bytes / self.bytes_out, 3)
+                if self.bytes_out
+                else None
+            ),
+        }
+
+
+class MetricsRecorder:
+    def __init__(self):
+        self.routes: dict[str, RouteStats] = {}
+        # keep-warm pings, so they do not skew the latency of real traffic
+        self.warm_routes: dict[str, RouteStats] = {}
+        self.started_at = time.time()
+
+    def record(
+        self,
+        route: str,
+        status: int,
+        latency_ms: float,
+        bytes_out: int,
+        raw_bytes: int,
+        warm: bool = False,
+    ):
+        routes = self.warm_routes if warm else self.routes
+        if (stats := routes.get(route)) is None:
+            stats = routes[route] = RouteStats()
+        stats.record(status, latency_ms, bytes_out, raw_bytes)
+
+    def snapshot(self) -> dict:
+        return {
+            "since": self.started_at,
+            "routes": {
+                route: stats.summary() for route, stats in sorted(self.routes.items())
+            },
+            "warm": {
+                route: stats.summary()
+                for route, stats in sorted(self.warm_routes.items())
+            },
+        }
+
+
+def emf_line(
+    route: str,
+    method: str,
+    status: int,
+    latency_ms: float,
+    bytes_out: int,
+    raw_bytes: int,
+    warm: bool = False,
+) -> str:
+    return json.dumps(
+        {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": METRICS_NAMESPACE,
+                        # keep-warm pings stay out of the per-route series;
+                        # Traffic alone gives the warm vs user totals
+                        "Dimensions": [["Route", "Traffic"], ["Traffic"]],
+                        "Metrics": [
+                            {"Name": "Latency", "Unit": "Milliseconds"},
+                            {"Name": "ResponseBytes", "Unit": "Bytes"},
+                            {"Name": "CompressionRatio", "Unit": "None"},
+                        ],
+                    }
+                ],
+            },
+            "Route": route,
+            "Traffic": "warm" if warm else "user",
+            "Method": method,
+            "Status": status,
+            "Latency": round(latency_ms, 3),
+            "ResponseBytes": bytes_out,
+            "CompressionRatio": round(raw_bytes / bytes_out, 3) if bytes_out else 1.0,
+        },
+        separators=(",", ":"),
+    )
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        recorder: MetricsRecorder,
+        emit_emf: bool = EMIT_EMF,
+        emit_server_timing: bool = EMIT_SERVER_TIMING,
+    ):
+        self.app = app
+        self.recorder = recorder
+        self.emit_emf = emit_emf
+        self.emit_server_timing = emit_server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        bytes_out = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, bytes_out
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.emit_server_timing:
+                    value = server_timing(
+                        request_metrics_state(scope), start, time.perf_counter()
+                    )
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", value.encode("latin-1")),
+                    ]
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            state = request_metrics_state(scope)
+            raw_bytes = state.get("uncompressed_bytes", bytes_out)
+            warm = state.get("warm", False)
+            self.recorder.record(
+                route, status, latency_ms, bytes_out, raw_bytes, warm=warm
+            )
+            if self.emit_emf:
+                sys.stdout.write(
+                    emf_line(
+                        route,
+                        scope["method"],
+                        status,
+                        latency_ms,
+                        bytes_out,
+                        raw_bytes,
+                        warm=warm,
+                    )
+                    + "\n"
+                )
+
+
+class UncompressedSizeMiddleware:
+    """Counts response bytes before GZipMiddleware sees them.
+
+    Also notes when the first body message leaves the app, which splits the
+    ``Server-Timing`` total into handler and compression time.
+
+    Handlers serving precompressed files set ``uncompressed_bytes`` themselves
+    (see ``request_metrics_state``); that value wins over the count here.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = request_metrics_state(scope)
+        raw_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal raw_bytes
+            if message["type"] == "http.response.body":
+                state.setdefault("body_started_at", time.perf_counter())
+                raw_bytes += len(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        state.setdefault("uncompressed_bytes", raw_bytes)
@@ -0,0 +1,130 @@
+"""Pinned browser runtimes (Pyodide, stlite) served from the function's own origin.
+
+``invoke vendor-runtime`` downloads the versions pinned in ``runtime-pins.json``
+(checked against the sha256 pinned there) into ``vendor/`` and writes
+``vendor/runtime-lock.json`` with the exact files and sha256 of every wheel
+each page needs. Pages reference everything under ``/vendor/...``; a file that
+was not vendored, or is too large for one Lambda response, is redirected to
+the same pinned version on the CDN, so a deploy without a vendor step still
+works.
+
+Each page's dependencies are also listed there (``pages``), so the HTML
+responses can carry ``Link: rel=preload`` headers and the browser starts
+fetching the runtime before it has parsed the page. Only what the page's main
+thread loads is listed under ``runtimes`` and ``files``: a preload is not
+shared with Web Workers, so whatever a worker fetches (Pyodide under stlite
+and on /pyodide2, the worker scripts) goes in ``worker_files`` or nowhere,
+or it would be downloaded twice.
+
+The same pins drive the service worker (``/sw.js``): its cache version is
+derived from them, so a new runtime pin evicts everything cached for the old
+one on the browser's next visit.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import PurePosixPath
+from typing import Optional
+
+RUNTIME_PINS = "runtime-pins.json"
+VENDOR_DIR = "vendor"
+
+# Lets local runs point the fallback at a stub CDN (see benchmarks/stub_cdn.py)
+CDN_BASE_OVERRIDE = os.environ.get("RUNTIME_CDN_BASE")
+_DEFAULT_CDN_BASE = "https://cdn.jsdelivr.net"
+
+
+def load_pins(path=RUNTIME_PINS) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+# Preload destination by file extension; anything else is fetched by the runtime
+_PRELOAD_AS = {".js": "script", ".css": "style"}
+
+
+def _link(url: str) -> str:
+    suffix = PurePosixPath(url).suffix
+    if suffix == ".mjs":
+        return f"<{url}>; rel=modulepreload"
+    if (destination := _PRELOAD_AS.get(suffix)) is not None:
+        return f"<{url}>; rel=preload; as={destination}"
+    # Pyodide fetch()es these in CORS mode, which the preload has to match
+    return f"<{url}>; rel=preload; as=fetch; crossorigin"
+
+
+def vendor_route_prefix(pins: dict, runtime: str) -> str:
+    version = pins[runtime]["version"]
+    if runtime == "pyodide":
+        return f"/vendor/pyodide/v{version}/"
+    return f"/vendor/{runtime}/{version}/"
+
+
+def preload_links(pins: dict, page: str) -> Optional[str]:
+    """``Link`` header value preloading everything ``page`` loads at startup."""
+    if (deps := pins.get("pages", {}).get(page)) is None:
+        return None
+    urls = []
+    for runtime in deps["runtimes"]:
+        prefix = vendor_route_prefix(pins, runtime)
+        urls.extend(prefix + name for name in pins[runtime].get("preload", []))
+    urls.extend(deps["files"])
+    return ", ".join(_link(url) for url in urls) or None
+
+
+SERVICE_WORKER_TEMPLATE = "service_worker.js"
+SERVICE_WORKER_PLACEHOLDER = "SW_CONFIG_JSON"
+# micropip's wheels from PyPI live under content-addressed URLs
+PYPI_FILES_PREFIX = "https://files.pythonhosted.org/packages/"
+
+
+def service_worker_config(pins: dict) -> dict:
+    """What the service worker precaches, caches forever and revalidates."""
+    prefixes = vendor_prefixes(pins)
+    precache = []
+    for runtime in ("pyodide", "stlite"):
+        prefix = vendor_route_prefix(pins, runtime)
+        precache.extend(prefix + name for name in pins[runtime].get("preload", []))
+    pages = []
+    for page, deps in pins.get("pages", {}).items():
+        pages.append(page)
+        pages.extend(deps["files"])
+        pages.extend(deps.get("worker_files", []))
+    return {
+        "precache": precache,
+        # versioned paths: a cached response never goes stale
+        "immutable": sorted(prefixes) + sorted(prefixes.values()) + [PYPI_FILES_PREFIX],
+        "pages": pages,
+    }
+
+
+def render_service_worker(template: str, pins: dict) -> bytes:
+    """The service worker script with its config and cache version filled in."""
+    config = service_worker_config(pins)
+    # the template is hashed too, so a change to the worker itself rolls the caches
+    config["version"] = hashlib.sha256(
+        (json.dumps(config, sort_keys=True) + template).encode()
+    ).hexdigest()[:16]
+    return template.replace(SERVICE_WORKER_PLACEHOLDER, json.dumps(config)).encode()
+
+
+def vendor_prefixes(pins: dict) -> dict[str, str]:
+    """Map of /vendor/... route prefix -> pinned CDN base URL."""
+    prefixes = {
+        vendor_route_prefix(pins, runtime): pins[runtime]["base_url"]
+        for runtime in ("pyodide", "stlite")
+    }
+    if CDN_BASE_OVERRIDE:
+        prefixes = {
+            prefix: url.replace(_DEFAULT_CDN_BASE, CDN_BASE_OVERRIDE.rstrip("/"))
+            for prefix, url in prefixes.items()
+        }
+    return prefixes
+
+
+def cdn_fallback_url(route: str, prefixes: dict[str, str]) -> Optional[str]:
+    for prefix, base_url in prefixes.items():
+        if route.startswith(prefix):
+            return base_url + route.removeprefix(prefix)
+    return None
@@ -0,0 +1,104 @@
+// Service worker for the Pyodide and stlite pages, served as /sw.js.
+//
+// - Runtime files (/vendor/..., the pinned CDN fallbacks, micropip's PyPI
+//   wheels) live under versioned URLs: cache-first, kept until the version
+//   changes.
+// - Pages and their scripts: answered from cache right away and refreshed in
+//   the background (stale-while-revalidate), so an update shows on the next visit.
+// - Everything else, /api/* included, goes straight to the network.
+//
+// SW_CONFIG is filled in by runtime_assets.render_service_worker. Its version
+// changes with the runtime pins or this file; activating a new version drops
+// every cache of the old one.
+const SW_CONFIG = SW_CONFIG_JSON;
+const RUNTIME_CACHE = `runtime-${SW_CONFIG.version}`;
+const PAGE_CACHE = `pages-${SW_CONFIG.version}`;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches
+      .open(RUNTIME_CACHE)
+      // Usually a revalidation: the page that registered us just fetched these
+      .then((cache) => cache.addAll(SW_CONFIG.precache))
+      .catch((err) => console.warn("Service worker precache failed:", err))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter((name) => name !== RUNTIME_CACHE && name !== PAGE_CACHE)
+            .map((name) => caches.delete(name))
+        )
+      )
+      // Take over pages already open, so their remaining fetches are cached too
+      .then(() => self.clients.claim())
+  );
+});
+
+function isImmutable(url) {
+  const sameOrigin = url.origin === self.location.origin;
+  return SW_CONFIG.immutable.some((prefix) =>
+    prefix.startsWith("/")
+      ? sameOrigin && url.pathname.startsWith(prefix)
+      : url.href.startsWith(prefix)
+  );
+}
+
+function isPage(url) {
+  return (
+    url.origin === self.location.origin &&
+    SW_CONFIG.pages.some(
+      (page) => url.pathname === page || url.pathname.startsWith(page + "/")
+    )
+  );
+}
+
+async function cacheFirst(request) {
+  const cache = await caches.open(RUNTIME_CACHE);
+  const cached = await cache.match(request);
+  if (cached) {
+    return cached;
+  }
+  const response = await fetch(request);
+  // Opaque (no-cors) responses hide their status; never pin an error
+  if (response.ok) {
+    cache.put(request, response.clone());
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(PAGE_CACHE);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then((response) => {
+    if (response.ok) {
+      cache.put(event.request, response.clone());
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network;
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  // Range requests address part of a body; the cache only holds whole ones
+  if (request.method !== "GET" || request.headers.has("range")) {
+    return;
+  }
+  const url = new URL(request.url);
+  if (isImmutable(url)) {
+    event.respondWith(cacheFirst(request));
+  } else if (isPage(url)) {
+    event.respondWith(staleWhileRevalidate(event));
+  }
+});
@@ -0,0 +1,71 @@
+"""Opt-in import timing for cold-start investigations.
+
+Set ``APP_PROFILE_STARTUP=1`` on the function and ``app.py`` will log, once per
+container, how long each top-level package took to import -- the same numbers
+``python -X importtime`` prints, aggregated so they fit in one log line.
+"""
+
+import builtins
+import importlib.util
+import json
+import sys
+import time
+from collections import defaultdict
+
+_original_import = builtins.__import__
+_enabled_at = None
+_child_time = []
+# module name -> [self seconds, cumulative seconds]
+_timings: dict[str, list] = {}
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    module_name = name
+    if level:
+        package = (globals or {}).get("__package__") or ""
+        try:
+            module_name = importlib.util.resolve_name("." * level + name, package)
+        except ImportError:
+            pass
+    if module_name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _child_time.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _child_time.pop()
+        if _child_time:
+            _child_time[-1] += elapsed
+        self_time, cumulative = _timings.get(module_name, (0.0, 0.0))
+        _timings[module_name] = [self_time + elapsed - children, cumulative + elapsed]
+
+
+def enable():
+    global _enabled_at
+    if _enabled_at is None:
+        _enabled_at = time.perf_counter()
+        builtins.__import__ = _timed_import
+
+
+def disable():
+    builtins.__import__ = _original_import
+
+
+def report(top: int = 15) -> dict:
+    """Stop timing and summarise import cost (ms) per top-level package."""
+    disable()
+    per_package = defaultdict(float)
+    for module_name, (self_time, _) in _timings.items():
+        per_package[module_name.partition(".")[0]] += self_time
+    ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": round((time.perf_counter() - (_enabled_at or 0)) * 1000, 2),
+        "packages_ms": {name: round(t * 1000, 2) for name, t in ranked[:top]},
+    }
+
+
+def log_report(logger, top: int = 15):
+    logger.info(f"Startup import profile: {json.dumps(report(top))}")
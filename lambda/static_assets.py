@@ -0,0 +1,376 @@
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Not known to every Python's mimetypes table; Pyodide needs the exact types
+mimetypes.add_type("application/wasm", ".wasm")
+mimetypes.add_type("text/javascript", ".mjs")
+
+# Total bytes of file content kept in memory; least recently used assets are
+# evicted once the cap is exceeded
+DEFAULT_MAX_CACHE_BYTES = int(
+    os.environ.get("STATIC_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+# Under a server that streams responses (uvicorn), files larger than this are
+# sent from disk in STREAM_CHUNK_SIZE pieces and never kept in memory. Mangum
+# buffers the whole body anyway, so in Lambda they are cached like the rest.
+STREAM_THRESHOLD_BYTES = int(
+    os.environ.get("STATIC_STREAM_THRESHOLD_BYTES", str(1024 * 1024))
+)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Precompressed siblings written at build time (see `invoke compress-assets`),
+# in order of preference when the client accepts several
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# What each set of siblings was compressed from (source sha256 and size, and
+# the size of every variant written), keyed like the asset manifest
+PRECOMPRESSED_MANIFEST = "precompressed.json"
+
+# Content hashes written at build time (see `invoke write-asset-manifest`),
+# keyed by path relative to the lambda root
+ASSET_MANIFEST = "asset-manifest.json"
+
+
+def manifest_hash(entry: dict, stat: os.stat_result) -> Optional[str]:
+    """The manifest's sha256, if the file is still the one it was computed from.
+
+    A different size, or a modification after the manifest was written, makes
+    the entry stale. An older mtime is fine: deployment packages may reset it
+    (CDK zips every file with a fixed 1980 timestamp).
+    """
+    if entry.get("size") != stat.st_size or "mtime" not in entry:
+        return None
+    if stat.st_mtime > entry["mtime"]:
+        return None
+    return entry.get("sha256")
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    path: Path
+    media_type: str
+    size: int
+    mtime: float
+    # sha256 of the file from the asset manifest; hashed on first read otherwise
+    content_hash: Optional[str] = None
+    # content-encoding -> path and size of the precompressed variant
+    encodings: dict[str, Path] = field(default_factory=dict)
+    encoded_sizes: dict[str, int] = field(default_factory=dict)
+
+    def size_for(self, encoding: Optional[str] = None) -> int:
+        return self.encoded_sizes[encoding] if encoding else self.size
+
+
+class StaticAssetCache:
+    """Route table of static files, built once per container.
+
+    Files are registered by request path up front (stat + mime lookup happen only
+    once), and their contents are read from disk on first use and then served
+    from an in-memory LRU bounded by ``max_bytes``.
+    """
+
+    def __init__(
+        self, max_bytes: int = DEFAULT_MAX_CACHE_BYTES, manifest=None, variants=None
+    ):
+        self.max_bytes = max_bytes
+        self.manifest: dict[str, dict] = manifest or {}
+        self.variants: dict[str, dict] = variants or {}
+        self.routes: dict[str, StaticAsset] = {}
+        self._hashes: dict[Path, str] = {}
+        self._contents: OrderedDict[tuple[str, Optional[str]], bytes] = OrderedDict()
+        self._cached_bytes = 0
+
+    def add_file(self, route: str, path, media_type: Optional[str] = None):
+        path = Path(path)
+        if not path.is_file():
+            logger.warning(f"Static file {path} not found; {route} will 404")
+            return
+        if media_type is None:
+            media_type, _ = mimetypes.guess_type(path.name)
+        stat = path.stat()
+        content_hash = manifest_hash(self.manifest.get(path.as_posix(), {}), stat)
+        record = self.variants.get(path.as_posix(), {})
+        encodings, encoded_sizes = {}, {}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            variant = path.with_name(path.name + suffix)
+            if not variant.is_file():
+                continue
+            variant_size = variant.stat().st_size
+            # Only serve a variant known to be compressed from this exact
+            # content; anything else would hand out an old version of the file
+            if (
+                content_hash is None
+                or record.get("sha256") != content_hash
+                or record.get("size") != stat.st_size
+                or record.get("encodings", {}).get(encoding) != variant_size
+            ):
+                logger.info(f"Ignoring {variant}: not compressed from current {path}")
+                continue
+            encodings[encoding] = variant
+            encoded_sizes[encoding] = variant_size
+        self.routes[route] = StaticAsset(
+            path=path,
+            media_type=media_type or "application/octet-stream",
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            content_hash=content_hash,
+            encodings=encodings,
+            encoded_sizes=encoded_sizes,
+        )
+
+    def add_directory(self, prefix: str, directory, media_type: Optional[str] = None):
+        directory = Path(directory)
+        if not directory.is_dir():
+            logger.warning(f"Static directory {directory} not found")
+            return
+        prefix = prefix.removesuffix("/")
+        for root, _, files in os.walk(directory):
+            names = set(files)
+            for file_name in files:
+                if _is_precompressed_variant(file_name, names):
+                    continue
+                path = Path(root) / file_name
+                relative = path.relative_to(directory).as_posix()
+                self.add_file(f"{prefix}/{relative}", path, media_type=media_type)
+
+    def add_alias(self, route: str, existing_route: str):
+        if existing_route in self.routes:
+            self.routes[route] = self.routes[existing_route]
+
+    def get(self, route: str) -> Optional[StaticAsset]:
+        return self.routes.get(route)
+
+    def path_for(self, route: str, encoding: Optional[str] = None) -> Path:
+        asset = self.routes[route]
+        return asset.encodings[encoding] if encoding else asset.path
+
+    def should_stream(self, route: str, encoding: Optional[str] = None) -> bool:
+        """Whether a streaming server should send this from disk rather than memory."""
+        return self.routes[route].size_for(encoding) > STREAM_THRESHOLD_BYTES
+
+    def fits_in_cache(self, route: str, encoding: Optional[str] = None) -> bool:
+        return self.routes[route].size_for(encoding) <= self.max_bytes
+
+    def iter_file(
+        self,
+        route: str,
+        encoding: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """Yield bytes ``start``..``end`` (inclusive) of a file without loading it whole."""
+        with open(self.path_for(route, encoding), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk_size = STREAM_CHUNK_SIZE
+                if remaining is not None:
+                    chunk_size = min(chunk_size, remaining)
+                    remaining -= chunk_size
+                if not (chunk := f.read(chunk_size)):
+                    break
+                yield chunk
+
+    def cached(self, route: str, encoding: Optional[str] = None) -> Optional[bytes]:
+        """Content if it is already in memory; never touches the disk."""
+        key = (route, encoding)
+        if (content := self._contents.get(key)) is not None:
+            self._contents.move_to_end(key)
+        return content
+
+    def read_file(self, route: str, encoding: Optional[str] = None) -> bytes:
+        """Blocking disk read; async callers run it in a thread and then ``store`` it."""
+        with open(self.path_for(route, encoding), "rb") as f:
+            return f.read()
+
+    def store(self, route: str, encoding: Optional[str], content: bytes):
+        if len(content) > self.max_bytes:
+            return
+        if (previous := self._contents.pop((route, encoding), None)) is not None:
+            self._cached_bytes -= len(previous)
+        self._contents[(route, encoding)] = content
+        self._cached_bytes += len(content)
+        while self._cached_bytes > self.max_bytes:
+            _, evicted = self._contents.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def read(self, route: str, encoding: Optional[str] = None) -> bytes:
+        if (content := self.cached(route, encoding)) is None:
+            content = self.read_file(route, encoding)
+            self.store(route, encoding, content)
+        return content
+
+    def has_content_hash(self, route: str) -> bool:
+        """False if ``content_hash`` would have to read the whole file first."""
+        asset = self.routes[route]
+        return bool(asset.content_hash) or asset.path in self._hashes
+
+    def content_hash(self, route: str) -> str:
+        asset = self.routes[route]
+        if asset.content_hash:
+            return asset.content_hash
+        if (content_hash := self._hashes.get(asset.path)) is None:
+            digest = hashlib.sha256()
+            for chunk in self.iter_file(route):
+                digest.update(chunk)
+            content_hash = digest.hexdigest()
+            self._hashes[asset.path] = content_hash
+        return content_hash
+
+    def etag(self, route: str, encoding: Optional[str] = None) -> str:
+        etag = self.content_hash(route)[:32]
+        return f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+
+    def versioned_url(self, route: str) -> str:
+        """URL that is safe to cache forever: changes whenever the content does."""
+        return f"{route}?v={self.content_hash(route)[:16]}"
+
+    def stats(self) -> dict:
+        return {
+            "routes": len(self.routes),
+            "cached_assets": len(self._contents),
+            "cached_bytes": self._cached_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _is_precompressed_variant(file_name: str, names: set[str]) -> bool:
+    for suffix in PRECOMPRESSED_SUFFIXES.values():
+        if file_name.endswith(suffix) and file_name.removesuffix(suffix) in names:
+            return True
+    return False
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against one of our ETags.
+
+    Any encoding of the same content counts as a match, since a 304 tells the
+    client to reuse whichever representation it already holds.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    ours = etag.strip('"').split("-")[0]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate.split("-")[0] == ours:
+            return True
+    return False
+
+
+def etag_matches_strong(if_range: str, etag: str) -> bool:
+    """Strong comparison of an If-Range entity-tag against one of our ETags.
+
+    RFC 9110 only allows a range of the exact representation the client holds:
+    a weak tag never matches, and neither does another encoding's tag.
+    """
+    candidate = if_range.strip()
+    return not candidate.startswith("W/") and candidate == etag
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end) offsets.
+
+    Returns None when the header should be ignored (other units, multiple ranges,
+    malformed) and the full body served instead.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if start is None:
+        # suffix range: the last N bytes
+        if not end:
+            raise RangeNotSatisfiable(range_header)
+        return max(0, size - end), size - 1
+    if end is not None and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(range_header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def load_manifest(path=ASSET_MANIFEST) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)["files"]
+    except FileNotFoundError:
+        logger.info(f"No {path}")
+        return {}
+
+
+def negotiate_encoding(accept_encoding: str, asset) -> Optional[str]:
+    """Pick the preferred precompressed variant allowed by an Accept-Encoding header.
+
+    ``asset`` is anything with an ``encodings`` mapping keyed by content-coding
+    (a ``StaticAsset``, or a ``DemoBundle`` built in memory).
+    """
+    if not asset.encodings or not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in PRECOMPRESSED_SUFFIXES:
+        quality = accepted.get(encoding, accepted.get("*", 0))
+        if encoding in asset.encodings and quality > 0:
+            return encoding
+    return None
+
+
+def build_asset_cache(max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> StaticAssetCache:
+    """Register every static file the app serves; paths are relative to the lambda root."""
+    cache = StaticAssetCache(
+        max_bytes=max_bytes,
+        manifest=load_manifest(),
+        variants=load_manifest(PRECOMPRESSED_MANIFEST),
+    )
+
+    cache.add_directory("/flet", "flet_app")
+    cache.add_alias("/flet", "/flet/index.html")
+    cache.add_alias("/flet/", "/flet/index.html")
+
+    cache.add_file("/pyodide", "pyodide_example.html", media_type="text/html")
+    cache.add_file("/pyodide2", "pyodide_example2.html", media_type="text/html")
+    cache.add_file(
+        "/pyodide2_worker.js",
+        "pyodide_example2_worker.js",
+        media_type="text/javascript",
+    )
+    cache.add_file("/streamlit", "streamlit_index.html", media_type="text/html")
+    cache.add_file("/streamlit_app.py", "streamlit_app.py", media_type="text/plain")
+
+    cache.add_directory(
+        "/streamlitdemos/files", "streamlit_demoapps/files", media_type="text/plain"
+    )
+
+    # Pinned Pyodide / stlite runtimes from `invoke vendor-runtime`, if present
+    cache.add_directory("/vendor", "vendor")
+    return cache
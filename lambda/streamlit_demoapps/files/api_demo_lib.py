@@ -1,36 +1,225 @@
-from typing import Callable
+import asyncio
+import base64
+import json as jsonlib
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import urlencode, urlsplit
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# In the browser (stlite / Pyodide) there are no threads or sockets; requests is
+# patched onto synchronous XHR and concurrency has to go through pyfetch
+IN_PYODIDE = sys.platform == "emscripten"
+
+# Only the most recent calls are kept in the session, each with its body cut
+# down at capture time, so long sessions do not grow memory or rerun cost
+DEFAULT_HISTORY_LIMIT = 50
+MAX_LOGGED_BODY_CHARS = 10000
+SIDEBAR_PAGE_SIZE = 10
+
+# Binary table formats served by the /api/tables routes (see arrow_exchange.py)
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+TABLE_MEDIA_TYPES = {
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+    "parquet": PARQUET_MEDIA_TYPE,
+    "json": "application/json",
+}
+
+
+def _api_call_history(limit: int = DEFAULT_HISTORY_LIMIT) -> deque:
+    history = st.session_state.get("api_calls")
+    if not isinstance(history, deque) or history.maxlen != limit:
+        history = deque(history or (), maxlen=limit)
+        st.session_state["api_calls"] = history
+    if "api_call_count" not in st.session_state:
+        st.session_state["api_call_count"] = len(history)
+    return history
+
+
+def _compact_body(response):
+    """Decoded body for the call log, truncated once it exceeds MAX_LOGGED_BODY_CHARS."""
+    content_type = response.headers.get("Content-Type", "")
+    if content_type.startswith((ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE)):
+        return f"<{len(response.content):,} bytes of {content_type}>"
+    is_json = "application/json" in content_type
+    text = response.text
+    if len(text) > MAX_LOGGED_BODY_CHARS:
+        return f"{text[:MAX_LOGGED_BODY_CHARS]}<body truncated, {len(text):,} chars>"
+    if is_json:
+        try:
+            return response.json()
+        except ValueError:
+            pass
+    return text
+
+
+def read_table_response(response):
+    """DataFrame from an Arrow IPC, Parquet or JSON-records response body.
+
+    The Arrow and Parquet bytes are wrapped in a pyarrow buffer rather than
+    parsed, so the only copy made is pandas' own conversion.
+    """
+    import pandas as pd
+
+    content_type = response.headers.get("Content-Type", "")
+    if content_type.startswith(ARROW_STREAM_MEDIA_TYPE):
+        import pyarrow as pa
+
+        with pa.ipc.open_stream(pa.py_buffer(response.content)) as reader:
+            return reader.read_pandas()
+    if content_type.startswith(PARQUET_MEDIA_TYPE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        return pq.read_table(pa.BufferReader(response.content)).to_pandas()
+    return pd.DataFrame.from_records(response.json())
+
+
+def _table_body(df) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
 
 
 class BadApiCall(RuntimeError):
     """Raised for any bad api response"""
 
-    def __init__(self, msg):
+    def __init__(self, msg, status_code: Optional[int] = None):
         self.msg = msg
+        self.status_code = status_code
+
+
+class FetchedResponse:
+    """The parts of ``requests.Response`` the demos use, built from a pyfetch result."""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+
+class ResponseCache:
+    """HTTP-aware cache for GET responses, keyed on method + URL + params.
+
+    Entries are fresh for their TTL. Once stale (or explicitly invalidated) they
+    keep their ETag / Last-Modified, so the next fetch is a conditional request
+    that costs a 304 instead of the full body when nothing changed.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        # the ApiCaller is a cache_resource, shared by every session's script
+        # thread (and the prefetch workers)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, final_url: str, params=None, auth_header=None) -> tuple:
+        normalized_params = urlencode(sorted((params or {}).items()), doseq=True)
+        # the auth header is part of the key so cached data is never shared
+        # between tokens
+        return method.upper(), final_url, normalized_params, auth_header
+
+    def get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def is_fresh(entry: dict) -> bool:
+        return time.monotonic() < entry["expires_at"]
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        headers = {}
+        if etag := entry["response"].headers.get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := entry["response"].headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store(self, key: tuple, response, ttl: float):
+        with self._lock:
+            self._entries[key] = {
+                "response": response,
+                "expires_at": time.monotonic() + ttl,
+                "ttl": ttl,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: tuple):
+        with self._lock:
+            # another thread may have evicted it since the lookup
+            if (entry := self._entries.get(key)) is not None:
+                entry["expires_at"] = time.monotonic() + entry["ttl"]
+
+    def invalidate(self, url: str, prefix: bool = False) -> int:
+        """Mark matching entries stale (validators are kept); returns how many matched."""
+        matched = 0
+        with self._lock:
+            for (_, cached_url, _, _), entry in self._entries.items():
+                if cached_url == url or (prefix and cached_url.startswith(url)):
+                    entry["expires_at"] = 0.0
+                    matched += 1
+        return matched
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
 
 class ApiCaller:
-    def __init__(self, api_base_url: str):
+    def __init__(self, api_base_url: str, pool_size: int = 10):
         self.api_base_url = api_base_url
+        self.pool_size = pool_size
+        self.cache = ResponseCache()
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        # One session per caller keeps TCP/TLS connections alive between calls.
+        # Under Pyodide requests is patched onto synchronous XHR, and a
+        # socket-pooling adapter would replace that transport.
+        self.session = requests.Session()
+        if not IN_PYODIDE:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
 
-    def api_call(
-        self,
-        method,
-        url,
-        headers=None,
-        data=None,
-        json=None,
-        params=None,
-        annotation="",
-        auth_header_name="Authorization",
-        auth_token_prefix="Bearer ",
-        spinner_container=None,
-    ):
-        """Wrapper around requests to log API calls and responses."""
+    def _prepare(
+        self, method, url, headers, auth_header_name, auth_token_prefix
+    ) -> tuple[str, dict, dict]:
         if headers is None:
             headers = {}
+        else:
+            headers = {**headers}
 
         display_headers = {**headers}
         # Include the bearer token from session state
@@ -39,49 +228,77 @@ class ApiCaller:
                 headers[auth_header_name] = f"{auth_token_prefix}{this_auth_token}"
                 display_headers[auth_header_name] = f"{auth_token_prefix}************"
 
-        if not url.startswith("http"):
-            final_url = (
-                self.api_base_url.removesuffix("/") + "/" + url.removeprefix("/")
-            )
-        else:
-            final_url = url
+        return self.resolve_url(url), headers, display_headers
 
-        # Make the API request
-        if spinner_container:
-            with spinner_container.spinner(
-                f"Calling API: {method.upper()} {final_url}"
-            ):
-                response = requests.request(
-                    method,
-                    final_url,
-                    headers=headers,
-                    data=data,
-                    json=json,
-                    params=params,
-                )
-        else:
-            response = requests.request(
-                method, final_url, headers=headers, data=data, json=json, params=params
-            )
+    def resolve_url(self, url: str) -> str:
+        if url.startswith("http"):
+            return url
+        return self.api_base_url.removesuffix("/") + "/" + url.removeprefix("/")
+
+    def _send(self, method, final_url, headers, data, json, params):
+        return self.session.request(
+            method, final_url, headers=headers, data=data, json=json, params=params
+        )
+
+    async def _fetch(self, method, final_url, headers, data, json, params):
+        from pyodide.http import pyfetch
 
+        if params:
+            final_url += ("&" if "?" in final_url else "?") + urlencode(params)
+        body = None
+        if json is not None:
+            body = jsonlib.dumps(json)
+            headers = {"Content-Type": "application/json", **headers}
+        elif isinstance(data, dict):
+            body = urlencode(data)
+            headers = {"Content-Type": "application/x-www-form-urlencoded", **headers}
+        elif data is not None:
+            body = data
+        response = await pyfetch(
+            final_url, method=method.upper(), headers=headers, body=body
+        )
+        return FetchedResponse(
+            url=final_url,
+            status_code=response.status,
+            headers=dict(response.headers),
+            content=await response.bytes(),
+        )
+
+    def _record(
+        self,
+        annotation,
+        method,
+        final_url,
+        display_headers,
+        data,
+        json,
+        params,
+        response,
+    ):
         # Log the API call and response
-        st.session_state["api_calls"].append(
+        history = st.session_state.get("api_calls")
+        history = _api_call_history(
+            history.maxlen if isinstance(history, deque) else DEFAULT_HISTORY_LIMIT
+        )
+        st.session_state["api_call_count"] += 1
+        history.append(
             {
+                "call_num": st.session_state["api_call_count"],
                 "annotation": annotation,
                 "request": {
                     "method": method,
                     "url": final_url,
                     "headers": display_headers,
-                    "data": data,
+                    "data": (
+                        f"<{len(data):,} bytes>" if isinstance(data, bytes) else data
+                    ),
                     "json": json,
                     "params": params,
                 },
                 "response": {
                     "status_code": response.status_code,
                     "headers": dict(response.headers),
-                    "body": response.json()
-                    if "application/json" in response.headers.get("Content-Type", "")
-                    else response.text,
+                    "body": _compact_body(response),
                 },
             }
         )
@@ -90,10 +307,468 @@ class ApiCaller:
                 st.error("Bad Auth Token")
                 st.stop()
             print(response)
-            raise BadApiCall(msg=response.text)
+            raise BadApiCall(msg=response.text, status_code=response.status_code)
+
+    def api_call(
+        self,
+        method,
+        url,
+        headers=None,
+        data=None,
+        json=None,
+        params=None,
+        annotation="",
+        auth_header_name="Authorization",
+        auth_token_prefix="Bearer ",
+        spinner_container=None,
+        cache_ttl: Optional[float] = None,
+    ):
+        """Wrapper around requests to log API calls and responses.
+
+        With ``cache_ttl`` (seconds) a GET is answered from ``self.cache`` while
+        fresh and revalidated with a conditional request once stale.
+        """
+        final_url, headers, display_headers = self._prepare(
+            method, url, headers, auth_header_name, auth_token_prefix
+        )
 
+        cache_key, cached, headers = self._cache_lookup(
+            method, final_url, params, headers, auth_header_name, cache_ttl
+        )
+        if cached is not None and self.cache.is_fresh(cached):
+            return cached["response"]
+
+        # Make the API request
+        if spinner_container:
+            with spinner_container.spinner(
+                f"Calling API: {method.upper()} {final_url}"
+            ):
+                response = self._send(method, final_url, headers, data, json, params)
+        else:
+            response = self._send(method, final_url, headers, data, json, params)
+
+        self._record(
+            annotation, method, final_url, display_headers, data, json, params, response
+        )
+        return self._cache_update(cache_key, cached, response, cache_ttl)
+
+    def _cache_lookup(
+        self, method, final_url, params, headers, auth_header_name, cache_ttl
+    ) -> tuple[Optional[tuple], Optional[dict], dict]:
+        """Cache key and entry for a GET, with validators added once it is stale."""
+        if cache_ttl is None or method.upper() != "GET":
+            return None, None, headers
+        cache_key = self.cache.key(
+            method, final_url, params, headers.get(auth_header_name)
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None and not self.cache.is_fresh(cached):
+            headers = {**headers, **self.cache.validators(cached)}
+        return cache_key, cached, headers
+
+    def _cache_update(self, cache_key, cached, response, cache_ttl):
+        if cache_key is None:
+            return response
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(cache_key)
+            return cached["response"]
+        self.cache.store(cache_key, response, cache_ttl)
         return response
 
+    def prefetch(
+        self,
+        url,
+        params=None,
+        headers=None,
+        annotation="",
+        auth_header_name="Authorization",
+        auth_token_prefix="Bearer ",
+        cache_ttl: Optional[float] = None,
+    ) -> Optional[dict]:
+        """Start a GET in the background; pass the result to ``collect_prefetch``.
+
+        Returns None when there is nothing to fetch (a fresh cached response).
+        Under Pyodide the request runs on the browser's event loop through
+        pyfetch, so it completes while the page is idle between reruns.
+        """
+        final_url, headers, display_headers = self._prepare(
+            "get", url, headers, auth_header_name, auth_token_prefix
+        )
+        cache_key, cached, headers = self._cache_lookup(
+            "get", final_url, params, headers, auth_header_name, cache_ttl
+        )
+        if cached is not None and self.cache.is_fresh(cached):
+            return None
+        if IN_PYODIDE:
+            future = asyncio.ensure_future(
+                self._fetch("get", final_url, headers, None, None, params)
+            )
+        else:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(max_workers=2)
+            future = self._prefetch_executor.submit(
+                self._send, "get", final_url, headers, None, None, params
+            )
+        return {
+            "future": future,
+            "annotation": annotation,
+            "final_url": final_url,
+            "display_headers": display_headers,
+            "params": params,
+            "cache_key": cache_key,
+            "cached": cached,
+            "cache_ttl": cache_ttl,
+        }
+
+    def collect_prefetch(self, prefetched: Optional[dict]):
+        """Response of a ``prefetch``, or None if it is not usable (yet).
+
+        Outside the browser this waits for the request. Under Pyodide the
+        script cannot block on the event loop, so an unfinished prefetch is
+        cancelled and the caller falls back to a regular ``api_call``.
+        """
+        if prefetched is None:
+            return None
+        future = prefetched["future"]
+        if IN_PYODIDE and not future.done():
+            future.cancel()
+            return None
+        try:
+            response = future.result()
+        except Exception as e:
+            # The caller's regular api_call reports anything that persists
+            logger.warning("Prefetch of %s failed: %s", prefetched["final_url"], e)
+            return None
+        # Recorded here rather than when sent: session_state belongs to the
+        # script thread
+        self._record(
+            prefetched["annotation"],
+            "get",
+            prefetched["final_url"],
+            prefetched["display_headers"],
+            None,
+            None,
+            prefetched["params"],
+            response,
+        )
+        return self._cache_update(
+            prefetched["cache_key"],
+            prefetched["cached"],
+            response,
+            prefetched["cache_ttl"],
+        )
+
+    def api_call_table(self, method, url, df=None, fmt: str = "arrow", **kwargs):
+        """``api_call`` for table endpoints, returning a DataFrame.
+
+        ``df`` is uploaded as an Arrow IPC stream and the response is requested
+        in ``fmt``. Without pyarrow (it has to be in the stlite requirements to
+        load under Pyodide) both directions fall back to JSON records.
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            fmt = "json"
+        headers = {**(kwargs.pop("headers", None) or {})}
+        headers["Accept"] = TABLE_MEDIA_TYPES[fmt]
+        if df is not None:
+            if fmt == "json":
+                kwargs["json"] = jsonlib.loads(df.to_json(orient="records"))
+            else:
+                headers["Content-Type"] = ARROW_STREAM_MEDIA_TYPE
+                kwargs["data"] = _table_body(df)
+        response = self.api_call(method, url, headers=headers, **kwargs)
+        return read_table_response(response)
+
+    def cache_get(self, namespace: str, key: str) -> Optional[bytes]:
+        """Value stored under ``/api/cache/<namespace>/<key>``, or None if absent/expired."""
+        try:
+            response = self.api_call("GET", f"/api/cache/{namespace}/{key}")
+        except BadApiCall as e:
+            if e.status_code == 404:
+                return None
+            raise
+        return response.content
+
+    def cache_put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        ttl: Optional[int] = None,
+        content_type: str = "application/octet-stream",
+    ):
+        """Store ``value`` server-side, shared by every session; ``ttl`` in seconds."""
+        return self.api_call(
+            "PUT",
+            f"/api/cache/{namespace}/{key}",
+            headers={"Content-Type": content_type},
+            data=value,
+            params={"ttl": ttl} if ttl else None,
+        )
+
+    def _prepare_batch(self, calls: list[dict]) -> list[dict]:
+        prepared = []
+        for call in calls:
+            final_url, headers, display_headers = self._prepare(
+                call["method"],
+                call["url"],
+                call.get("headers"),
+                call.get("auth_header_name", "Authorization"),
+                call.get("auth_token_prefix", "Bearer "),
+            )
+            prepared.append(
+                {
+                    "annotation": call.get("annotation", ""),
+                    "method": call["method"],
+                    "final_url": final_url,
+                    "headers": headers,
+                    "display_headers": display_headers,
+                    "data": call.get("data"),
+                    "json": call.get("json"),
+                    "params": call.get("params"),
+                }
+            )
+        return prepared
+
+    def _record_batch(self, prepared: list[dict], responses: list) -> list:
+        # Recorded in request order, on the script thread (session_state is not
+        # safe to touch from the worker threads)
+        for call, response in zip(prepared, responses):
+            self._record(
+                call["annotation"],
+                call["method"],
+                call["final_url"],
+                call["display_headers"],
+                call["data"],
+                call["json"],
+                call["params"],
+                response,
+            )
+        return responses
+
+    def api_call_batch(self, calls: list[dict], max_workers: Optional[int] = None):
+        """Issue several independent calls concurrently; responses come back in order.
+
+        Each item takes the same keyword arguments as ``api_call`` (``method`` and
+        ``url`` required). Under Pyodide, where threads are unavailable, the calls
+        run one after another -- use ``api_call_batch_async`` there instead.
+        """
+        prepared = self._prepare_batch(calls)
+
+        def send(call):
+            return self._send(
+                call["method"],
+                call["final_url"],
+                call["headers"],
+                call["data"],
+                call["json"],
+                call["params"],
+            )
+
+        if IN_PYODIDE or len(prepared) <= 1:
+            responses = [send(call) for call in prepared]
+        else:
+            workers = min(max_workers or self.pool_size, len(prepared))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                responses = list(executor.map(send, prepared))
+        return self._record_batch(prepared, responses)
+
+    async def api_call_batch_async(self, calls: list[dict]):
+        """Concurrent batch for Pyodide, using pyfetch (``await`` it from the app script)."""
+        if not IN_PYODIDE:
+            return self.api_call_batch(calls)
+        prepared = self._prepare_batch(calls)
+        responses = await asyncio.gather(
+            *(
+                self._fetch(
+                    call["method"],
+                    call["final_url"],
+                    call["headers"],
+                    call["data"],
+                    call["json"],
+                    call["params"],
+                )
+                for call in prepared
+            )
+        )
+        return self._record_batch(prepared, list(responses))
+
+    def _sub_request(self, call: dict, origin: str) -> dict:
+        """One prepared call as an item of the ``/api/batch`` body."""
+        url = urlsplit(call["final_url"])
+        if f"{url.scheme}://{url.netloc}" != origin:
+            raise ValueError(f"{call['final_url']} is not served by {origin}")
+        path = url.path + (f"?{url.query}" if url.query else "")
+        if call["params"]:
+            path += ("&" if "?" in path else "?") + urlencode(call["params"])
+        item = {"method": call["method"].upper(), "path": path}
+        headers = {**call["headers"]}
+        data = call["data"]
+        if call["json"] is not None:
+            item["json"] = call["json"]
+        elif isinstance(data, dict):
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+            item["body"] = urlencode(data)
+        elif isinstance(data, bytes):
+            item["body"] = base64.b64encode(data).decode()
+            item["body_encoding"] = "base64"
+        elif data is not None:
+            item["body"] = data
+        item["headers"] = headers
+        return item
+
+    def api_call_server_batch(self, calls: list[dict], batch_url: str = "/api/batch"):
+        """Send several calls to this app's API as one ``POST /api/batch``.
+
+        Takes the same items as ``api_call_batch`` and returns one response per
+        call, in order, but costs a single round trip (and a single Lambda
+        invocation). Every URL has to be on the batch endpoint's own host.
+        Reads run concurrently server-side; writes run one at a time, in order.
+        """
+        prepared = self._prepare_batch(calls)
+        batch_url = self.resolve_url(batch_url)
+        origin = "{0.scheme}://{0.netloc}".format(urlsplit(batch_url))
+        response = self._send(
+            "POST",
+            batch_url,
+            self._prepare("POST", batch_url, None, "Authorization", "Bearer ")[1],
+            None,
+            {"requests": [self._sub_request(call, origin) for call in prepared]},
+            None,
+        )
+        if not response.ok:
+            raise BadApiCall(msg=response.text, status_code=response.status_code)
+        responses = []
+        for call, item in zip(prepared, response.json()["responses"]):
+            content = item["body"].encode()
+            if item.get("body_encoding") == "base64":
+                content = base64.b64decode(content)
+            responses.append(
+                FetchedResponse(
+                    url=call["final_url"],
+                    status_code=item["status"],
+                    headers=item["headers"],
+                    content=content,
+                )
+            )
+        return self._record_batch(prepared, responses)
+
+
+class PagedTable:
+    """One page of a paginated list endpoint at a time, as pandas DataFrames.
+
+    Pages are requested with ``page_param``/``limit_param`` (json-server's
+    ``_page``/``_limit`` by default) and the row count is read from
+    ``total_header``. Each page is converted to a DataFrame once and reused
+    until its response changes, and the next page is prefetched while the
+    current one is shown. Keep the instance in ``st.session_state`` so a rerun
+    costs one page, however many rows the endpoint has.
+    """
+
+    def __init__(
+        self,
+        api_caller: ApiCaller,
+        url: str,
+        page_size: int = 20,
+        params: Optional[dict] = None,
+        columns: Optional[list[str]] = None,
+        annotation: str = "",
+        cache_ttl: Optional[float] = 300.0,
+        max_pages: int = 8,
+        page_param: str = "_page",
+        limit_param: str = "_limit",
+        total_header: str = "X-Total-Count",
+    ):
+        self.api_caller = api_caller
+        self.url = url
+        self.page_size = page_size
+        self.params = params or {}
+        self.columns = columns
+        self.annotation = annotation
+        self.cache_ttl = cache_ttl
+        self.max_pages = max_pages
+        self.page_param = page_param
+        self.limit_param = limit_param
+        self.total_header = total_header
+        self.total: Optional[int] = None
+        # page -> (response it was built from, DataFrame)
+        self._pages: OrderedDict[int, tuple] = OrderedDict()
+        # (page, prefetch handle) for the page after the one last shown
+        self._prefetched: Optional[tuple[int, Optional[dict]]] = None
+        # a rerun can start while the previous run of the same session is
+        # still inside page(); they take turns rather than interleave
+        self._lock = threading.Lock()
+
+    @property
+    def page_count(self) -> Optional[int]:
+        if self.total is None:
+            return None
+        return max(1, -(-self.total // self.page_size))
+
+    def _params(self, number: int) -> dict:
+        return {
+            **self.params,
+            self.page_param: number,
+            self.limit_param: self.page_size,
+        }
+
+    def _to_frame(self, rows: list[dict]):
+        import pandas as pd
+
+        return pd.DataFrame.from_records(rows, columns=self.columns)
+
+    def page(self, number: int = 1):
+        """DataFrame of page ``number`` (1-based)."""
+        with self._lock:
+            return self._page(number)
+
+    def _page(self, number: int):
+        response = None
+        if self._prefetched is not None and self._prefetched[0] == number:
+            response = self.api_caller.collect_prefetch(self._prefetched[1])
+            self._prefetched = None
+        if response is None:
+            response = self.api_caller.api_call(
+                "get",
+                self.url,
+                params=self._params(number),
+                annotation=f"{self.annotation} (page {number})",
+                cache_ttl=self.cache_ttl,
+            )
+        cached = self._pages.get(number)
+        if cached is not None and cached[0] is response:
+            df = cached[1]
+        else:
+            df = self._to_frame(response.json())
+        self._pages[number] = (response, df)
+        self._pages.move_to_end(number)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+        if (total := response.headers.get(self.total_header)) is not None:
+            self.total = int(total)
+        has_next = (
+            number < self.page_count
+            if self.page_count is not None
+            else len(df) == self.page_size
+        )
+        # a rerun of the same page keeps the prefetch already in flight
+        if has_next and (self._prefetched is None or self._prefetched[0] != number + 1):
+            self._prefetched = number + 1, self.api_caller.prefetch(
+                self.url,
+                params=self._params(number + 1),
+                annotation=f"{self.annotation} (page {number + 1}, prefetched)",
+                cache_ttl=self.cache_ttl,
+            )
+        return df
+
+    def invalidate(self):
+        """Revalidate every page on next use (unchanged pages cost a 304)."""
+        self.api_caller.cache.invalidate(self.api_caller.resolve_url(self.url))
+        with self._lock:
+            self._prefetched = None
+
 
 @st.cache_resource()
 def get_api_caller(dev_api_url) -> ApiCaller:
@@ -120,19 +795,19 @@ def run_demo_app(
     main_app_handler: Callable[[ApiCaller], None],
     require_api_key: bool = True,
     api_key_label: str = "Auth Token",
+    history_limit: int = DEFAULT_HISTORY_LIMIT,
 ):
     # Initialize session state for API calls
 
     # APP_TITLE = "ReportTool Interactive API Documentation"
     # APP_DESCRIPTION = "Demonstrating a minimal UI built for interfacing with the Report Tool API"
-    if "api_calls" not in st.session_state:
-        st.session_state["api_calls"] = []
+    history = _api_call_history(history_limit)
     api_caller = get_api_caller(dev_api_url)
     st.sidebar.write("API BASE URL")
     st.sidebar.write(api_caller.api_base_url)
 
-    if "last_displayed_step_idx" not in st.session_state:
-        st.session_state.last_displayed_step_idx = 0
+    if "last_displayed_call_num" not in st.session_state:
+        st.session_state.last_displayed_call_num = 0
 
     if not require_api_key:
         st.session_state.auth_token = "unused"
@@ -149,24 +824,35 @@ def run_demo_app(
     else:
         main_app_handler(api_caller)
 
-    # Display API interactions in sidebar
+    # Display API interactions in sidebar, one page at a time so a rerun only
+    # ever renders SIDEBAR_PAGE_SIZE calls
     with st.sidebar:
         st.write("## API Interactions")
-        for idx, call in enumerate(reversed(st.session_state["api_calls"])):
+        total_calls = st.session_state["api_call_count"]
+        if total_calls > len(history):
+            st.caption(f"Showing the last {len(history)} of {total_calls} calls")
+        calls = list(reversed(history))
+        page_count = max(1, -(-len(calls) // SIDEBAR_PAGE_SIZE))
+        page = 1
+        if page_count > 1:
+            page = st.number_input(
+                "Page", min_value=1, max_value=page_count, value=1, step=1
+            )
+        page_start = (page - 1) * SIDEBAR_PAGE_SIZE
+        for call in calls[page_start : page_start + SIDEBAR_PAGE_SIZE]:
             # Show annotation and response status code
-            call_num = len(st.session_state["api_calls"]) - idx
-            session_idx = call_num - 1
+            call_num = call["call_num"]
 
             container = st.container(border=True)
             with container:
                 st.write(f"### Call {call_num}: {call['annotation']}")
-                if session_idx > st.session_state.last_displayed_step_idx:
+                if call_num > st.session_state.last_displayed_call_num:
                     st.info("New call made")
                 st.write(
                     f'**{call["request"]["method"].upper()}** {call["request"]["url"].replace(api_caller.api_base_url, "")}'
                 )
-                if st.button("View", key=f"view_{session_idx}"):
-                    view_interaction(session_idx)
+                if st.button("View", key=f"view_{call_num}"):
+                    view_interaction(call_num)
                 st.write(f"Response Status Code: {call['response']['status_code']}")
 
                 # Popovers for request and response
@@ -182,20 +868,14 @@ def run_demo_app(
                             st.write(p)
                 with col2:
                     with st.popover("Response", use_container_width=True):
-                        response_body = call["response"].get("body")
-                        if len(response_body) < 10000:
-                            st.write(response_body)
-                        else:
-                            st.write("Response body too large to show")
-        st.session_state.last_displayed_step_idx = (
-            len(st.session_state["api_calls"]) - 1
-        )
+                        st.write(call["response"].get("body"))
+        st.session_state.last_displayed_call_num = total_calls
 
 
 @st.dialog("API Interaction", width="large")
-def view_interaction(session_idx: int):
-    call = st.session_state["api_calls"][session_idx]
-    call_response_body = call["response"].get("body")
-    if call_response_body and len(call_response_body) > 10000:
-        call["response"]["body"] = f"{call_response_body[:10000]}<body truncated>"
-    st.write(call)
+def view_interaction(call_num: int):
+    for call in st.session_state["api_calls"]:
+        if call["call_num"] == call_num:
+            st.write(call)
+            return
+    st.write("This call has rotated out of the history")
@@ -3,15 +3,21 @@ from typing import Any, Dict, List
 
 import streamlit as st
 
-from api_demo_lib import ApiCaller, BadApiCall, run_demo_app
+from api_demo_lib import ApiCaller, BadApiCall, PagedTable, run_demo_app
+
+POSTS_URL = "https://jsonplaceholder.typicode.com/posts"
+USER_POSTS_URL = f"{POSTS_URL}?userId=1"
+# Fresh responses are served without a request; after this they are
+# revalidated with If-None-Match and usually come back as a cheap 304
+CACHE_TTL_SECONDS = 300
+# Rows fetched, converted and rendered per rerun, whatever the total
+POSTS_PAGE_SIZE = 5
+POST_COLUMNS = ["id", "title", "body", "userId"]
 
 
 def main(api_caller: "ApiCaller"):
     if st.sidebar.button("Clear Cached Data"):
-        get_user_posts.clear()
-        get_post_content.clear()
-        get_available_posts.clear()
-        get_post.clear()
+        api_caller.cache.clear()
     if st.sidebar.button("Reset Session"):
         st.cache_resource.clear()
         st.cache_data.clear()
@@ -43,7 +49,12 @@ def main(api_caller: "ApiCaller"):
                     st.error(f"Error creating post: {e}")
 
     st.write("Existing Posts")
-    st.button("🔄", on_click=get_user_posts.clear, help="Refresh posts")
+    st.button(
+        "🔄",
+        on_click=api_caller.cache.invalidate,
+        args=(USER_POSTS_URL,),
+        help="Refresh posts",
+    )
     action_placeholder = st.empty()
     with action_placeholder.container():
         cols = st.columns(len(actions))
@@ -57,19 +68,15 @@ def main(api_caller: "ApiCaller"):
                     use_container_width=True,
                 )
 
-    table_data = []
-    posts_for_user = get_user_posts(api_caller)
-    for item in posts_for_user:
-        this_table_item = {
-            "id": item.id,
-            "title": item.title,
-            "body": item.body,
-            "userId": item.userId,
-        }
-        table_data.append(this_table_item)
-
-    def _handle(handle_action: str, idx: int):
-        post = posts_for_user[idx]
+    posts_table = get_user_posts_table(api_caller)
+    page = st.session_state.get("posts_page", 1)
+    posts_page = posts_table.page(page)
+    if posts_table.page_count is not None and page > posts_table.page_count:
+        # deletes left fewer pages than the one selected
+        st.session_state.posts_page = posts_table.page_count
+        st.rerun()
+
+    def _handle(handle_action: str, post: "Post"):
         if handle_action == "View":
             dialog_view_post_content(api_caller, post)
         elif handle_action == "Delete":
@@ -77,9 +84,10 @@ def main(api_caller: "ApiCaller"):
         else:
             raise ValueError(handle_action)
 
-    if table_data:
+    if not posts_page.empty:
         selected = st.dataframe(
-            table_data,
+            posts_page,
+            hide_index=True,
             selection_mode="single-row",
             on_select="rerun",
             use_container_width=True,
@@ -87,9 +95,19 @@ def main(api_caller: "ApiCaller"):
     else:
         st.write("No current posts")
         selected = {"selection": {}}
+    if (page_count := posts_table.page_count or page) > 1:
+        st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key="posts_page",
+        )
 
     if selected_rows := selected["selection"].get("rows"):
-        selected_row_idx = selected_rows[0]
+        selected_post = parse_post(
+            posts_page.iloc[[selected_rows[0]]].to_dict(orient="records")[0]
+        )
         with action_placeholder.container():
             cols = st.columns(len(actions))
             for col, action in zip(cols, actions):
@@ -98,10 +116,9 @@ def main(api_caller: "ApiCaller"):
                         action,
                         key=f"handle-{action}",
                         on_click=_handle,
-                        args=(action, selected_row_idx),
+                        args=(action, selected_post),
                         use_container_width=True,
                     )
-            selected_post = posts_for_user[selected_row_idx]
         with st.expander("Selected post object", expanded=True):
             st.json(selected_post.__dict__)
 
@@ -121,55 +138,62 @@ class Post:
     userId: int
 
 
-@st.cache_data(show_spinner=False)
-def get_user_posts(_api_caller: "ApiCaller") -> List["Post"]:
-    response = _api_caller.api_call(
-        annotation="List posts by the user",
-        method="get",
-        url="https://jsonplaceholder.typicode.com/posts?userId=1",
-    )
-    data = response.json()
-    return [parse_post(item) for item in data]
+def get_user_posts_table(api_caller: "ApiCaller") -> PagedTable:
+    """The user's posts, fetched a page at a time and kept across reruns."""
+    if "user_posts_table" not in st.session_state:
+        st.session_state.user_posts_table = PagedTable(
+            api_caller,
+            USER_POSTS_URL,
+            page_size=POSTS_PAGE_SIZE,
+            columns=POST_COLUMNS,
+            annotation="List posts by the user",
+            cache_ttl=CACHE_TTL_SECONDS,
+        )
+    return st.session_state.user_posts_table
 
 
 def delete_post(api_caller: "ApiCaller", post_id) -> bytes:
     response = api_caller.api_call(
         annotation="Delete a specific post",
         method="delete",
-        url=f"https://jsonplaceholder.typicode.com/posts/{post_id}",
+        url=f"{POSTS_URL}/{post_id}",
     )
+    invalidate_post_caches(api_caller, post_id)
     return response.content
 
 
-@st.cache_data(show_spinner=False)
-def get_post_content(_api_caller: "ApiCaller", post_id) -> Post:
-    response = _api_caller.api_call(
+def get_post_content(api_caller: "ApiCaller", post_id) -> Post:
+    response = api_caller.api_call(
         annotation="Get the content of a post",
         method="get",
-        url=f"https://jsonplaceholder.typicode.com/posts/{post_id}",
+        url=f"{POSTS_URL}/{post_id}",
+        cache_ttl=CACHE_TTL_SECONDS,
     )
     data = response.json()
     return parse_post(data)
 
 
-@st.cache_data(show_spinner=False)
-def get_available_posts(_api_caller: "ApiCaller") -> List["PostInList"]:
-    response = _api_caller.api_call(
+def get_available_posts(
+    api_caller: "ApiCaller", page: int = 1, limit: int = POSTS_PAGE_SIZE
+) -> List["PostInList"]:
+    response = api_caller.api_call(
         annotation="Get list of posts",
         method="get",
-        url="https://jsonplaceholder.typicode.com/posts",
+        url=POSTS_URL,
+        params={"_page": page, "_limit": limit},
+        cache_ttl=CACHE_TTL_SECONDS,
     )
     data = response.json()
     posts = [parse_post_in_list(item) for item in data]
     return posts
 
 
-@st.cache_data(show_spinner=False)
-def get_post(_api_caller: "ApiCaller", post_id) -> "Post":
-    response = _api_caller.api_call(
+def get_post(api_caller: "ApiCaller", post_id) -> "Post":
+    response = api_caller.api_call(
         annotation="Get the details of a specific post",
         method="get",
-        url=f"https://jsonplaceholder.typicode.com/posts/{post_id}",
+        url=f"{POSTS_URL}/{post_id}",
+        cache_ttl=CACHE_TTL_SECONDS,
     )
     data = response.json()
     return parse_post(data)
@@ -181,14 +205,24 @@ def create_post(api_caller: "ApiCaller", title, body, userId) -> "Post":
     response = api_caller.api_call(
         annotation="Creating a new post",
         method="post",
-        url="https://jsonplaceholder.typicode.com/posts",
+        url=POSTS_URL,
         json=payload,
     )
-    get_user_posts.clear()
     data = response.json()
+    invalidate_post_caches(api_caller, data.get("id"))
     return parse_post(data)
 
 
+def invalidate_post_caches(api_caller: "ApiCaller", post_id=None):
+    """Mark only the responses a mutation can change as stale."""
+    # Through the table, so a page prefetched before the change is dropped
+    # rather than stored as fresh
+    get_user_posts_table(api_caller).invalidate()
+    api_caller.cache.invalidate(POSTS_URL)
+    if post_id is not None:
+        api_caller.cache.invalidate(f"{POSTS_URL}/{post_id}")
+
+
 def parse_post_in_list(data: Dict[str, Any]) -> PostInList:
     return PostInList(
         id=data.get("id", 0),
@@ -220,7 +254,6 @@ def dialog_delete_post(api_caller: "ApiCaller", post):
 
     if st.button("Confirm Delete", type="primary", use_container_width=True):
         try:
-            get_user_posts.clear()
             delete_post(api_caller, post.id)
             st.rerun()
         except BadApiCall as e:
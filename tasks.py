@@ -1,6 +1,22 @@
+import fnmatch
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
-from invoke import task, Context
+from invoke import task, Context, Exit
+
+try:
+    import brotli
+except ImportError:  # brotli is in requirements-dev.txt; gzip variants still work
+    brotli = None
 
 
 class Paths:
@@ -9,27 +25,634 @@ class Paths:
     flet_app = repo_root / "flet_app"
 
     compiled_flet_src = flet_app / "build" / "web"
-    compiled_flet_dest = repo_root / "lambda" / "flet_app"
+    lambda_dir = repo_root / "lambda"
+    compiled_flet_dest = lambda_dir / "flet_app"
     stack_output_file = repo_root / "stack_output.json"
+    asset_manifest = lambda_dir / "asset-manifest.json"
+    precompressed_manifest = lambda_dir / "precompressed.json"
+    runtime_pins = lambda_dir / "runtime-pins.json"
+    vendor_dir = lambda_dir / "vendor"
+    build_state = repo_root / ".build-state.json"
+    lambda_package = repo_root / "build" / "lambda_package"
+    bundle_budgets = repo_root / "bundle-budgets.json"
+
+
+FLET_BUILD_COMMAND = "flet build web flet_app --base-url flet"
+
+# Build output and caches inside source trees; never part of a fingerprint
+_FINGERPRINT_SKIP_DIRS = {"build", "__pycache__", ".venv", "storage"}
+
+# zlib and hashlib release the GIL on large buffers, so threads spread the work
+_POSTPROCESS_WORKERS = os.cpu_count() or 4
+
+
+def _fingerprint(*roots: Path, extra: str = "") -> str:
+    """sha256 over the relative path and content of every file under ``roots``."""
+    digest = hashlib.sha256(extra.encode())
+    for root in roots:
+        paths = [root] if root.is_file() else []
+        for directory, dir_names, file_names in os.walk(root):
+            dir_names[:] = sorted(
+                d for d in dir_names if d not in _FINGERPRINT_SKIP_DIRS
+            )
+            paths.extend(Path(directory) / name for name in sorted(file_names))
+        for path in paths:
+            digest.update(path.relative_to(Paths.repo_root).as_posix().encode() + b"\0")
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def _build_state() -> dict:
+    try:
+        return json.loads(Paths.build_state.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def _save_build_state(key: str, value):
+    state = _build_state()
+    state[key] = value
+    Paths.build_state.write_text(json.dumps(state, indent=2))
 
 
 @task
-def build_flet_web_app(c: Context):
+def build_flet_web_app(c: Context, force: bool = False):
+    """Build the Flet web app, skipped when flet_app/ (incl. requirements.txt) is unchanged."""
+    fingerprint = _fingerprint(Paths.flet_app, extra=FLET_BUILD_COMMAND)
+    if (
+        not force
+        and Paths.compiled_flet_dest.exists()
+        and _build_state().get("flet_app") == fingerprint
+    ):
+        print("flet_app/ unchanged since the last build; skipping (--force to rebuild)")
+        return
+
     with c.cd(Paths.repo_root):
-        c.run("flet build web flet_app --base-url flet")
-        c.run(f"rm -rf {Paths.compiled_flet_dest}")
-        c.run(f"mv {Paths.compiled_flet_src} {Paths.compiled_flet_dest}")
+        c.run(FLET_BUILD_COMMAND)
+    # Swap the new build in, then drop the old one, so the destination is
+    # never missing or half-written
+    previous = Paths.compiled_flet_dest.with_name("flet_app.previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    if Paths.compiled_flet_dest.exists():
+        Paths.compiled_flet_dest.rename(previous)
+    shutil.move(Paths.compiled_flet_src, Paths.compiled_flet_dest)
+    shutil.rmtree(previous, ignore_errors=True)
+
+    minify_assets(c)
+    compress_assets(c)
+    write_asset_manifest(c)
+    # Only a build within budget counts; a failing one is redone next time
+    bundle_report(c)
+    _save_build_state("flet_app", fingerprint)
+
+
+# Formats that are already compressed; a second pass only wastes bytes
+_SKIP_COMPRESSION_SUFFIXES = {
+    ".br",
+    ".gz",
+    ".zip",
+    ".whl",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".ico",
+    ".woff",
+    ".woff2",
+}
+_MIN_COMPRESS_SIZE = 1024
+
+
+def _static_asset_files() -> list[Path]:
+    """Every file lambda/static_assets.py registers, excluding precompressed variants."""
+    files = [
+        Paths.lambda_dir / "pyodide_example.html",
+        Paths.lambda_dir / "pyodide_example2.html",
+        Paths.lambda_dir / "pyodide_example2_worker.js",
+        Paths.lambda_dir / "streamlit_index.html",
+        Paths.lambda_dir / "streamlit_app.py",
+    ]
+    for directory in (
+        Paths.compiled_flet_dest,
+        Paths.lambda_dir / "streamlit_demoapps" / "files",
+        Paths.vendor_dir,
+    ):
+        if directory.exists():
+            files.extend(p for p in directory.rglob("*") if p.is_file())
+    return [
+        p
+        for p in files
+        if p.exists()
+        and "__pycache__" not in p.parts
+        and not (p.suffix in (".br", ".gz") and p.with_suffix("").exists())
+    ]
+
+
+def _write_variant(path: Path, suffix: str, compressed: bytes, original_size: int):
+    variant = path.with_name(path.name + suffix)
+    if len(compressed) < original_size * 0.95:
+        variant.write_bytes(compressed)
+        return len(compressed)
+    # Not worth serving; make sure a stale variant from an old build is gone
+    variant.unlink(missing_ok=True)
+    return None
+
+
+def _stamp(path: Path) -> list:
+    # Files compressed without brotli get another pass once it is installed
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size, brotli is not None]
+
+
+def _compress_file(
+    path: Path, previous_stamp=None, previous_record=None
+) -> tuple[tuple[int, int, int], dict]:
+    """(original, gzip, brotli) sizes and the variant record, recompressing only
+    if the file changed.
+
+    The record (source sha256 and size, variant sizes by content-encoding) is
+    what the app checks a variant against before serving it.
+    """
+    size = path.stat().st_size
+    if previous_record is not None and previous_stamp == _stamp(path):
+        variant_sizes = previous_record["encodings"]
+        return (
+            size,
+            variant_sizes.get("gzip", size),
+            variant_sizes.get("br", size),
+        ), previous_record
+    content = path.read_bytes()
+    gz_size = _write_variant(
+        path, ".gz", gzip.compress(content, compresslevel=9, mtime=0), size
+    )
+    br_size = None
+    if brotli is not None:
+        br_size = _write_variant(
+            path, ".br", brotli.compress(content, quality=11), size
+        )
+    else:
+        # Cannot be rebuilt from this content; never leave an old one behind
+        path.with_name(path.name + ".br").unlink(missing_ok=True)
+    record = {
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "size": len(content),
+        "encodings": {
+            encoding: variant_size
+            for encoding, variant_size in (("gzip", gz_size), ("br", br_size))
+            if variant_size is not None
+        },
+    }
+    return (size, gz_size or size, br_size or size), record
+
+
+@task
+def compress_assets(c: Context):
+    """Write max-level .br and .gz siblings for the static files lambda/app.py serves."""
+    if brotli is None:
+        print("brotli not installed; only writing .gz variants")
+    paths = [
+        path
+        for path in _static_asset_files()
+        if path.suffix not in _SKIP_COMPRESSION_SUFFIXES
+        and path.stat().st_size >= _MIN_COMPRESS_SIZE
+    ]
+    # Files are stamped once compressed, so unchanged ones (including those whose
+    # variants were not worth keeping) are skipped next time
+    stamps = _build_state().get("compressed", {})
+    try:
+        records = json.loads(Paths.precompressed_manifest.read_text())["files"]
+    except FileNotFoundError:
+        records = {}
+    keys = [path.relative_to(Paths.lambda_dir).as_posix() for path in paths]
+    with ThreadPoolExecutor(max_workers=_POSTPROCESS_WORKERS) as executor:
+        results = list(
+            executor.map(
+                lambda item: _compress_file(
+                    item[0], stamps.get(item[1]), records.get(item[1])
+                ),
+                zip(paths, keys),
+            )
+        )
+    sizes = [result[0] for result in results]
+    Paths.precompressed_manifest.write_text(
+        json.dumps({"files": {k: r[1] for k, r in zip(keys, results)}}, indent=2)
+    )
+    _save_build_state("compressed", {k: _stamp(p) for k, p in zip(keys, paths)})
+    total_in, total_gz, total_br = (sum(column) for column in zip(*sizes or [(0,) * 3]))
+    print(f"Compressed {total_in:,} bytes -> gzip {total_gz:,} / brotli {total_br:,}")
+
+
+def _minify_json(path: Path) -> int:
+    """Rewrite a JSON file without whitespace; returns the bytes saved."""
+    content = path.read_bytes()
+    try:
+        minified = json.dumps(
+            json.loads(content), separators=(",", ":"), ensure_ascii=False
+        ).encode()
+    except ValueError:
+        return 0
+    if len(minified) >= len(content):
+        return 0
+    path.write_bytes(minified)
+    return len(content) - len(minified)
 
 
 @task
-def deploy_infra(c: Context):
+def minify_assets(c: Context):
+    """Strip whitespace from the Flet build's JSON (its JS is already minified by dart2js)."""
+    paths = list(Paths.compiled_flet_dest.rglob("*.json"))
+    with ThreadPoolExecutor(max_workers=_POSTPROCESS_WORKERS) as executor:
+        saved = sum(executor.map(_minify_json, paths))
+    print(f"Minified {len(paths)} JSON files, saving {saved:,} bytes")
+
+
+def _transfer_size(path: Path) -> int:
+    """Bytes a browser downloads: the smallest precompressed variant, if any."""
+    sizes = [path.stat().st_size]
+    for suffix in (".br", ".gz"):
+        variant = path.with_name(path.name + suffix)
+        if variant.exists():
+            sizes.append(variant.stat().st_size)
+    return min(sizes)
+
+
+@task
+def bundle_report(c: Context, top: int = 15):
+    """Print the largest shipped files and fail if any exceeds its budget.
+
+    Budgets live in bundle-budgets.json as glob (relative to lambda/) ->
+    ``max_bytes`` and/or ``max_transfer_bytes``; the first matching glob applies.
+    """
+    budgets = json.loads(Paths.bundle_budgets.read_text())["files"]
+    rows, failures = [], []
+    for path in _static_asset_files():
+        relative = path.relative_to(Paths.lambda_dir).as_posix()
+        size, transfer = path.stat().st_size, _transfer_size(path)
+        rows.append((relative, size, transfer))
+        for pattern, budget in budgets.items():
+            if fnmatch.fnmatch(relative, pattern):
+                if size > budget.get("max_bytes", size):
+                    failures.append(
+                        f"{relative}: {size:,} > {budget['max_bytes']:,} bytes"
+                    )
+                if transfer > budget.get("max_transfer_bytes", transfer):
+                    failures.append(
+                        f"{relative}: {transfer:,} > "
+                        f"{budget['max_transfer_bytes']:,} bytes transferred"
+                    )
+                break
+
+    rows.sort(key=lambda row: row[2], reverse=True)
+    print(f"{'file':60} {'bytes':>12} {'transfer':>12}")
+    for relative, size, transfer in rows[:top]:
+        print(f"{relative:60} {size:>12,} {transfer:>12,}")
+    print(
+        f"{f'total ({len(rows)} files)':60} {sum(r[1] for r in rows):>12,} "
+        f"{sum(r[2] for r in rows):>12,}"
+    )
+    if failures:
+        raise Exit("Bundle budgets exceeded:\n  " + "\n  ".join(failures))
+
+
+def _deploy_target() -> Optional[str]:
+    """Account, region and profile `cdk deploy` resolves from the environment.
+
+    Part of the deploy fingerprint, so switching AWS_PROFILE or region is never
+    mistaken for a repeat deploy. None when the credentials cannot be checked.
+    """
+    import boto3
+
+    session = boto3.Session()
+    try:
+        account = session.client("sts").get_caller_identity()["Account"]
+    except Exception as e:
+        print(f"STS GetCallerIdentity failed: {e}")
+        return None
+    return f"{account}/{session.region_name}/{session.profile_name}"
+
+
+@task
+def deploy_infra(
+    c: Context,
+    cloudfront: bool = False,
+    slim_package: bool = False,
+    zip_site_packages: bool = False,
+    keep_warm_minutes: int = 0,
+    provisioned_concurrency: int = 0,
+    force: bool = False,
+):
+    """Deploy the stack; `--cloudfront` also puts a CloudFront distribution in front.
+
+    `--slim-package` bundles the function with infra_package/package_lambda.py
+    (see `invoke package-lambda`), optionally with `--zip-site-packages`.
+
+    `--keep-warm-minutes N` pings /api/_warm every N minutes;
+    `--provisioned-concurrency N` keeps N environments initialized (and moves
+    the Function URL to the `live` alias).
+
+    Skipped when neither lambda/ nor the stack definition changed since the
+    last successful deploy with the same options, to the same account, region
+    and profile. Bundle budgets (`invoke bundle-report`) are checked first.
+    """
     if not Paths.compiled_flet_dest.exists():
         print("Must run the task `build-flet-web-app` at least once before deploy")
         raise RuntimeError(
             "Must run the task `build-flet-web-app` at least once before deploy"
         )
 
+    # The app ignores precompressed variants and manifest entries that do not
+    # match the files next to them; ship ones that do
+    compress_assets(c)
+    write_asset_manifest(c)
+    bundle_report(c)
+
+    target = _deploy_target()
+    fingerprint = _fingerprint(
+        Paths.lambda_dir,
+        Paths.infra_dir / "app.py",
+        Paths.infra_dir / "cdk.json",
+        Paths.infra_dir / "package_lambda.py",
+        extra=f"{cloudfront=} {slim_package=} {zip_site_packages=}"
+        f" {keep_warm_minutes=} {provisioned_concurrency=} {target=}",
+    )
+    if target is None:
+        print("Could not tell which account/region this deploys to; not skipping")
+    elif not force and _build_state().get("deploy") == fingerprint:
+        print("Nothing changed since the last deploy; skipping (--force to deploy)")
+        return
+
     with c.cd(Paths.infra_dir):
         c.run(
             f"cdk deploy --require-approval never --outputs-file {Paths.stack_output_file.absolute()}"
+            + (" -c cloudfront=true" if cloudfront else "")
+            + (" -c slim_package=true" if slim_package else "")
+            + (" -c zip_site_packages=true" if zip_site_packages else "")
+            + f" -c keep_warm_minutes={keep_warm_minutes}"
+            + f" -c provisioned_concurrency={provisioned_concurrency}"
+        )
+    if target is not None:
+        _save_build_state("deploy", fingerprint)
+
+
+@task
+def package_lambda(c: Context, zip_site_packages: bool = False):
+    """Build the slim deployment package locally and report size / import time per dependency.
+
+    Deploys build it inside the Lambda bundling image instead (`deploy-infra
+    --slim-package`), so the .pyc files there match the function's Python.
+    """
+    shutil.rmtree(Paths.lambda_package, ignore_errors=True)
+    with c.cd(Paths.repo_root):
+        c.run(
+            f"python {Paths.infra_dir / 'package_lambda.py'} --source {Paths.lambda_dir}"
+            f" --output {Paths.lambda_package}"
+            f" --report {Paths.lambda_package.parent / 'lambda-package-report.json'}"
+            + (" --zip-site-packages" if zip_site_packages else "")
+        )
+
+
+@task
+def bench_static(c: Context, iterations: int = 500):
+    with c.cd(Paths.repo_root):
+        c.run(f"python -m benchmarks.static_assets --iterations {iterations}")
+
+
+def _manifest_entry(path: Path) -> dict:
+    # stat first: a write during the read leaves a newer mtime, so the app
+    # treats the entry as stale rather than trusting a hash of mixed content
+    stat = path.stat()
+    content = path.read_bytes()
+    return {
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "size": len(content),
+        "mtime": stat.st_mtime,
+    }
+
+
+@task
+def write_asset_manifest(c: Context):
+    """Record a content hash for every static file so the app can answer with ETags / 304s.
+
+    Entries also carry the file's size and mtime; the app ignores an entry
+    once the file no longer matches it and hashes the file itself instead.
+    """
+    paths = sorted(_static_asset_files())
+    with ThreadPoolExecutor(max_workers=_POSTPROCESS_WORKERS) as executor:
+        entries = executor.map(_manifest_entry, paths)
+        files = {
+            path.relative_to(Paths.lambda_dir).as_posix(): entry
+            for path, entry in zip(paths, entries)
+        }
+    Paths.asset_manifest.write_text(json.dumps({"files": files}, indent=2))
+    print(f"Wrote {len(files)} entries to {Paths.asset_manifest}")
+
+
+@task
+def bench_large_file(c: Context, route: str = "", size_mb: int = 20):
+    """Peak RSS per request pattern; a temporary random fixture unless `--route` is given."""
+    with c.cd(Paths.repo_root):
+        c.run(f"python -m benchmarks.large_file {route} --size-mb {size_mb}")
+
+
+@task
+def bench_cold_start(c: Context, runs: int = 20, profile: bool = False):
+    with c.cd(Paths.repo_root):
+        c.run(
+            f"python -m benchmarks.cold_start --runs {runs}"
+            + (" --profile" if profile else "")
+        )
+
+
+@task
+def bench_keep_warm(c: Context, runs: int = 5):
+    """First-request latency in a fresh container, with and without /api/_warm first."""
+    with c.cd(Paths.repo_root):
+        c.run(f"python -m benchmarks.keep_warm --runs {runs}")
+
+
+@task
+def bench_middleware(c: Context, iterations: int = 2000):
+    with c.cd(Paths.repo_root):
+        c.run(f"python -m benchmarks.middleware --iterations {iterations}")
+
+
+@task
+def bench_handler(c: Context, iterations: int = 500, compare: str = ""):
+    """Benchmark every route through the Mangum handler; `--compare` takes a results JSON."""
+    with c.cd(Paths.repo_root):
+        c.run(
+            f"python -m benchmarks.handler --iterations {iterations}"
+            + (f" --compare {compare}" if compare else "")
         )
+
+
+@task
+def bench_table_formats(
+    c: Context, rows: str = "10000,100000,1000000", repeats: int = 3
+):
+    """Compare JSON, Arrow IPC and Parquet payload size and decode time."""
+    with c.cd(Paths.repo_root):
+        c.run(f"python -m benchmarks.table_formats --rows {rows} --repeats {repeats}")
+
+
+@task
+def bench_browser(
+    c: Context,
+    pages: str = "/pyodide,/pyodide2,/streamlitdemos/helloWorld",
+    visits: int = 3,
+    block_service_workers: bool = False,
+):
+    """First- vs repeat-visit time-to-interactive in headless Chromium (Playwright)."""
+    flag = " --block-service-workers" if block_service_workers else ""
+    with c.cd(Paths.repo_root):
+        c.run(
+            f"python -m benchmarks.browser_tti --pages {pages} --visits {visits}{flag}"
+        )
+
+
+def _download(url: str) -> bytes:
+    if not url.startswith(("http://", "https://")):
+        return Path(url).read_bytes()
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def _resolve_pyodide_packages(lock: dict, names: list[str]) -> list[str]:
+    packages = lock["packages"]
+    resolved, pending = [], list(names)
+    while pending:
+        name = pending.pop()
+        if name in resolved:
+            continue
+        resolved.append(name)
+        pending.extend(packages[name]["depends"])
+    return sorted(resolved)
+
+
+# Same cap as MAX_RESPONSE_BODY_BYTES in lambda/app.py. Wheels are never
+# precompressed, so one above it could only ever be redirected to the CDN.
+_MAX_VENDORED_WHEEL_BYTES = 6 * 1024 * 1024 * 3 // 4 - 65536
+
+
+def _pinned_download(url: str, hashes: dict, key: str, record: bool = False) -> bytes:
+    """Download ``url``, whose sha256 must match ``hashes[key]`` from runtime-pins.json.
+
+    With ``record`` (``--record-hashes``) the digest is stored there instead.
+    """
+    content = _download(url)
+    digest = hashlib.sha256(content).hexdigest()
+    if record:
+        hashes[key] = digest
+    elif (pinned := hashes.get(key)) is None:
+        raise Exit(
+            f"No sha256 pinned for {url}; check the download, then run "
+            "`invoke vendor-runtime --record-hashes` and review runtime-pins.json"
+        )
+    elif digest != pinned:
+        raise Exit(f"sha256 mismatch for {url}: pinned {pinned}, got {digest}")
+    return content
+
+
+@task
+def vendor_runtime(
+    c: Context, cdn_base: str = "", stlite_package: str = "", record_hashes=False
+):
+    """Download the pinned Pyodide/stlite runtimes and per-app wheels into lambda/vendor.
+
+    --cdn-base replaces https://cdn.jsdelivr.net (e.g. a local mirror or stub CDN);
+    --stlite-package overrides the npm tarball URL or points at a local .tgz.
+    Every download is checked against a sha256: the Pyodide core files and the
+    stlite tarball against runtime-pins.json, wheels against pyodide-lock.json.
+    --record-hashes writes the digests of this download into runtime-pins.json
+    instead (after a version bump), for review before it is committed.
+    """
+    pins = json.loads(Paths.runtime_pins.read_text())
+
+    def pinned_url(url: str) -> str:
+        if cdn_base:
+            return url.replace("https://cdn.jsdelivr.net", cdn_base.rstrip("/"))
+        return url
+
+    pyodide = pins["pyodide"]
+    pyodide_base = pinned_url(pyodide["base_url"])
+    pyodide_dir = Paths.vendor_dir / "pyodide" / f"v{pyodide['version']}"
+    pyodide_dir.mkdir(parents=True, exist_ok=True)
+    core_hashes = pyodide.setdefault("sha256", {})
+    for file_name in pyodide["core_files"]:
+        content = _pinned_download(
+            pyodide_base + file_name, core_hashes, file_name, record_hashes
+        )
+        (pyodide_dir / file_name).write_bytes(content)
+    # pinned above, so the wheel hashes it lists can be trusted
+    pyodide_lock = json.loads((pyodide_dir / "pyodide-lock.json").read_text())
+
+    lockfile = {
+        "pyodide": pyodide["version"],
+        "stlite": pins["stlite"]["version"],
+        "apps": {},
+        "files": {},
+    }
+    for app_name, requested in pins["apps"].items():
+        names = _resolve_pyodide_packages(pyodide_lock, requested)
+        lockfile["apps"][app_name] = names
+        for name in names:
+            package = pyodide_lock["packages"][name]
+            file_name = package["file_name"]
+            if file_name in lockfile["files"]:
+                continue
+            path = pyodide_dir / file_name
+            if not path.exists() or _sha256(path) != package["sha256"]:
+                path.write_bytes(_download(pyodide_base + file_name))
+            if (digest := _sha256(path)) != package["sha256"]:
+                raise RuntimeError(f"sha256 mismatch for {file_name}")
+            lockfile["files"][file_name] = {"package": name, "sha256": digest}
+            if path.stat().st_size > _MAX_VENDORED_WHEEL_BYTES:
+                # Too large for one response: /vendor redirects it to the same
+                # file on the CDN, which Pyodide checks against the same sha256
+                path.unlink()
+                lockfile["files"][file_name]["source"] = "cdn"
+
+    stlite = pins["stlite"]
+    stlite_dir = Paths.vendor_dir / "stlite" / stlite["version"]
+    shutil.rmtree(stlite_dir, ignore_errors=True)
+    stlite_dir.mkdir(parents=True)
+    tarball = _pinned_download(
+        stlite_package or stlite["package_url"], stlite, "package_sha256", record_hashes
+    )
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode="r:gz") as tar:
+        for member in tar.getmembers():
+            relative = member.name.removeprefix("package/build/")
+            if not member.isfile() or relative == member.name:
+                continue
+            # rejects absolute paths and anything resolving outside stlite_dir
+            member = tarfile.data_filter(member.replace(name=relative), stlite_dir)
+            target = stlite_dir / member.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(tar.extractfile(member).read())
+    lockfile["stlite_tarball_sha256"] = stlite["package_sha256"]
+
+    if record_hashes:
+        Paths.runtime_pins.write_text(json.dumps(pins, indent=2) + "\n")
+        print(f"Recorded sha256 pins in {Paths.runtime_pins}; review before committing")
+    (Paths.vendor_dir / "runtime-lock.json").write_text(json.dumps(lockfile, indent=2))
+    compress_assets(c)
+    write_asset_manifest(c)
+    cdn_only = sum(entry.get("source") == "cdn" for entry in lockfile["files"].values())
+    print(
+        f"Vendored Pyodide {pyodide['version']} ({len(lockfile['files'])} wheels, "
+        f"{cdn_only} left on the CDN) and stlite {stlite['version']} into "
+        f"{Paths.vendor_dir}"
+    )
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@task
+def serve_local(c: Context, port: int = 8000, cdn_base: str = ""):
+    """Run the app with uvicorn; --cdn-base points un-vendored runtime files at a stub CDN."""
+    env = {"RUNTIME_CDN_BASE": cdn_base} if cdn_base else {}
+    with c.cd(Paths.lambda_dir):
+        c.run(f"uvicorn app:app --port {port}", env=env, pty=True)
@@ -0,0 +1,95 @@
+"""Import ``lambda/app.py`` the way the Lambda runtime does, against moto's DynamoDB."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+LAMBDA_DIR = Path(__file__).parent.parent / "lambda"
+TABLE_NAME = "test-table"
+DATA_API_TOKEN = "test-data-token"
+
+sys.path.insert(0, str(LAMBDA_DIR))
+# one EMF line per request would only clutter the captured output
+os.environ.setdefault("METRICS_EMF", "0")
+
+
+class FakeContext:
+    function_name = "test"
+    aws_request_id = "00000000-0000-0000-0000-000000000000"
+
+
+def function_url_event(path: str, headers: dict) -> dict:
+    """A GET through the Lambda Function URL, as Mangum receives it."""
+    headers = {"host": "abcdefg.lambda-url.us-east-1.on.aws", **headers}
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": headers,
+        "requestContext": {
+            "http": {
+                "method": "GET",
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+            },
+            "routeKey": "$default",
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """A moto account holding the app's single table, shaped as in infra_package."""
+    from moto import mock_aws
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("DYNAMODB_TABLE", TABLE_NAME)
+    with mock_aws():
+        import boto3
+
+        client = boto3.client("dynamodb")
+        client.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "pk", "KeyType": "HASH"},
+                {"AttributeName": "sk", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "pk", "AttributeType": "S"},
+                {"AttributeName": "sk", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield client
+
+
+@pytest.fixture
+def app_module(aws, monkeypatch):
+    """``lambda/app.py`` with fresh DynamoDB singletons and a data API token set."""
+    monkeypatch.chdir(LAMBDA_DIR)
+    import app
+
+    monkeypatch.setattr(app, "_MEMORY", None)
+    monkeypatch.setattr(app, "_KV_CACHE", None)
+    monkeypatch.setattr(app, "_DATA_API_TOKEN", DATA_API_TOKEN)
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    from fastapi.testclient import TestClient
+
+    return TestClient(app_module.app)
+
+
+@pytest.fixture
+def auth():
+    return {"Authorization": f"Bearer {DATA_API_TOKEN}"}
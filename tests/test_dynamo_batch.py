@@ -0,0 +1,177 @@
+import pytest
+
+import dynamo_batch
+
+
+@pytest.fixture
+def calls(app_module, monkeypatch):
+    """Request sizes of every BatchGetItem/BatchWriteItem the app sends."""
+    monkeypatch.setattr(dynamo_batch, "_backoff", lambda attempt: None)
+    client = app_module._get_memory().dynamodb_client
+    recorded = {"get": [], "write": []}
+    batch_get_item, batch_write_item = client.batch_get_item, client.batch_write_item
+
+    def record_get(RequestItems):
+        (request,) = RequestItems.values()
+        recorded["get"].append(len(request["Keys"]))
+        return batch_get_item(RequestItems=RequestItems)
+
+    def record_write(RequestItems):
+        (requests,) = RequestItems.values()
+        recorded["write"].append(len(requests))
+        return batch_write_item(RequestItems=RequestItems)
+
+    monkeypatch.setattr(client, "batch_get_item", record_get)
+    monkeypatch.setattr(client, "batch_write_item", record_write)
+    return recorded
+
+
+def _items(count: int) -> list[dict]:
+    return [{"id": f"item-{i}", "data": {"n": i, "score": i / 2}} for i in range(count)]
+
+
+def test_write_and_get_are_chunked(client, auth, calls):
+    response = client.post(
+        "/api/items/batch-write",
+        json={"dataset": "d", "put": _items(60)},
+        headers=auth,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"written": 60, "deleted": 0}
+    assert sorted(calls["write"]) == [10, 25, 25]
+
+    ids = [f"item-{i}" for i in range(250)]
+    response = client.post(
+        "/api/items/batch-get", json={"dataset": "d", "ids": ids}, headers=auth
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["items"]) == 60
+    assert body["items"]["item-7"] == {"n": 7, "score": 3.5}
+    assert body["missing"] == ids[60:]
+    assert sorted(calls["get"]) == [50, 100, 100]
+
+
+def test_delete(client, auth):
+    client.post(
+        "/api/items/batch-write", json={"dataset": "d", "put": _items(3)}, headers=auth
+    )
+    response = client.post(
+        "/api/items/batch-write",
+        json={"dataset": "d", "delete": ["item-0", "item-1"]},
+        headers=auth,
+    )
+    assert response.json() == {"written": 0, "deleted": 2}
+    response = client.post(
+        "/api/items/batch-get",
+        json={"dataset": "d", "ids": ["item-0", "item-2"]},
+        headers=auth,
+    )
+    assert list(response.json()["items"]) == ["item-2"]
+
+
+def test_unprocessed_items_are_retried(app_module, client, auth, calls, monkeypatch):
+    client_ = app_module._get_memory().dynamodb_client
+    batch_write_item = client_.batch_write_item
+    attempts = []
+
+    def write_all_but_last(RequestItems):
+        ((table, requests),) = RequestItems.items()
+        attempts.append(len(requests))
+        if len(requests) == 1:
+            return batch_write_item(RequestItems=RequestItems)
+        batch_write_item(RequestItems={table: requests[:-1]})
+        return {"UnprocessedItems": {table: requests[-1:]}}
+
+    monkeypatch.setattr(client_, "batch_write_item", write_all_but_last)
+    response = client.post(
+        "/api/items/batch-write", json={"dataset": "d", "put": _items(3)}, headers=auth
+    )
+    assert response.status_code == 200
+    # all 3 requests, then the one left unprocessed on its own
+    assert attempts == [3, 1]
+
+    response = client.post(
+        "/api/items/batch-get",
+        json={"dataset": "d", "ids": ["item-0", "item-1", "item-2"]},
+        headers=auth,
+    )
+    assert response.json()["missing"] == []
+
+
+def test_unprocessed_keys_are_retried(app_module, client, auth, calls, monkeypatch):
+    client.post(
+        "/api/items/batch-write", json={"dataset": "d", "put": _items(2)}, headers=auth
+    )
+    client_ = app_module._get_memory().dynamodb_client
+    batch_get_item = client_.batch_get_item
+    throttled = []
+
+    def throttle_once(RequestItems):
+        if not throttled:
+            throttled.append(True)
+            return {"Responses": {}, "UnprocessedKeys": RequestItems}
+        return batch_get_item(RequestItems=RequestItems)
+
+    monkeypatch.setattr(client_, "batch_get_item", throttle_once)
+    response = client.post(
+        "/api/items/batch-get",
+        json={"dataset": "d", "ids": ["item-0", "item-1"]},
+        headers=auth,
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()["items"]) == ["item-0", "item-1"]
+
+
+def test_retries_give_up_with_503(app_module, client, auth, calls, monkeypatch):
+    monkeypatch.setattr(dynamo_batch, "MAX_UNPROCESSED_RETRIES", 2)
+    client_ = app_module._get_memory().dynamodb_client
+    monkeypatch.setattr(
+        client_,
+        "batch_write_item",
+        lambda RequestItems: {"UnprocessedItems": RequestItems},
+    )
+    response = client.post(
+        "/api/items/batch-write", json={"dataset": "d", "put": _items(2)}, headers=auth
+    )
+    assert response.status_code == 503
+    assert "unprocessed" in response.json()["detail"]
+
+
+def test_rejects_oversized_and_duplicate_batches(client, auth, calls):
+    too_many = dynamo_batch.MAX_BATCH_ITEMS + 1
+    response = client.post(
+        "/api/items/batch-write",
+        json={"dataset": "d", "put": _items(too_many)},
+        headers=auth,
+    )
+    assert response.status_code == 422
+    response = client.post(
+        "/api/items/batch-get",
+        json={"dataset": "d", "ids": [str(i) for i in range(too_many)]},
+        headers=auth,
+    )
+    assert response.status_code == 422
+
+    response = client.post(
+        "/api/items/batch-write",
+        json={"dataset": "d", "put": _items(2), "delete": ["item-1"]},
+        headers=auth,
+    )
+    assert response.status_code == 400
+    assert calls["write"] == []
+
+
+@pytest.mark.parametrize("path", ["/api/items/batch-get", "/api/items/batch-write"])
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}])
+def test_requires_data_token(client, path, headers):
+    response = client.post(path, json={"dataset": "d", "ids": []}, headers=headers)
+    assert response.status_code == 403
+
+
+def test_disabled_without_a_configured_token(app_module, client, auth, monkeypatch):
+    monkeypatch.setattr(app_module, "_DATA_API_TOKEN", "")
+    response = client.post(
+        "/api/items/batch-get", json={"dataset": "d", "ids": ["a"]}, headers=auth
+    )
+    assert response.status_code == 403
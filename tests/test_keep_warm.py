@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from conftest import FakeContext
+from request_metrics import emf_line
+
+# What an EventBridge schedule rule delivers when invoking the function
+SCHEDULED_EVENT = {
+    "version": "0",
+    "id": "53dc4d37-cffa-4f76-80c9-8b7d4a4d2eaa",
+    "detail-type": "Scheduled Event",
+    "source": "aws.events",
+    "account": "123456789012",
+    "time": "2026-01-01T00:00:00Z",
+    "region": "us-east-1",
+    "resources": ["arn:aws:events:us-east-1:123456789012:rule/KeepWarmSchedule"],
+    "detail": {},
+}
+
+
+@pytest.fixture
+def warm_app(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "_WARMED_AT", None)
+    monkeypatch.setattr(app_module, "WARM_IMPORTS", ("json",))
+    return app_module
+
+
+def _warm_count(app_module) -> int:
+    return app_module._METRICS.snapshot()["warm"].get("/api/_warm", {}).get("count", 0)
+
+
+def test_scheduled_event_runs_the_warm_up(warm_app):
+    warm_count = _warm_count(warm_app)
+    user_routes = warm_app._METRICS.snapshot()["routes"]
+
+    response = warm_app.handler(SCHEDULED_EVENT, FakeContext())
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["first"] is True
+    assert {"imports", "dynamodb", "assets"} <= set(body["steps_ms"])
+    assert None not in body["steps_ms"].values()
+
+    # counted as keep-warm traffic, not as a user request
+    assert _warm_count(warm_app) == warm_count + 1
+    assert warm_app._METRICS.snapshot()["routes"] == user_routes
+
+    response = warm_app.handler(SCHEDULED_EVENT, FakeContext())
+    assert json.loads(response["body"])["first"] is False
+
+
+def test_http_events_still_reach_the_app(warm_app, client):
+    assert client.get("/api/ping").json() == "pong"
+    assert client.post("/api/_warm").json()["first"] is True
+
+
+def test_emf_dimensions_keep_traffic_types_apart():
+    line = json.loads(emf_line("/api/_warm", "POST", 200, 1.0, 10, 10, warm=True))
+    (metrics,) = line["_aws"]["CloudWatchMetrics"]
+    assert metrics["Dimensions"] == [["Route", "Traffic"], ["Traffic"]]
+    assert (line["Route"], line["Traffic"]) == ("/api/_warm", "warm")
+    assert json.loads(emf_line("/api/ping", "GET", 200, 1.0, 10, 10))["Traffic"] == (
+        "user"
+    )
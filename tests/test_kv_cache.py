@@ -0,0 +1,155 @@
+import os
+import time
+
+import pytest
+
+import kv_cache
+from conftest import TABLE_NAME
+
+
+@pytest.fixture
+def cache(aws):
+    return kv_cache.KeyValueCache(aws, TABLE_NAME, local_ttl=60)
+
+
+def _items(aws, namespace: str) -> list[str]:
+    response = aws.query(
+        TableName=TABLE_NAME,
+        KeyConditionExpression="pk = :pk",
+        ExpressionAttributeValues={":pk": {"S": f"cache#{namespace}"}},
+    )
+    return sorted(item["sk"]["S"] for item in response["Items"])
+
+
+def _chunks(key: str, count: int) -> list[str]:
+    return [kv_cache._chunk_key("ns", key, i)["sk"]["S"] for i in range(count)]
+
+
+def test_round_trip_through_the_api(client, auth):
+    response = client.put(
+        "/api/cache/ns/some/key",
+        content=b'{"a": 1}',
+        headers={**auth, "Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    etag = response.json()["etag"]
+
+    response = client.get("/api/cache/ns/some/key")
+    assert response.status_code == 200
+    assert response.content == b'{"a": 1}'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == f'"{etag}"'
+    assert (
+        client.get(
+            "/api/cache/ns/some/key", headers={"If-None-Match": f'"{etag}"'}
+        ).status_code
+        == 304
+    )
+
+    keys = client.get("/api/cache/ns").json()["keys"]
+    assert [(entry["key"], entry["size"]) for entry in keys] == [("some/key", 8)]
+
+
+def test_large_values_are_chunked(aws, cache):
+    value = os.urandom(kv_cache.CHUNK_BYTES * 2 + 10)
+    entry = cache.put("ns", "big", value)
+    assert entry.chunks == 3
+    assert _items(aws, "ns") == [*_chunks("big", 3), "key#big"]
+
+    other = kv_cache.KeyValueCache(aws, TABLE_NAME)
+    assert other.get("ns", "big").value == value
+
+    # shrinking the value drops the chunks it no longer needs
+    cache.put("ns", "big", value[: kv_cache.CHUNK_BYTES + kv_cache.INLINE_BYTES])
+    assert _items(aws, "ns") == [*_chunks("big", 2), "key#big"]
+    cache.put("ns", "big", b"small")
+    assert _items(aws, "ns") == ["key#big"]
+
+
+def test_values_over_the_limit_are_rejected(client, auth):
+    response = client.put(
+        "/api/cache/ns/huge",
+        content=b"x" * (kv_cache.MAX_VALUE_BYTES + 1),
+        headers=auth,
+    )
+    assert response.status_code == 413
+
+
+def test_expired_entries_are_misses(client, auth, monkeypatch):
+    client.put("/api/cache/ns/short", content=b"v", params={"ttl": 30}, headers=auth)
+    client.put("/api/cache/ns/long", content=b"v", headers=auth)
+    assert client.get("/api/cache/ns/short").status_code == 200
+
+    later = time.time() + 31
+    monkeypatch.setattr(kv_cache.time, "time", lambda: later)
+    assert client.get("/api/cache/ns/short").status_code == 404
+    assert [entry["key"] for entry in client.get("/api/cache/ns").json()["keys"]] == [
+        "long"
+    ]
+
+
+def test_local_tier_serves_repeat_reads(aws, cache, monkeypatch):
+    cache.put("ns", "k", b"first")
+    writer = kv_cache.KeyValueCache(aws, TABLE_NAME)
+    writer.put("ns", "k", b"second")
+
+    # within local_ttl the in-memory entry wins, without reading DynamoDB
+    assert cache.get("ns", "k").value == b"first"
+    assert cache.stats()["local_hits"] == 1
+
+    # after local_ttl the head item is read again and the newer write seen
+    later = time.monotonic() + 61
+    monkeypatch.setattr(kv_cache.time, "monotonic", lambda: later)
+    assert cache.get("ns", "k").value == b"second"
+    assert cache.stats()["remote_hits"] == 1
+
+
+def test_local_value_is_reused_when_unchanged(aws, cache, monkeypatch):
+    cache.put("ns", "big", os.urandom(kv_cache.INLINE_BYTES + 1))
+    later = time.monotonic() + 61
+    monkeypatch.setattr(kv_cache.time, "monotonic", lambda: later)
+    monkeypatch.setattr(kv_cache.dynamo_batch, "get_items", pytest.fail, raising=True)
+    # only the head item is fetched: its etag matches the local copy
+    assert cache.get("ns", "big").chunks == 1
+
+
+def test_local_tier_is_bounded(aws):
+    cache = kv_cache.KeyValueCache(aws, TABLE_NAME, max_local_bytes=10, local_ttl=60)
+    cache.put("ns", "a", b"12345")
+    cache.put("ns", "b", b"12345")
+    cache.put("ns", "c", b"12345")
+    assert cache.stats()["local_bytes"] == 10
+    assert cache.get("ns", "a").value == b"12345"
+    assert cache.stats()["remote_hits"] == 1
+
+
+def test_delete(aws, client, auth):
+    value = os.urandom(kv_cache.INLINE_BYTES + 1)
+    client.put("/api/cache/ns/k", content=value, headers=auth)
+    assert client.delete("/api/cache/ns/k", headers=auth).status_code == 204
+    assert client.get("/api/cache/ns/k").status_code == 404
+    assert _items(aws, "ns") == []
+    assert client.delete("/api/cache/ns/k", headers=auth).status_code == 404
+
+
+@pytest.mark.parametrize("method", ["put", "delete"])
+def test_writes_require_the_data_token(client, auth, method):
+    response = client.request(method, "/api/cache/ns/k", content=b"v")
+    assert response.status_code == 403
+    response = client.request(
+        method, "/api/cache/ns/k", content=b"v", headers={"Authorization": "Bearer x"}
+    )
+    assert response.status_code == 403
+
+
+def test_invalid_keys_are_rejected(client, auth):
+    assert (
+        client.put("/api/cache/ns/a%23b", content=b"v", headers=auth).status_code == 400
+    )
+    assert client.get("/api/cache/-ns/k").status_code == 400
+
+
+def test_demo_namespace_is_left_to_the_registry(client, auth):
+    assert (
+        client.put("/api/cache/demos/x", content=b"v", headers=auth).status_code == 403
+    )
@@ -0,0 +1,76 @@
+"""``Link`` preload headers on the HTML pages, as returned by the Lambda handler."""
+
+import pytest
+
+from conftest import LAMBDA_DIR, FakeContext, function_url_event
+from runtime_assets import RUNTIME_PINS, load_pins, service_worker_config
+
+PINS = load_pins(LAMBDA_DIR / RUNTIME_PINS)
+PYODIDE = f"/vendor/pyodide/v{PINS['pyodide']['version']}/"
+STLITE = f"/vendor/stlite/{PINS['stlite']['version']}/"
+
+
+@pytest.fixture
+def get(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "_PAGE_LINKS", {})
+
+    def get(path: str, **headers) -> dict:
+        response = app_module.handler(function_url_event(path, headers), FakeContext())
+        assert response["statusCode"] in (200, 304), response
+        return response
+
+    return get
+
+
+def links(response: dict) -> dict[str, str]:
+    """Preloaded URL -> the rest of its Link entry."""
+    header = response["headers"].get("link")
+    if header is None:
+        return {}
+    entries = (entry.strip().partition(">; ") for entry in header.split(","))
+    return {url.removeprefix("<"): params for url, _, params in entries}
+
+
+def test_main_thread_pyodide_page_preloads_the_runtime(get):
+    preloads = links(get("/pyodide"))
+    assert preloads[PYODIDE + "pyodide.js"] == "rel=preload; as=script"
+    # fetch()ed by Pyodide in CORS mode; the preload must match to be reused
+    assert (
+        preloads[PYODIDE + "pyodide.asm.wasm"] == "rel=preload; as=fetch; crossorigin"
+    )
+    assert set(preloads) == {PYODIDE + name for name in PINS["pyodide"]["preload"]}
+
+
+def test_conditional_responses_keep_the_links(get):
+    etag = get("/pyodide")["headers"]["etag"]
+    response = get("/pyodide", **{"if-none-match": etag})
+    assert response["statusCode"] == 304
+    assert PYODIDE + "pyodide.js" in links(response)
+
+
+def test_worker_page_preloads_nothing(get):
+    # Pyodide and the worker script are fetched by the Web Worker, which a
+    # document preload cannot serve
+    response = get("/pyodide2")
+    assert links(response) == {}
+    assert b"preload" not in response["body"].encode()
+
+
+@pytest.mark.parametrize("path", ["/streamlit", "/streamlitdemos/helloWorld"])
+def test_stlite_pages_preload_only_stlite(get, path):
+    # stlite boots Pyodide in its own worker; only its own script and CSS
+    # load on the page
+    preloads = links(get(path))
+    assert set(preloads) == {STLITE + name for name in PINS["stlite"]["preload"]}
+    assert preloads[STLITE + "stlite.js"] == "rel=preload; as=script"
+    assert preloads[STLITE + "stlite.css"] == "rel=preload; as=style"
+
+
+def test_assets_carry_no_links(get):
+    assert links(get("/pyodide2_worker.js")) == {}
+
+
+def test_service_worker_still_revalidates_worker_files():
+    pages = service_worker_config(PINS)["pages"]
+    assert "/pyodide2_worker.js" in pages
+    assert "/streamlit_app.py" in pages
@@ -0,0 +1,154 @@
+"""Range, If-Range and size-limit handling of the static file routes."""
+
+import base64
+from email.utils import formatdate
+
+import pytest
+
+import static_assets
+from conftest import FakeContext, function_url_event
+from static_assets import StaticAssetCache
+
+ROUTE = "/flet/data.bin"
+CONTENT = bytes(range(256)) * 4
+SIZE = len(CONTENT)
+
+
+@pytest.fixture
+def assets(app_module, monkeypatch, tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(CONTENT)
+    cache = StaticAssetCache()
+    cache.add_file(ROUTE, path)
+    monkeypatch.setattr(app_module, "_ASSETS", cache)
+    return cache
+
+
+@pytest.fixture
+def get(client, assets):
+    def get(**headers):
+        return client.get(ROUTE, headers=headers)
+
+    return get
+
+
+def test_full_body_advertises_ranges(get):
+    response = get()
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == CONTENT
+
+
+@pytest.mark.parametrize(
+    "range_header, start, end",
+    [
+        ("bytes=10-19", 10, 19),
+        ("bytes=1000-", 1000, SIZE - 1),
+        ("bytes=-5", SIZE - 5, SIZE - 1),
+        # a suffix longer than the file is the whole file
+        ("bytes=-5000", 0, SIZE - 1),
+        # an end past the file is clipped to it
+        ("bytes=1020-5000", 1020, SIZE - 1),
+    ],
+)
+def test_single_range(get, range_header, start, end):
+    response = get(range=range_header)
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{SIZE}"
+    assert response.headers["content-length"] == str(end - start + 1)
+    assert response.content == CONTENT[start : end + 1]
+
+
+@pytest.mark.parametrize(
+    "range_header", [f"bytes={SIZE}-", "bytes=5000-6000", "bytes=-0"]
+)
+def test_unsatisfiable_range(get, range_header):
+    response = get(range=range_header)
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{SIZE}"
+
+
+@pytest.mark.parametrize(
+    "range_header",
+    ["bytes=0-1,5-6", "bytes=abc", "bytes=5-1", "bytes", "items=0-1", "bytes=1-x"],
+)
+def test_unusable_range_falls_back_to_the_full_body(get, range_header):
+    response = get(range=range_header)
+    assert response.status_code == 200
+    assert "content-range" not in response.headers
+    assert response.content == CONTENT
+
+
+def test_ranges_address_the_identity_representation(get):
+    response = get(range="bytes=0-9", **{"accept-encoding": "gzip, br"})
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.content == CONTENT[:10]
+
+
+def test_if_range_with_the_current_validators(get):
+    validators = get().headers
+    for if_range in (validators["etag"], validators["last-modified"]):
+        response = get(range="bytes=0-9", **{"if-range": if_range})
+        assert response.status_code == 206
+        assert response.content == CONTENT[:10]
+
+
+def test_if_range_compares_entity_tags_strongly(get):
+    etag = get().headers["etag"]
+    for if_range in (
+        f"W/{etag}",
+        # the same content, but a different (compressed) representation
+        etag[:-1] + '-br"',
+        '"0123456789abcdef0123456789abcdef"',
+        formatdate(0, usegmt=True),
+    ):
+        response = get(range="bytes=0-9", **{"if-range": if_range})
+        assert response.status_code == 200, if_range
+        assert response.content == CONTENT
+
+
+def test_bodies_over_the_response_limit(app_module, get, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_RESPONSE_BODY_BYTES", 100)
+    response = get()
+    assert response.status_code == 413
+    assert "request it with Range" in response.json()["detail"]
+    assert get(range="bytes=0-99").status_code == 206
+    assert get(range="bytes=0-100").status_code == 413
+
+
+@pytest.fixture
+def large(monkeypatch):
+    # CONTENT counts as a large file from here on
+    monkeypatch.setattr(static_assets, "STREAM_THRESHOLD_BYTES", 100)
+
+
+def test_large_files_stream_from_disk_under_a_server(get, assets, large):
+    response = get()
+    assert response.content == CONTENT
+    assert get(range="bytes=200-299").content == CONTENT[200:300]
+    assert assets.cached(ROUTE) is None
+
+
+def test_large_files_stay_in_memory_under_mangum(app_module, assets, large):
+    def get(**headers) -> bytes:
+        response = app_module.handler(function_url_event(ROUTE, headers), FakeContext())
+        assert response["statusCode"] in (200, 206), response
+        body = response["body"]
+        return base64.b64decode(body) if response["isBase64Encoded"] else body.encode()
+
+    assert get() == CONTENT
+    assert assets.cached(ROUTE) == CONTENT
+    # warm invocations do not go back to the disk
+    assets.path_for(ROUTE).unlink()
+    assert get() == CONTENT
+    assert get(range="bytes=200-299") == CONTENT[200:300]
+
+
+def test_ranges_of_uncacheable_files_read_only_the_range(app_module, assets, large):
+    assets.max_bytes = 100
+    event = function_url_event(ROUTE, {"range": "bytes=200-299"})
+    response = app_module.handler(event, FakeContext())
+    assert response["statusCode"] == 206
+    assert base64.b64decode(response["body"]) == CONTENT[200:300]
+    assert assets.cached(ROUTE) is None
@@ -0,0 +1,50 @@
+"""``/vendor`` serves the pinned runtimes, falling back to the same files on the CDN."""
+
+import pytest
+
+from conftest import LAMBDA_DIR
+from runtime_assets import RUNTIME_PINS, load_pins
+from static_assets import StaticAssetCache
+
+PINS = load_pins(LAMBDA_DIR / RUNTIME_PINS)
+PREFIX = f"/vendor/pyodide/v{PINS['pyodide']['version']}/"
+WHEEL = "pandas-2.2.0-cp312-cp312-pyodide_2024_0_wasm32.whl"
+CONTENT = b"wheel" * 200
+
+
+@pytest.fixture
+def get(app_module, client, monkeypatch, tmp_path):
+    (tmp_path / WHEEL).write_bytes(CONTENT)
+    cache = StaticAssetCache()
+    cache.add_file(PREFIX + WHEEL, tmp_path / WHEEL)
+    monkeypatch.setattr(app_module, "_ASSETS", cache)
+
+    def get(name: str, **headers):
+        return client.get(PREFIX + name, headers=headers, follow_redirects=False)
+
+    return get
+
+
+def test_vendored_files_are_served_locally(get):
+    response = get(WHEEL)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_missing_files_redirect_to_the_pinned_cdn(get):
+    response = get("pyodide.js")
+    assert response.status_code == 307
+    assert response.headers["location"] == PINS["pyodide"]["base_url"] + "pyodide.js"
+
+
+def test_files_too_large_for_one_response_redirect_to_the_cdn(
+    app_module, get, monkeypatch
+):
+    monkeypatch.setattr(app_module, "MAX_RESPONSE_BODY_BYTES", 100)
+    response = get(WHEEL)
+    assert response.status_code == 307
+    assert response.headers["location"] == PINS["pyodide"]["base_url"] + WHEEL
+    # a range that fits is still served from the function
+    response = get(WHEEL, range="bytes=0-99")
+    assert response.status_code == 206
+    assert response.content == CONTENT[:100]